@@ -0,0 +1,84 @@
+"""
+Параметры загрузки и парсинга логов.
+Используются потоками загрузки/парсинга и вкладкой 'Конструктор'.
+"""
+
+import os
+
+PARSER_CONFIG = {
+    # === Потоковая загрузка файла пачками строк ===
+    "stream": {
+        "batch_size": 5000,     # строк в одной пачке
+    },
+
+    # === Режим слежения за растущим файлом (tail -f) ===
+    "tail": {
+        "interval_ms": 1000,                 # период опроса файла
+        "max_read_bytes": 64 * 1024 * 1024,  # не больше стольких байт за один опрос
+    },
+
+    # === Загрузка нескольких файлов / каталога ===
+    "multi_file": {
+        "max_workers": None,    # процессов в пуле (None = число ядер)
+        "pattern": "*",         # маска файлов при выборе каталога
+    },
+
+    # === Параллельный парсинг Apache/Nginx по ядрам ===
+    "parallel": {
+        "workers": None,          # процессов (None = число ядер, 1 = без параллелизма)
+        "min_lines": 200000,      # меньше — парсим в одном процессе (старт пула дороже)
+        "chunk_lines": 100000,    # строк в одном куске для процесса
+    },
+
+    # === SQL-дампы Wordpress/Bitrix (mysqldump) ===
+    "sql_dump": {
+        "chunk_chars": 8 * 1024 * 1024,   # символов в одном куске при потоковом чтении
+        "parallel_min_bytes": 32 * 1024 * 1024,  # дамп меньше — разбирается в одном процессе
+        # INSERT только в эти таблицы (имя целиком или окончание — префикс WordPress бывает разным);
+        # пустой список — кортежи любых таблиц
+        "tables": {
+            "Bitrix": ["b_event_log"],
+            "Wordpress": [],
+        },
+    },
+
+    # === Пользовательские форматы access-логов ===
+    # Имя -> nginx log_format ("syntax": "nginx") или Apache LogFormat ("syntax": "apache").
+    # Каждый формат появляется в списке парсеров вкладки 'Конструктор' и компилируется
+    # в регулярку один раз. Известные переменные дают стандартные колонки (source_ip,
+    # date/time/timestamp, method, object, code, size ...), дополнительно:
+    # vhost ($host, $server_name, %v), request_time ($request_time, %T, %D — в секундах),
+    # upstream_response_time (сумма по всем апстримам); прочие — колонка с именем переменной.
+    "log_formats": {
+        "Nginx (vhost + время ответа)": {
+            "syntax": "nginx",
+            "format": '$host $remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent '
+                      '"$http_referer" "$http_user_agent" $request_time $upstream_response_time',
+        },
+        "Apache (vhost_combined + %D)": {
+            "syntax": "apache",
+            "format": '%v:%p %h %l %u %t "%r" %>s %O "%{Referer}i" "%{User-Agent}i" %D',
+        },
+    },
+
+    # === Статистика разбора (строка состояния, лог) ===
+    "stats": {
+        "rejected_samples": 200,                # сколько отклонённых строк сохранять для просмотра
+        "rejected_file": "rejected_lines.log",  # файл выборки в каталоге логов приложения
+    },
+
+    # === Таблица логов вкладки 'Конструктор' ===
+    "table": {
+        "dedup": False,   # начальное состояние флажка «Не добавлять повторяющиеся строки»: выключен — строки добавляются все, позиции не запоминаются
+        "fetch_rows": 10000,   # строк, отдаваемых представлению за раз (canFetchMore/fetchMore)
+        "width_sample": 500,   # по скольким строкам (равномерно по таблице) оценивается ширина колонок
+        "max_column_width": 400,   # пикс., потолок оценённой ширины колонки
+    },
+
+    # === Кэш результатов парсинга на диске ===
+    "cache": {
+        "enabled": True,
+        "dir": os.path.join(os.path.dirname(__file__), "..", "cache"),
+        "max_bytes": 2 * 1024 * 1024 * 1024,  # бюджет на диске, старые записи вытесняются (LRU)
+    },
+}
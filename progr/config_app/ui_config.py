@@ -19,6 +19,14 @@ UI_CONFIG = {
         "min_height": 600
     },
 
+    # === Окно статистики значений столбцов (фасеты) ===
+    "facets_dialog": {
+        "title": "Значения столбцов",
+        "min_width": 600,
+        "min_height": 500,
+        "top": 20   # сколько самых частых значений показывать
+    },
+
     # === Цвета подсветки HTTP-кодов ===
     "http_colors": {
         "success": "#0fa80f",  # 2xx — зелёный
@@ -1,12 +1,24 @@
 from progr.threads.log_parser_thread import LogParserThread
+from progr.threads.log_stream_thread import LogStreamThread
+from progr.threads.log_tail_thread import LogTailThread
+from progr.threads.multi_file_parser_thread import MultiFileParserThread
 from progr.models.logs_table_model import LogsTableModel
+from progr.models.log_query import LogQuery
 from progr.models.rule_model import RuleModel
+from progr.models.log_parser_model import LogParser
+from progr.utils_app.parse_cache import get_parse_cache
 from progr.utils_app.logger import LOGGER
 import pandas as pd
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QMessageBox
 
 
+# ВАЖНО: названия колонок в DataFrame должны совпадать со списком headers
+LOG_HEADERS = ["date", "time", "source_ip", "method", "object", "protocol", "code", "size", "referer", "user_agent", "vhost",
+               "request_time", "upstream_response_time", "audit_type_id", "site_id",
+               "user_id", "guest_id", "event_type", "user_roles", "username", "source_file"]
+
+
 class ConstructorController:
     """
     Контроллер вкладки 'Конструктор':
@@ -18,18 +30,26 @@ class ConstructorController:
     def __init__(self):
         self._parser_thread = None
 
-    def start_log_parse(self, log_lines, log_type, thread_starter, on_finished, on_error):
+    def start_log_parse(self, log_lines, log_type, thread_starter, on_finished, on_error,
+                        cache_path=None, cache_fingerprint=None, on_stats=None, where=None, columns=None):
         """
         Запускает парсинг логов в отдельном потоке.
         :param log_lines: список строк логов
         :param log_type: 'apache' | 'nginx' | 'wordpress' | 'bitrix' (или др.)
+        :param cache_path: файл, из которого прочитаны строки (для дискового кэша)
+        :param cache_fingerprint: отпечаток файла до чтения строк (см. file_fingerprint)
         :param thread_starter: функция запуска потоков (обычно MainWindow.start)
         :param on_finished: коллбек pandas.DataFrame -> None
         :param on_error: коллбек str -> None
+        :param on_stats: коллбек ParseStats -> None (статистика разбора, до on_finished)
+        :param where: LogFilter — разбирать только подходящие записи
+        :param columns: разбирать только эти колонки (None — все)
         """
         try:
             LOGGER.info(f"[ConstructorController] start_log_parse: type={log_type}, lines={len(log_lines)}")
-            self._parser_thread = LogParserThread(log_lines, log_type)
+            self._parser_thread = LogParserThread(log_lines, log_type, cache_path=cache_path,
+                                                  cache_fingerprint=cache_fingerprint,
+                                                  where=where, columns=columns)
 
             def _done(df):
                 LOGGER.info(f"[ConstructorController] Парсинг завершён, записей: {len(df)}")
@@ -43,6 +63,8 @@ class ConstructorController:
 
             self._parser_thread.finished.connect(_done)
             self._parser_thread.error.connect(_err)
+            if on_stats is not None:
+                self._parser_thread.stats.connect(on_stats)
 
             # поток запускает контроллер
             thread_starter(self._parser_thread)
@@ -51,30 +73,190 @@ class ConstructorController:
             LOGGER.error(f"[ConstructorController] Не удалось запустить LogParserThread: {e}", exc_info=True)
             on_error(str(e))
 
+    def start_cached_parse(self, file_path, log_type, thread_starter, on_finished, on_miss, on_error):
+        """
+        Читает разбор файла из дискового кэша в отдельном потоке (без чтения
+        и парсинга файла; распаковка DataFrame не блокирует интерфейс).
+        :param on_finished: коллбек pandas.DataFrame -> None
+        :param on_miss: коллбек без аргументов — записи в кэше нет (или она битая)
+        :param on_error: коллбек str -> None
+        """
+        try:
+            self._parser_thread = LogParserThread([], log_type, cache_path=file_path, from_cache=True)
+
+            def _done(df):
+                self._parser_thread = None
+                if df is None:
+                    on_miss()
+                else:
+                    on_finished(df)
+
+            def _err(msg):
+                self._parser_thread = None
+                on_error(msg)
+
+            self._parser_thread.finished.connect(_done)
+            self._parser_thread.error.connect(_err)
+            thread_starter(self._parser_thread)
+        except Exception as e:
+            LOGGER.error(f"[ConstructorController] Не удалось запустить чтение кэша: {e}", exc_info=True)
+            on_error(str(e))
+
+    def has_cached_parse(self, file_path, log_type):
+        cache = get_parse_cache()
+        return cache is not None and bool(file_path) and cache.contains(file_path, LogParser.cache_tag(log_type))
+
+    def file_fingerprint(self, file_path):
+        """Отпечаток файла для ключа кэша (снимается до чтения) или None."""
+        cache = get_parse_cache()
+        if cache is None or not file_path:
+            return None
+        try:
+            return cache.fingerprint(file_path)
+        except OSError:
+            return None
+
+    def start_stream_parse(self, file_path, log_type, batch_size, thread_starter,
+                           on_batch, on_progress, on_finished, on_error):
+        """
+        Запускает потоковый парсинг файла: чтение и разбор идут пачками.
+        :param on_batch: коллбек pandas.DataFrame -> None (на каждую пачку)
+        :param on_progress: коллбек (bytes_read, total_bytes) -> None
+        :param on_finished: коллбек int (всего записей) -> None
+        :param on_error: коллбек str -> None
+        """
+        try:
+            LOGGER.info(f"[ConstructorController] start_stream_parse: type={log_type}, file={file_path}")
+            self._parser_thread = LogStreamThread(file_path, log_type, batch_size)
+
+            def _done(total):
+                LOGGER.info(f"[ConstructorController] Потоковый парсинг завершён, записей: {total}")
+                self._parser_thread = None
+                on_finished(total)
+
+            def _err(msg):
+                LOGGER.error(f"[ConstructorController] Ошибка потокового парсинга: {msg}")
+                self._parser_thread = None
+                on_error(msg)
+
+            self._parser_thread.batch_parsed.connect(on_batch)
+            self._parser_thread.progress.connect(on_progress)
+            self._parser_thread.finished.connect(_done)
+            self._parser_thread.error.connect(_err)
+
+            thread_starter(self._parser_thread)
+
+        except Exception as e:
+            LOGGER.error(f"[ConstructorController] Не удалось запустить LogStreamThread: {e}", exc_info=True)
+            on_error(str(e))
+
+    def start_multi_file_parse(self, file_paths, log_type, thread_starter,
+                               on_file_done, on_finished, on_error, max_workers=None):
+        """
+        Запускает параллельный парсинг нескольких файлов в пуле процессов.
+        :param on_file_done: коллбек (path, done, total, rows) -> None по каждому файлу
+        :param on_finished: коллбек pandas.DataFrame (все файлы, колонка source_file) -> None
+        :param on_error: коллбек str -> None
+        """
+        try:
+            LOGGER.info(f"[ConstructorController] start_multi_file_parse: type={log_type}, files={len(file_paths)}")
+            self._parser_thread = MultiFileParserThread(file_paths, log_type, max_workers=max_workers)
+
+            def _done(df):
+                LOGGER.info(f"[ConstructorController] Парсинг файлов завершён, записей: {len(df)}")
+                self._parser_thread = None
+                on_finished(df)
+
+            def _err(msg):
+                LOGGER.error(f"[ConstructorController] Ошибка парсинга файлов: {msg}")
+                self._parser_thread = None
+                on_error(msg)
+
+            self._parser_thread.file_done.connect(on_file_done)
+            self._parser_thread.finished.connect(_done)
+            self._parser_thread.error.connect(_err)
+
+            thread_starter(self._parser_thread)
+
+        except Exception as e:
+            LOGGER.error(f"[ConstructorController] Не удалось запустить MultiFileParserThread: {e}", exc_info=True)
+            on_error(str(e))
+
+    def start_tail(self, file_path, log_type, start_offset, thread_starter,
+                   on_rows, on_offset, on_error, once=False, interval_ms=1000,
+                   max_read_bytes=64 * 1024 * 1024):
+        """
+        Запускает слежение за файлом: новые строки после start_offset
+        разбираются и отдаются в on_rows(DataFrame) без повторного парсинга файла.
+        :param once: один опрос (ручное обновление) вместо постоянного слежения
+        :return: запущенный LogTailThread (для остановки через requestInterruption)
+        """
+        try:
+            LOGGER.info(f"[ConstructorController] start_tail: type={log_type}, file={file_path}, "
+                        f"offset={start_offset}, once={once}")
+            thread = LogTailThread(file_path, log_type, start_offset=start_offset,
+                                   interval_ms=interval_ms, max_read_bytes=max_read_bytes, once=once)
+
+            def _err(msg):
+                LOGGER.error(f"[ConstructorController] Ошибка слежения: {msg}")
+                on_error(msg)
+
+            thread.appended.connect(on_rows)
+            thread.offset_changed.connect(on_offset)
+            thread.error.connect(_err)
+
+            thread_starter(thread)
+            return thread
+
+        except Exception as e:
+            LOGGER.error(f"[ConstructorController] Не удалось запустить LogTailThread: {e}", exc_info=True)
+            on_error(str(e))
+            return None
+
     def create_logs_model(self, df: pd.DataFrame, parent=None):
         """
         Создаёт и возвращает модель таблицы логов (LogsTableModel).
         Контроллер нормализует столбцы и формирует rows/headers.
 
         КАК МЕНЯТЬ/ДОБАВЛЯТЬ СТОЛБЦЫ:
-          1) Измени список headers ниже (порядок = порядок в таблице).
+          1) Измени список LOG_HEADERS вверху модуля (порядок = порядок в таблице).
           2) В build_prefill_from_selection НИЖЕ поправь словарь col_to_field.
         """
-        if df is None:
-            df = pd.DataFrame()
+        headers = list(LOG_HEADERS)
+        model = LogsTableModel(df, headers, parent=parent)
 
-        # ВАЖНО: названия колонок в DataFrame должны совпадать со списком headers
-        headers = ["date", "time", "source_ip", "method", "object", "protocol", "code", "referer", "user_agent", "audit_type_id", "site_id",
-                    "user_id", "guest_id", "event_type", "user_roles", "username"]
+        LOGGER.info("[ConstructorController] Создана LogsTableModel: rows=%s, cols=%s",
+                    model.rowCount(), len(headers))
+        return model
 
-        safe_df = df.reindex(columns=headers, fill_value="")
+    def append_logs_df(self, model: LogsTableModel, df: pd.DataFrame) -> int:
+        """
+        Дописывает записи DataFrame в уже существующую модель (без пересборки).
+        Возвращает количество добавленных строк.
+        """
+        return model.append_frame(df)
 
-        rows = safe_df.values.tolist()
-        model = LogsTableModel(rows, headers, parent=parent)
+    def check_by_query(self, model: LogsTableModel, text: str, cols: list[int] | None = None) -> int:
+        """
+        Отмечает ячейки колонок cols (None — всех) в показываемых строках, подходящих
+        под запрос text (см. LogQuery). Возвращает число строк. Ошибка в запросе — ValueError.
+        """
+        query = LogQuery.parse(text)
+        if query.is_empty():
+            return 0
+        rows = model.check_mask(query.mask(model), cols)
+        LOGGER.info(f"[ConstructorController] Отметки по запросу {query}: {rows} строк")
+        return rows
 
-        LOGGER.info("[ConstructorController] Создана LogsTableModel: rows=%s, cols=%s",
-                    len(rows), len(headers))
-        return model
+    def filter_logs(self, model: LogsTableModel, text: str) -> int:
+        """
+        Фильтрует таблицу строкой запроса (см. LogQuery); пустая строка снимает фильтр.
+        Возвращает число показанных строк. Ошибка в запросе — ValueError.
+        """
+        query = LogQuery.parse(text)
+        shown = model.set_query(None if query.is_empty() else query)
+        LOGGER.info(f"[ConstructorController] Фильтр {query}: {shown} из {model.total_rows()} строк")
+        return shown
 
     def _headers_from_model(self, model: LogsTableModel) -> list[str]:
         """
@@ -90,9 +272,13 @@ class ConstructorController:
     def _get_checked_values_by_column(self, model: LogsTableModel, col: int) -> list[str]:
         """
         Универсально получаем отмеченные значения в колонке:
-        - Если у модели есть метод get_checked_values_by_column — используем его.
+        - Если у модели есть индекс отмеченных значений (checked_values) — берём из него
+          (уже без повторов и пустых, в порядке отметки).
+        - Иначе, если есть метод get_checked_values_by_column — используем его.
         - Иначе делаем безопасный обход вручную по CheckStateRole.
         """
+        if hasattr(model, "checked_values"):
+            return model.checked_values(col)
         if hasattr(model, "get_checked_values_by_column"):
             try:
                 return [str(v) for v in model.get_checked_values_by_column(col)]
@@ -140,8 +326,12 @@ class ConstructorController:
              "date": None,
              "time": None,
              "code": "rules_content",
+             "size": None,
              "referer": "rules_content",
              "user_agent": "rules_content",   
+             "vhost": None,
+             "request_time": None,
+             "upstream_response_time": None,
              "audit_type_id": None,
              "site_id": None,
              "user_id": None,
@@ -149,12 +339,16 @@ class ConstructorController:
              "event_type": None,
              "user_roles": None,
              "username": None,
+             "source_file": None,
         }
  
          # накапливаем значения по каждому полю диалога
         buckets: dict[str, list[str]] = {}
  
-        for col_index, col_name in enumerate(headers):
+        # только колонки с отметками, если модель их знает (индекс отмеченных значений)
+        columns = model.checked_columns() if hasattr(model, "checked_columns") else range(len(headers))
+        for col_index in columns:
+            col_name = headers[col_index]
             field_key = col_to_field.get(col_name)
             if not field_key:
                 continue
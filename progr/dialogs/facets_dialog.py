@@ -0,0 +1,113 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QTimer
+from progr.config_app.ui_config import UI_CONFIG
+
+
+class FacetsDialog(QDialog):
+    """
+    Немодальное окно статистики значений столбца таблицы логов:
+    самые частые значения с числом строк и долей, число различных значений,
+    доля пустых. Считается по показываемым строкам (с учётом фильтра)
+    и обновляется при дописывании строк и смене фильтра.
+
+    Двойной клик / «Фильтровать» — добавить значение в строку фильтра,
+    «Отметить» — отметить ячейки с этим значением во всех показываемых строках.
+    """
+
+    def __init__(self, parent, model, on_filter, on_check, column: int = 0):
+        """
+        :param model: LogsTableModel
+        :param on_filter: callback(column_name, value) — применить значение как фильтр
+        :param on_check: callback(column, value) — отметить ячейки с этим значением
+        """
+        super().__init__(parent)
+        settings = UI_CONFIG["facets_dialog"]
+        self.setWindowTitle(settings["title"])
+        self.setMinimumSize(settings["min_width"], settings["min_height"])
+        self.model = model
+        self.top = settings["top"]
+        self.on_filter = on_filter
+        self.on_check = on_check
+
+        self.layout = QVBoxLayout(self)
+
+        self.column_selector = QComboBox()
+        self.column_selector.addItems(model.headers())
+        self.column_selector.setCurrentIndex(column)
+        self.column_selector.currentIndexChanged.connect(self.refresh)
+        self.layout.addWidget(self.column_selector)
+
+        self.summary_label = QLabel()
+        self.layout.addWidget(self.summary_label)
+
+        self.values_table = QTableWidget(0, 3)
+        self.values_table.setHorizontalHeaderLabels(["Значение", "Строк", "%"])
+        self.values_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.values_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.values_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.values_table.cellDoubleClicked.connect(lambda row, _col: self._apply_filter())
+        self.layout.addWidget(self.values_table)
+
+        buttons = QHBoxLayout()
+        self.filter_button = QPushButton("Фильтровать")
+        self.filter_button.clicked.connect(self._apply_filter)
+        self.check_button = QPushButton("Отметить")
+        self.check_button.clicked.connect(self._apply_check)
+        buttons.addWidget(self.filter_button)
+        buttons.addWidget(self.check_button)
+        self.layout.addLayout(buttons)
+
+        # Пачки строк при слежении/потоковом разборе приходят часто — пересчёт не чаще раза в секунду
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(1000)
+        self._refresh_timer.timeout.connect(self.refresh)
+        # rowsAppended, а не rowsInserted: при постраничной подгрузке дописанные строки
+        # попадают в статистику сразу, хотя представлению ещё не отданы
+        model.rowsAppended.connect(self._schedule_refresh)
+        model.modelReset.connect(self._schedule_refresh)
+        model.destroyed.connect(self.close)
+
+        self.refresh()
+
+    def _schedule_refresh(self, *args):
+        if self.isVisible() and not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def refresh(self):
+        col = self.column_selector.currentIndex()
+        if col < 0 or col >= self.model.columnCount():
+            return
+        facet = self.model.facet(col, self.top)
+        rows = facet["rows"] or 1
+        self.summary_label.setText(
+            f"Строк: {facet['rows']}, различных значений: {facet['distinct']}, "
+            f"пустых: {facet['empty']} ({facet['empty_ratio']:.1%})")
+
+        self.values_table.setRowCount(len(facet["top"]))
+        for r, (value, count) in enumerate(facet["top"]):
+            self.values_table.setItem(r, 0, QTableWidgetItem(value))
+            for c, text in ((1, str(count)), (2, f"{count / rows:.1%}")):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.values_table.setItem(r, c, item)
+
+    def _selected_value(self) -> str | None:
+        row = self.values_table.currentRow()
+        if row < 0:
+            return None
+        return self.values_table.item(row, 0).text()
+
+    def _apply_filter(self):
+        value = self._selected_value()
+        if value is not None:
+            self.on_filter(self.column_selector.currentText(), value)
+            self.refresh()
+
+    def _apply_check(self):
+        value = self._selected_value()
+        if value is not None:
+            self.on_check(self.column_selector.currentIndex(), value)
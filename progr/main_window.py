@@ -85,10 +85,10 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Данные обновлены", 3000)
             return
 
-        # Для вкладки 'Конструктор'
-        if hasattr(current_widget, "_on_click_parse"):
+        # Для вкладки 'Конструктор': дочитываем только новые строки файла
+        if hasattr(current_widget, "reload_logs"):
             LOGGER.info("[MainWindow] Обновление данных во вкладке 'Конструктор'")
-            current_widget._on_click_parse()
+            current_widget.reload_logs()
             self.status_bar.showMessage("Логи обновлены", 3000)
             return
 
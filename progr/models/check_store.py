@@ -0,0 +1,223 @@
+import numpy as np
+
+
+class CheckStore:
+    """
+    Отметки (чекбоксы) ячеек таблицы, разреженно по колонкам.
+
+    Для каждой колонки хранится либо ничего (отметок нет), либо множество
+    номеров отмеченных строк, либо — когда отметок в колонке больше
+    SPARSE_LIMIT — булев массив на все строки. Память и все запросы
+    (ячейки, колонки, строки, снятие отметок) зависят от числа отметок,
+    а не от размера таблицы; плотный массив появляется только там,
+    где отмечена заметная часть колонки.
+    """
+
+    SPARSE_LIMIT = 4096
+
+    def __init__(self, columns: int = 0, rows: int = 0) -> None:
+        self.reset(columns, rows)
+
+    def reset(self, columns: int, rows: int) -> None:
+        """Пустое хранилище под таблицу columns x rows."""
+        self._rows = rows
+        self._cols: list[set[int] | np.ndarray | None] = [None] * columns
+
+    def extend(self, n: int) -> None:
+        """В таблицу дописано n строк (неотмеченных)."""
+        for c, col in enumerate(self._cols):
+            if isinstance(col, np.ndarray):
+                self._cols[c] = np.concatenate([col, np.zeros(n, dtype=bool)])
+        self._rows += n
+
+    # ------------- отдельные ячейки -------------
+    def is_checked(self, row: int, col: int) -> bool:
+        checked = self._cols[col]
+        if checked is None:
+            return False
+        if isinstance(checked, np.ndarray):
+            return bool(checked[row])
+        return row in checked
+
+    def set(self, row: int, col: int, value: bool) -> bool:
+        """Ставит/снимает отметку; True — если состояние изменилось."""
+        if self.is_checked(row, col) == value:
+            return False
+        checked = self._cols[col]
+        if isinstance(checked, np.ndarray):
+            checked[row] = value
+        elif value:
+            if checked is None:
+                checked = self._cols[col] = set()
+            checked.add(row)
+            if len(checked) > self.SPARSE_LIMIT:
+                self._cols[col] = self._dense(checked)
+        else:
+            checked.discard(row)
+            if not checked:
+                self._cols[col] = None
+        return True
+
+    # ------------- запросы -------------
+    def count(self, col: int | None = None) -> int:
+        """Число отметок в колонке col (None — во всей таблице)."""
+        cols = self._cols if col is None else [self._cols[col]]
+        return sum(int(c.sum()) if isinstance(c, np.ndarray) else len(c) for c in cols if c is not None)
+
+    def column_rows(self, col: int) -> np.ndarray:
+        """Отмеченные строки колонки по возрастанию."""
+        checked = self._cols[col]
+        if checked is None:
+            return np.empty(0, dtype=np.int64)
+        if isinstance(checked, np.ndarray):
+            return np.flatnonzero(checked)
+        return np.sort(np.fromiter(checked, dtype=np.int64, count=len(checked)))
+
+    def columns(self) -> list[int]:
+        """Колонки, где есть хотя бы одна отметка."""
+        return [c for c in range(len(self._cols)) if self.column_has(c)]
+
+    def column_has(self, col: int) -> bool:
+        checked = self._cols[col]
+        if isinstance(checked, np.ndarray):
+            return bool(checked.any())
+        return bool(checked)
+
+    def rows(self) -> np.ndarray:
+        """Строки, где есть хотя бы одна отметка, по возрастанию."""
+        parts = [self.column_rows(c) for c in self.columns()]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def row_has(self, row: int) -> bool:
+        return any(self.is_checked(row, c) for c in range(len(self._cols)) if self._cols[c] is not None)
+
+    def cells(self) -> list[tuple[int, int]]:
+        """Все отмеченные ячейки (row, col) построчно слева направо."""
+        rows, cols = [], []
+        for c in self.columns():
+            r = self.column_rows(c)
+            rows.append(r)
+            cols.append(np.full(len(r), c, dtype=np.int64))
+        if not rows:
+            return []
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        order = np.lexsort((cols, rows))
+        return list(zip(rows[order].tolist(), cols[order].tolist()))
+
+    # ------------- массовые изменения -------------
+    def clear(self) -> tuple[int, int, int, int] | None:
+        """
+        Снимает все отметки. Возвращает прямоугольник (row0, row1, col0, col1),
+        в котором были отметки (для одного dataChanged), или None, если отметок не было.
+        """
+        cols = self.columns()
+        if not cols:
+            self._cols = [None] * len(self._cols)
+            return None
+        rows = [self.column_rows(c) for c in cols]
+        rect = (min(int(r[0]) for r in rows), max(int(r[-1]) for r in rows), cols[0], cols[-1])
+        self._cols = [None] * len(self._cols)
+        return rect
+
+    def set_many(self, col: int, rows: np.ndarray, value: bool) -> np.ndarray:
+        """
+        Ставит/снимает отметку в колонке col сразу для строк rows (без повторов).
+        Возвращает строки, у которых состояние изменилось.
+        """
+        checked = self._cols[col]
+        if not len(rows) or (checked is None and not value):
+            return rows[:0]
+        if isinstance(checked, np.ndarray):
+            changed = rows[checked[rows] != value]
+            checked[changed] = value
+            self._store(col, checked)
+        elif value:
+            current = checked or set()
+            changed = rows[np.fromiter((r not in current for r in rows.tolist()), dtype=bool, count=len(rows))]
+            if len(current) + len(changed) > self.SPARSE_LIMIT:
+                mask = self._dense(current)
+                mask[changed] = True
+                self._store(col, mask)
+            else:
+                current.update(changed.tolist())
+                self._cols[col] = current
+        else:
+            changed = rows[np.fromiter((r in checked for r in rows.tolist()), dtype=bool, count=len(rows))]
+            checked.difference_update(changed.tolist())
+            if not checked:
+                self._cols[col] = None
+        return changed
+
+    def invert(self, col: int, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Меняет отметку на противоположную в колонке col для строк rows (без повторов).
+        Возвращает (отмеченные строки, снятые строки).
+        """
+        checked = self._cols[col]
+        mask = checked if isinstance(checked, np.ndarray) else self._dense(checked or ())
+        before = mask[rows]
+        mask[rows] = ~before
+        self._store(col, mask)
+        return rows[~before], rows[before]
+
+    def _store(self, col: int, mask: np.ndarray) -> None:
+        """Сохраняет отметки колонки из маски в подходящем виде (ничего / множество / маска)."""
+        count = int(mask.sum())
+        if not count:
+            self._cols[col] = None
+        elif count <= self.SPARSE_LIMIT:
+            self._cols[col] = set(np.flatnonzero(mask).tolist())
+        else:
+            self._cols[col] = mask
+
+    def _dense(self, rows) -> np.ndarray:
+        mask = np.zeros(self._rows, dtype=bool)
+        mask[np.fromiter(rows, dtype=np.int64, count=len(rows))] = True
+        return mask
+
+
+class CheckedValues:
+    """
+    Индекс отмеченных значений по колонкам: код значения -> число отмеченных
+    ячеек с этим значением, в порядке первой отметки (порядок вставки dict).
+    Ведётся при каждом изменении отметок, поэтому список отмеченных значений
+    колонки (без повторов) строится за время, пропорциональное числу
+    различных отмеченных значений, без обхода строк таблицы.
+    """
+
+    def __init__(self, columns: int = 0) -> None:
+        self.reset(columns)
+
+    def reset(self, columns: int) -> None:
+        self._cols: list[dict[int, int]] = [{} for _ in range(columns)]
+
+    def clear(self) -> None:
+        for values in self._cols:
+            values.clear()
+
+    def add(self, col: int, codes: np.ndarray) -> None:
+        """Отмечены ячейки с кодами значений codes (в порядке строк)."""
+        values = self._cols[col]
+        uniq, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        for i in np.argsort(first, kind="stable").tolist():
+            code = int(uniq[i])
+            values[code] = values.get(code, 0) + int(counts[i])
+
+    def remove(self, col: int, codes: np.ndarray) -> None:
+        """Сняты отметки с ячеек с кодами значений codes."""
+        values = self._cols[col]
+        uniq, counts = np.unique(codes, return_counts=True)
+        for code, count in zip(uniq.tolist(), counts.tolist()):
+            left = values.get(code, 0) - count
+            if left > 0:
+                values[code] = left
+            else:
+                values.pop(code, None)
+
+    def codes(self, col: int) -> list[int]:
+        """Коды отмеченных значений колонки без повторов, в порядке первой отметки."""
+        return list(self._cols[col])
+
+    def columns(self) -> list[int]:
+        """Колонки, где есть отмеченные ячейки."""
+        return [c for c, values in enumerate(self._cols) if values]
@@ -0,0 +1,272 @@
+import ipaddress
+import re
+from itertools import compress
+
+import numpy as np
+import pandas as pd
+
+from progr.utils_app.apache_time import NAT, date_label_ns, time_label_ns, wall_clock
+from progr.utils_app.parse_stats import stage
+
+
+class LogFilter:
+    """
+    Условия отбора записей лога (все условия через И):
+    - ips: адреса и/или сети CIDR ('203.0.113.7', '10.0.0.0/8', '2001:db8::/32');
+    - status: (min, max) кода ответа включительно, любая граница может быть None;
+    - methods: HTTP-методы ('GET', 'POST' ...);
+    - time_range: (from, to) — datetime/Timestamp/строка. Граница с поясом — момент
+      (сравнивается с timestamp в UTC), без пояса — по часам лога, т. е. с датой
+      и временем записи, как они показаны в таблице (так же, как time>=... в LogQuery);
+    - object_contains: подстрока в object (URI запроса).
+
+    Проверяется на трёх уровнях:
+    - prefilter(lines) — дешёвое необходимое условие по сырой строке
+      (подстрока/короткая регулярка в C), отсекает строки до полной регулярки;
+    - mask_raw(raw) — по сырым группам регулярки, до разбора времени и типов;
+    - mask(df) — по разобранному DataFrame (любой тип лога).
+    Значения колонок проверяются один раз на уникальное значение (категории/factorize).
+    """
+
+    def __init__(self, ips=(), status: tuple[int | None, int | None] | None = None, methods=(),
+                 time_range=None, object_contains: str | None = None) -> None:
+        self.ips = frozenset(str(ip).strip() for ip in ips if "/" not in str(ip))
+        self.networks = tuple(ipaddress.ip_network(str(ip).strip(), strict=False) for ip in ips if "/" in str(ip))
+        self.status = tuple(status) if status is not None else None
+        self.methods = frozenset(m.strip().upper() for m in methods if m.strip())
+        self.time_range = self._time_range(time_range)
+        self.object_contains = object_contains or None
+        self._prefilter_re = self._build_prefilter()
+
+    def __repr__(self) -> str:
+        return (f"LogFilter(ips={sorted(self.ips)}, networks={[str(n) for n in self.networks]}, "
+                f"status={self.status}, methods={sorted(self.methods)}, time_range={self.time_range}, "
+                f"object_contains={self.object_contains!r})")
+
+    def is_empty(self) -> bool:
+        return not (self.ips or self.networks or self.status or self.methods
+                    or self.time_range or self.object_contains)
+
+    @property
+    def needs_time(self) -> bool:
+        return self.time_range is not None
+
+    # ------------- уровень сырых строк -------------
+    def prefilter(self, lines) -> list[str]:
+        """
+        Строки, которые могут удовлетворять фильтру. Проверки только необходимые:
+        адрес/префикс сети встречается в строке, подстрока object есть в строке.
+        """
+        if self.object_contains:
+            sub = self.object_contains
+            lines = [line for line in lines if sub in line]
+        if isinstance(self._prefilter_re, str):
+            sub = self._prefilter_re
+            lines = [line for line in lines if sub in line]
+        elif self._prefilter_re is not None:
+            lines = list(filter(self._prefilter_re.search, lines))
+        return lines if isinstance(lines, list) else list(lines)
+
+    def prefilter_mask(self, lines) -> np.ndarray:
+        """Маска строк, прошедших prefilter (когда вместе со строками отбираются их позиции)."""
+        mask = np.ones(len(lines), dtype=bool)
+        for sub in (self.object_contains, self._prefilter_re if isinstance(self._prefilter_re, str) else None):
+            if sub:
+                mask &= np.fromiter((sub in line for line in lines), dtype=bool, count=len(lines))
+        if self._prefilter_re is not None and not isinstance(self._prefilter_re, str):
+            search = self._prefilter_re.search
+            mask &= np.fromiter((search(line) is not None for line in lines), dtype=bool, count=len(lines))
+        return mask
+
+    def _build_prefilter(self) -> re.Pattern | str | None:
+        """
+        «В строке есть один из адресов»: точные адреса и текстовые префиксы
+        IPv4-сетей (10.1.0.0/16 -> '10.1.'). Один фрагмент — подстрока (быстрее
+        регулярки), несколько — регулярка-альтернатива из литералов (без
+        просмотра назад: он на порядок замедляет поиск, а условие и так только
+        необходимое). Для IPv6-сетей и сетей шире /8 текстового префикса нет —
+        тогда предфильтра по адресу нет.
+        """
+        if not (self.ips or self.networks):
+            return None
+        fragments = list(self.ips)
+        for net in self.networks:
+            if net.version != 4 or net.prefixlen < 8:
+                return None
+            octets = str(net.network_address).split(".")[:net.prefixlen // 8]
+            fragments.append(".".join(octets) + ("." if len(octets) < 4 else ""))
+        if len(fragments) == 1:
+            return fragments[0]
+        return re.compile("|".join(re.escape(f) for f in sorted(fragments, key=len, reverse=True)))
+
+    # ------------- уровень колонок -------------
+    def mask_raw(self, raw: pd.DataFrame) -> np.ndarray:
+        """Маска по сырым строковым группам (source_ip, code, method, object), без времени."""
+        mask = np.ones(len(raw), dtype=bool)
+        if (self.ips or self.networks) and "source_ip" in raw:
+            mask &= _unique_mask(raw["source_ip"], self._ip_ok)
+        if self.status and "code" in raw:
+            mask &= _unique_mask(raw["code"], self._status_ok)
+        if self.methods and "method" in raw:
+            mask &= _unique_mask(raw["method"], lambda m: str(m).upper() in self.methods)
+        if self.object_contains and "object" in raw:
+            sub = self.object_contains
+            mask &= _unique_mask(raw["object"], lambda o: sub in str(o))
+        return mask
+
+    def mask_time(self, ts: pd.Series, dates=None, times=None) -> np.ndarray:
+        """
+        Маска по моменту времени записи; NaT не проходит. Граница с поясом
+        сравнивается с ts (timestamp, datetime64[ns, UTC]), без пояса — с датой
+        dates и временем times записи (по часам лога). Без dates/times граница
+        без пояса считается UTC.
+        """
+        if self.time_range is None:
+            return np.ones(len(ts), dtype=bool)
+        stamps = pd.DatetimeIndex(ts).asi8
+        local = None
+        naive = any(b is not None and b.tzinfo is None for b in self.time_range)
+        if naive and dates is not None and times is not None:
+            local = wall_clock(_unique_ns(dates, date_label_ns), _unique_ns(times, time_label_ns))
+        mask = np.ones(len(ts), dtype=bool)
+        for bound, compare in zip(self.time_range, (np.greater_equal, np.less_equal)):
+            if bound is None:
+                continue
+            values = local if bound.tzinfo is None and local is not None else stamps
+            mask &= (values != NAT) & compare(values, bound.value)
+        return mask
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Маска по разобранному DataFrame любого типа лога. Условие по колонке,
+        которой в DataFrame нет, запись не пропускает.
+        """
+        for col, active in (("source_ip", self.ips or self.networks), ("code", self.status),
+                            ("method", self.methods), ("object", self.object_contains)):
+            if active and col not in df:
+                return np.zeros(len(df), dtype=bool)
+        mask = self.mask_raw(df)
+        if self.time_range is not None:
+            ts = self._timestamps(df)
+            if ts is None:
+                return np.zeros(len(df), dtype=bool)
+            mask &= self.mask_time(ts, df.get("date"), df.get("time"))
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Записи DataFrame, прошедшие фильтр (индекс сбрасывается)."""
+        mask = self.mask(df)
+        return df if mask.all() else df[mask].reset_index(drop=True)
+
+    # ------------- проверки значений -------------
+    def _ip_ok(self, value) -> bool:
+        s = str(value).strip()
+        if s in self.ips:
+            return True
+        if not self.networks:
+            return False
+        try:
+            addr = ipaddress.ip_address(s)
+        except ValueError:
+            return False
+        return any(addr.version == net.version and addr in net for net in self.networks)
+
+    def _status_ok(self, value) -> bool:
+        try:
+            code = int(value)
+        except (TypeError, ValueError):
+            return False
+        lo, hi = self.status
+        return (lo is None or code >= lo) and (hi is None or code <= hi)
+
+    @staticmethod
+    def _time_range(time_range):
+        if not time_range:
+            return None
+        bounds = []
+        for value in time_range:
+            if value is None or value == "":
+                bounds.append(None)
+                continue
+            ts = pd.Timestamp(value)
+            bounds.append(ts if ts.tzinfo is None else ts.tz_convert("UTC"))
+        return tuple(bounds) if any(b is not None for b in bounds) else None
+
+    @staticmethod
+    def _timestamps(df: pd.DataFrame) -> pd.Series | None:
+        """timestamp или (для Bitrix) date + time как UTC."""
+        if "timestamp" in df:
+            return df["timestamp"]
+        if "date" in df and "time" in df:
+            text = df["date"].astype(str) + " " + df["time"].astype(str)
+            codes, uniques = pd.factorize(text)
+            parsed = pd.to_datetime(pd.Series(uniques, dtype=object), utc=True, errors="coerce")
+            return pd.Series(parsed.array.take(codes, allow_fill=True), index=df.index)
+        return None
+
+
+def _unique_mask(values: pd.Series, predicate) -> np.ndarray:
+    """predicate для каждого уникального значения колонки, разложенный по строкам (пропуск -> False)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        uniques = values.cat.categories
+        codes = values.cat.codes.to_numpy()
+    else:
+        codes, uniques = pd.factorize(values)
+    # Последний элемент — для кода -1 (пропуск)
+    lookup = np.fromiter((bool(predicate(u)) for u in uniques), dtype=bool, count=len(uniques))
+    return np.append(lookup, False).take(codes)
+
+
+def _unique_ns(values, parse) -> np.ndarray:
+    """parse(str) -> int64 для каждого уникального значения, разложенный по строкам (пропуск -> NAT)."""
+    codes, uniques = pd.factorize(values)
+    # Последний элемент — для кода -1 (пропуск)
+    parsed = np.fromiter((parse(str(u)) for u in uniques), dtype=np.int64, count=len(uniques))
+    return np.append(parsed, NAT).take(codes)
+
+
+def prefilter_lines(where: LogFilter | None, lines, stats=None, positions=None):
+    """
+    Предфильтр строк перед регуляркой; отброшенные строки учитываются в stats (ParseStats).
+    positions — позиции строк в файле (np.ndarray или None), отбираются вместе
+    со строками. Возвращает (строки, позиции).
+    """
+    if where is None or where.is_empty():
+        return lines, positions
+    with stage(stats, "prefilter"):
+        if positions is None:
+            kept = where.prefilter(lines)
+        else:
+            lines = lines if isinstance(lines, list) else list(lines)
+            mask = where.prefilter_mask(lines)
+            kept = list(compress(lines, mask))
+            positions = positions[mask]
+    if stats is not None:
+        stats.lines += len(lines) - len(kept)
+        stats.count_filtered(len(lines), len(kept))
+    return kept, positions
+
+
+def matched_positions(positions, matches) -> np.ndarray | None:
+    """Позиции строк, совпавших с регуляркой (matches — результаты match/search по строкам)."""
+    if positions is None:
+        return None
+    return positions[np.fromiter((m is not None for m in matches), dtype=bool, count=len(matches))]
+
+
+def keep_rows(df: pd.DataFrame, mask: np.ndarray, stats=None) -> pd.DataFrame:
+    """Строки DataFrame по маске с новым индексом 0..n-1; отброшенные учитываются в stats."""
+    if mask.all():
+        return df
+    if stats is not None:
+        stats.count_filtered(len(mask), int(mask.sum()))
+        stats.matched -= len(mask) - int(mask.sum())
+    return df[mask].reset_index(drop=True)
+
+
+def project(all_columns, columns) -> list[str]:
+    """Колонки результата: all_columns в их порядке, ограниченные списком columns (None — все)."""
+    if columns is None:
+        return list(all_columns)
+    wanted = set(columns)
+    return [c for c in all_columns if c in wanted]
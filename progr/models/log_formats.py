@@ -0,0 +1,304 @@
+import functools
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+from progr.models.log_filter import keep_rows, matched_positions, prefilter_lines, project
+from progr.models.log_schema import apply_schema
+from progr.utils_app.parse_stats import stage
+
+# Переменная nginx -> колонка результата. Колонки с '@' — служебные:
+# из них собираются несколько колонок (время, строка запроса).
+# Неизвестные переменные попадают в колонку с именем переменной.
+NGINX_VARIABLES = {
+    "remote_addr": "source_ip",
+    "realip_remote_addr": "source_ip",
+    "remote_user": "remote_user",
+    "time_local": "@time_local",
+    "time_iso8601": "@time_iso8601",
+    "request": "@request",
+    "request_method": "method",
+    "request_uri": "object",
+    "uri": "object",
+    "server_protocol": "protocol",
+    "status": "code",
+    "body_bytes_sent": "size",
+    "bytes_sent": "size",
+    "http_referer": "referer",
+    "http_user_agent": "user_agent",
+    "host": "vhost",
+    "http_host": "vhost",
+    "server_name": "vhost",
+    "request_time": "request_time",
+    "upstream_response_time": "upstream_response_time",
+    "http_x_forwarded_for": "forwarded_for",
+}
+
+# Директива Apache LogFormat -> переменная nginx с тем же смыслом
+APACHE_DIRECTIVES = {
+    "h": "remote_addr",
+    "a": "remote_addr",
+    "l": "remote_logname",
+    "u": "remote_user",
+    "t": "time_local",
+    "r": "request",
+    "s": "status",
+    "b": "body_bytes_sent",
+    "B": "body_bytes_sent",
+    "O": "bytes_sent",
+    "v": "server_name",
+    "V": "host",
+    "m": "request_method",
+    "U": "uri",
+    "H": "server_protocol",
+    "T": "request_time",
+    "D": "request_time_us",
+}
+
+APACHE_HEADERS = {
+    "referer": "http_referer",
+    "user-agent": "http_user_agent",
+    "host": "http_host",
+    "x-forwarded-for": "http_x_forwarded_for",
+}
+
+# Регулярки для переменных со строгим форматом; остальные — по контексту
+# (до закрывающей кавычки/скобки или до пробела)
+_FRAGMENTS = {
+    "@time_local": r"[^\]]+",
+    "@time_iso8601": r"\S+",
+    "@request": r'(?P<method>[A-Z]+) (?P<object>\S+) (?P<protocol>[^"\s]*)',
+    "code": r"\d{3}",
+    "upstream_response_time": r"-|[\d.]+(?:\s*[,:]\s*[\d.]+)*",
+}
+
+# Стандартные колонки access-лога (как у LogParser.parse_apache_nginx)
+ACCESS_LOG_COLUMNS = [
+    "date", "time", "source_ip", "method", "object", "protocol", "proto", "proto_ver",
+    "code", "size", "referer", "user_agent", "timestamp",
+]
+
+_NGINX_VAR_RE = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+_APACHE_DIRECTIVE_RE = re.compile(r"%(?:!?\d+(?:,\d+)*)?[<>]?(?:\{([^}]*)\})?([a-zA-Z%])")
+
+
+class CompiledLogFormat:
+    """
+    Формат access-лога, скомпилированный в одну регулярку + преобразователи колонок.
+    Создаётся через compile_log_format (кэшируется по строке формата).
+    """
+
+    def __init__(self, syntax: str, fmt: str, tokens: list[tuple[str, str]]) -> None:
+        self.syntax = syntax
+        self.format = fmt
+        self.digest = hashlib.blake2b(f"{syntax}:{fmt}".encode("utf-8"), digest_size=6).hexdigest()
+
+        parts = ["^"]
+        self.columns: list[str] = []
+        for i, (kind, value) in enumerate(tokens):
+            if kind == "lit":
+                parts.append(re.escape(value))
+                continue
+            column = NGINX_VARIABLES.get(value, value)
+            following = next((v[:1] for k, v in tokens[i + 1:] if k == "lit" and v), "")
+            fragment = _FRAGMENTS.get(column) or self._context_fragment(following)
+            if column == "@request":
+                if "method" in self.columns:
+                    fragment = r'[^"]*'
+                else:
+                    self.columns += ["method", "object", "protocol"]
+                parts.append(fragment)
+                continue
+            if column in self.columns:
+                parts.append(f"(?:{fragment})")  # повтор переменной — без захвата
+                continue
+            self.columns.append(column)
+            parts.append(f"(?P<{self._group(column)}>{fragment})")
+        self.pattern = re.compile("".join(parts))
+        self.extra_columns = [c for c in self._output_columns() if c not in ACCESS_LOG_COLUMNS]
+
+    @staticmethod
+    def _context_fragment(following: str) -> str:
+        if following == '"':
+            return r'[^"]*'
+        if following == "]":
+            return r"[^\]]*"
+        return r"\S*"
+
+    @staticmethod
+    def _group(column: str) -> str:
+        return column.replace("@", "_")
+
+    def _output_columns(self) -> list[str]:
+        out = []
+        for c in self.columns:
+            if c in ("@time_local", "@time_iso8601"):
+                continue
+            out.append("request_time" if c == "request_time_us" else c)
+        return out
+
+    def parse(self, lines, time_converter, split_protocol, stats=None, where=None, columns=None,
+              positions=None) -> pd.DataFrame:
+        """
+        Строки лога -> DataFrame: стандартные колонки access-лога (отсутствующие
+        в формате пустые) плюс дополнительные (vhost, request_time ...).
+        stats — ParseStats для учёта строк, отказов и времени этапов (или None);
+        where/columns/positions — LogFilter, проекция и позиции строк, как в
+        LogParser.parse_apache_nginx.
+        """
+        lines, positions = prefilter_lines(where, lines, stats, positions)
+        with stage(stats, "regex"):
+            matches = list(map(self.pattern.match, lines))
+            groups = [m.groups() for m in matches if m]
+        if stats is not None:
+            stats.count_matches(lines, matches)
+        names = list(self.pattern.groupindex)
+        with stage(stats, "frame"):
+            raw = pd.DataFrame(groups, columns=names) if groups else pd.DataFrame(columns=names)
+            if positions is not None:
+                raw["_pos"] = matched_positions(positions, matches)
+            if where is not None:
+                raw = keep_rows(raw, where.mask_raw(raw), stats)
+        wanted = project(ACCESS_LOG_COLUMNS + self.extra_columns, columns)
+        with stage(stats, "conversion"):
+            out = self._convert(raw, time_converter, split_protocol, wanted, where is not None and where.needs_time)
+        with stage(stats, "frame"):
+            df = self._frame(out, len(raw), wanted, columns)
+            if positions is not None:
+                df["source_pos"] = raw["_pos"].to_numpy(dtype=np.int64)
+            if where is not None and where.needs_time:
+                df = keep_rows(df, where.mask_time(out["timestamp"], out["date"], out["time"]) if "timestamp" in out
+                               else np.zeros(len(df), dtype=bool), stats)
+            return df
+
+    def _convert(self, raw: pd.DataFrame, time_converter, split_protocol, wanted: list[str], need_time: bool) -> dict:
+        out = {}
+        if need_time or {"date", "time", "timestamp"} & set(wanted):
+            if "_time_local" in raw:
+                out["date"], out["time"], out["timestamp"] = time_converter.convert(raw["_time_local"])
+            elif "_time_iso8601" in raw:
+                out["date"], out["time"], out["timestamp"] = self._iso_time(raw["_time_iso8601"])
+        for col in raw.columns:
+            if not col.startswith("_"):
+                out[col] = raw[col]
+        if "protocol" in out and {"proto", "proto_ver"} & set(wanted):
+            codes, uniques = pd.factorize(out["protocol"])
+            pairs = [split_protocol(u) for u in uniques]
+            out["proto"] = np.array([p[0] for p in pairs], dtype=object).take(codes)
+            out["proto_ver"] = np.array([p[1] for p in pairs], dtype=object).take(codes)
+
+        if "request_time" in wanted:
+            if "request_time_us" in out:
+                out["request_time"] = pd.to_numeric(out.pop("request_time_us"), errors="coerce").astype(float) / 1_000_000
+            elif "request_time" in out:
+                out["request_time"] = pd.to_numeric(out["request_time"], errors="coerce").astype(float)
+        if "upstream_response_time" in out and "upstream_response_time" in wanted:
+            out["upstream_response_time"] = self._sum_times(out["upstream_response_time"])
+        return out
+
+    def _frame(self, out: dict, n: int, wanted: list[str], columns=None) -> pd.DataFrame:
+        df = pd.DataFrame(index=pd.RangeIndex(n))
+        for col in wanted:
+            if col in out:
+                values = out[col]
+                df[col] = values.to_numpy() if isinstance(values, pd.Series) and col != "timestamp" else values
+            elif col == "timestamp":
+                df[col] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+            else:
+                df[col] = pd.Series(None, index=df.index, dtype=object)
+
+        apply_schema(df, "Nginx", columns)
+        if "vhost" in df:
+            df["vhost"] = df["vhost"].astype("category")
+        return df
+
+    @staticmethod
+    def _iso_time(raw: pd.Series) -> tuple[np.ndarray, np.ndarray, pd.Series]:
+        """'2025-07-27T07:55:25+07:00' -> (дата, время, момент UTC) по уникальным значениям."""
+        codes, uniques = pd.factorize(raw)
+        u = pd.Series(uniques, dtype=object)
+        # Последний элемент — для кода -1 (пропуск)
+        parsed = pd.to_datetime(u, utc=True, errors="coerce", format="ISO8601").dt.tz_localize(None)
+        stamps = parsed.to_numpy(dtype="datetime64[ns]").view("int64")
+        stamps = np.append(stamps, np.iinfo(np.int64).min)
+        dates = np.append(u.str.slice(0, 10).to_numpy(dtype=object), "")
+        times = np.append(u.str.slice(11, 19).to_numpy(dtype=object), "")
+        ts = pd.Series(stamps.take(codes).view("datetime64[ns]")).dt.tz_localize("UTC")
+        return dates.take(codes), times.take(codes), ts
+
+    @staticmethod
+    def _sum_times(raw: pd.Series) -> pd.Series:
+        """'0.010, 0.004 : 0.001' (несколько апстримов) -> сумма; '-' -> NaN."""
+        codes, uniques = pd.factorize(raw)
+        values = []
+        for u in uniques:
+            try:
+                values.append(sum(float(p) for p in re.split(r"[,:]", u) if p.strip() not in ("", "-")) if u != "-"
+                              else np.nan)
+            except ValueError:
+                values.append(np.nan)
+        return pd.Series(np.asarray(values + [np.nan], dtype=float).take(codes))
+
+
+@functools.lru_cache(maxsize=64)
+def compile_log_format(syntax: str, fmt: str) -> CompiledLogFormat:
+    """
+    Компилирует nginx log_format ('nginx') или Apache LogFormat ('apache').
+    Результат кэшируется по (syntax, fmt): одна компиляция на процесс.
+    """
+    if syntax == "nginx":
+        return CompiledLogFormat(syntax, fmt, _nginx_tokens(fmt))
+    if syntax == "apache":
+        return CompiledLogFormat(syntax, fmt, _apache_tokens(fmt))
+    raise ValueError(f"Неизвестный синтаксис формата лога: {syntax}")
+
+
+def _nginx_tokens(fmt: str) -> list[tuple[str, str]]:
+    """log_format: допускается директива целиком ("log_format main '...' '...';") или только строка."""
+    fmt = fmt.strip()
+    if fmt.startswith("log_format"):
+        fmt = "".join(re.findall(r"'([^']*)'", fmt))
+    tokens, pos = [], 0
+    for m in _NGINX_VAR_RE.finditer(fmt):
+        if m.start() > pos:
+            tokens.append(("lit", fmt[pos:m.start()]))
+        tokens.append(("var", m.group(1) or m.group(2)))
+        pos = m.end()
+    if pos < len(fmt):
+        tokens.append(("lit", fmt[pos:]))
+    return tokens
+
+
+def _apache_tokens(fmt: str) -> list[tuple[str, str]]:
+    """LogFormat: допускается директива целиком ('LogFormat "%h ..." combined') или только строка."""
+    fmt = fmt.strip()
+    if fmt.startswith("LogFormat"):
+        m = re.search(r'"((?:[^"\\]|\\.)*)"', fmt)
+        fmt = m.group(1) if m else ""
+        fmt = fmt.replace('\\"', '"')
+    tokens, pos = [], 0
+    for m in _APACHE_DIRECTIVE_RE.finditer(fmt):
+        if m.start() > pos:
+            tokens.append(("lit", fmt[pos:m.start()]))
+        arg, directive = m.group(1), m.group(2)
+        if directive == "%":
+            tokens.append(("lit", "%"))
+        elif directive == "t" and arg is None:
+            # %t пишется вместе с квадратными скобками: [27/Jul/2025:07:55:25 +0700]
+            tokens += [("lit", "["), ("var", "time_local"), ("lit", "]")]
+        elif directive == "i" and arg is not None:
+            header = arg.lower()
+            tokens.append(("var", APACHE_HEADERS.get(header, "http_" + re.sub(r"\W", "_", header))))
+        elif directive in APACHE_DIRECTIVES:
+            tokens.append(("var", APACHE_DIRECTIVES[directive]))
+        elif arg is not None:
+            # аргумент — часть имени, как у %{..}i: %{A}e и %{B}e — разные колонки
+            tokens.append(("var", f"apache_{directive}_" + re.sub(r"\W", "_", arg.lower())))
+        else:
+            tokens.append(("var", f"apache_{directive}"))
+        pos = m.end()
+    if pos < len(fmt):
+        tokens.append(("lit", fmt[pos:]))
+    return tokens
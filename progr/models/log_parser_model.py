@@ -1,9 +1,87 @@
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from progr.config_app.parser_config import PARSER_CONFIG
+from progr.models.log_filter import LogFilter, keep_rows, matched_positions, prefilter_lines, project
+from progr.models.log_formats import CompiledLogFormat, compile_log_format
+from progr.models.log_schema import apply_schema, concat_frames
+from progr.utils_app.apache_time import MONTHS, ApacheTimeConverter
+from progr.utils_app.line_index import LineIndex
+from progr.utils_app.log_reader import SourceLines, iter_line_batches
+from progr.utils_app.sql_values import SqlValuesTokenizer, find_sql_split_points, iter_sql_dump, iter_sql_tuples
+from progr.utils_app.parse_cache import get_parse_cache
+from progr.utils_app.parse_stats import REJECT_BROKEN_TUPLE, ParseStats, stage
 from progr.utils_app.logger import LOGGER
 
 
+def parse_log_file(file_path: str, log_type: str, batch_size: int = 50000) -> pd.DataFrame:
+    """
+    Читает и парсит один файл целиком (с распаковкой, если он сжат).
+    Функция уровня модуля — её можно отдавать в ProcessPoolExecutor.
+    Повторный разбор того же файла берётся из дискового кэша.
+    В результат добавляется колонка source_file с именем файла.
+    """
+    cache = get_parse_cache()
+    tag = LogParser.cache_tag(log_type)
+    fingerprint = cache.fingerprint(file_path) if cache is not None else None
+    df = cache.load(file_path, tag) if cache is not None else None
+
+    if df is None:
+        parser = LogParser()
+        if log_type in LogParser.LINE_BASED_TYPES:
+            frames = [parser.parse(lines, log_type) for lines, _, _ in iter_line_batches(file_path, batch_size)]
+            df = concat_frames(frames) if frames else parser.parse([], log_type)
+        else:
+            # SQL-дамп: потоковый токенизатор, кортежи переходят через границы кусков
+            frames = [frame for frame, _, _ in parser.iter_sql_dump_frames(file_path, log_type)]
+            df = concat_frames(frames) if frames else parser.parse([], log_type)
+        if cache is not None:
+            cache.store(file_path, tag, df, fingerprint=fingerprint)
+
+    df["source_file"] = pd.Series(os.path.basename(file_path), index=df.index, dtype="category")
+    return df
+
+
+def _parse_lines_chunk(lines, log_type: str, where=None, columns=None,
+                       offsets=None) -> tuple[pd.DataFrame, ParseStats]:
+    """Кусок строк для процесса пула (параллельный parse) -> (DataFrame, статистика куска)."""
+    parser = LogParser(ParseStats(log_type))
+    return parser.parse(lines, log_type, workers=1, where=where, columns=columns, offsets=offsets), parser.stats
+
+
+def _parse_file_range(file_path: str, start: int, stop: int, log_type: str,
+                      where=None, columns=None) -> tuple[pd.DataFrame, ParseStats]:
+    """
+    Кусок файла [start, stop) в байтах для процесса пула: процесс сам читает
+    свой диапазон, строки между процессами не пересылаются.
+    """
+    parser = LogParser(ParseStats(log_type))
+    with parser.stats.stage("read"):
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            data = f.read(stop - start)
+        lines = SourceLines.from_bytes(data, start)
+    return parser.parse(lines, log_type, workers=1, where=where, columns=columns), parser.stats
+
+
+def _parse_sql_range(file_path: str, start: int, stop: int, log_type: str, table: str | None):
+    """
+    Кусок SQL-дампа [start, stop) в байтах для процесса пула.
+    Возвращает (DataFrame, кусок кончился на границе кортежей, статистика куска).
+    """
+    parser = LogParser(ParseStats(log_type))
+    with parser.stats.stage("read"):
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            data = f.read(stop - start)
+        text = data.decode("utf-8", errors="ignore")
+    df, at_boundary = parser.parse_sql_segment(text, log_type, table)
+    return df, at_boundary, parser.stats
+
+
 class LogParser:
     """
     Модель для парсинга логов различных форматов:
@@ -11,6 +89,7 @@ class LogParser:
     - Nginx
     - WordPress
     - Bitrix
+    - пользовательские форматы access-логов из PARSER_CONFIG["log_formats"]
     """
 
     # Регулярка для Apache/Nginx access log (Common Log Format + User-Agent)
@@ -20,148 +99,355 @@ class LogParser:
         r'(?P<code>\d{3}) (?P<size>\S+) "(?P<referer>[^"]*)" "(?P<agent>[^"]*)"'
     )
 
-    def parse_apache_nginx(self, lines):
+    # Пользовательские форматы access-логов (nginx log_format / Apache LogFormat)
+    CUSTOM_FORMAT_TYPES = tuple(PARSER_CONFIG["log_formats"])
+    # Типы, которые можно разбирать независимо по строкам (потоково, пачками)
+    LINE_BASED_TYPES = ("Apache", "Nginx") + CUSTOM_FORMAT_TYPES
+    # SQL-выгрузки (INSERT ... VALUES): потоково читаются кусками текста
+    SQL_DUMP_TYPES = ("Wordpress", "Bitrix")
+
+    # Версия формата результата: увеличивать при любом изменении колонок/значений,
+    # иначе из дискового кэша вернутся разборы старой версии
+    PARSER_VERSION = 5
+
+    def __init__(self, stats: ParseStats | None = None) -> None:
+        # Кэш разбора времени Apache/Nginx живёт вместе с парсером (между пачками)
+        self._time = ApacheTimeConverter()
+        # Статистика разбора (None — не собирается)
+        self.stats = stats
+
+    @classmethod
+    def cache_tag(cls, log_type: str) -> str:
+        """Тег парсера для ключа дискового кэша (для своих форматов — с хэшем строки формата)."""
+        if log_type in cls.CUSTOM_FORMAT_TYPES:
+            return f"{log_type}:v{cls.PARSER_VERSION}:{cls.log_format(log_type).digest}"
+        return f"{log_type}:v{cls.PARSER_VERSION}"
+
+    @staticmethod
+    def log_format(log_type: str) -> CompiledLogFormat:
+        """Скомпилированный пользовательский формат (компиляция кэшируется)."""
+        spec = PARSER_CONFIG["log_formats"][log_type]
+        return compile_log_format(spec.get("syntax", "nginx"), spec["format"])
+
+    def parse(self, lines, log_type: str, workers: int | None = None,
+              where: LogFilter | None = None, columns=None, offsets=None) -> pd.DataFrame:
+        """
+        Единая точка входа: выбирает парсер по типу лога.
+        :param lines: строки лога (весь файл или очередная пачка; список или LineIndex)
+        :param log_type: 'Apache' | 'Nginx' | 'Wordpress' | 'Bitrix' | имя из PARSER_CONFIG["log_formats"]
+        :param workers: процессов (None — из PARSER_CONFIG, 1 — без пула). SQL-дампы
+            разбираются параллельно только из LineIndex (процессы читают файл сами)
+        :param where: LogFilter — в результат попадают только подходящие записи.
+            Для access-логов проверяется до разбора (предфильтр строк, сырые группы),
+            для SQL-дампов — по готовому DataFrame
+        :param columns: нужные колонки (None — все); для access-логов остальные не строятся
+        :param offsets: байтовые смещения начала строк в файле (int64 по строке lines);
+            None — берутся из LineIndex/SourceLines, если это они
+
+        Скрытая колонка source_pos — позиция записи в источнике: смещение её
+        строки в файле (если смещения известны) или номер записи SQL-дампа.
+        По ней таблица узнаёт уже добавленные записи (см. RowSourceIndex);
+        в проекцию columns она не входит и добавляется всегда.
+        """
+        if where is not None and where.is_empty():
+            where = None
+        cfg = PARSER_CONFIG["parallel"]
+        workers = workers or cfg["workers"] or os.cpu_count() or 1
+        if log_type in self.LINE_BASED_TYPES:
+            if offsets is None:
+                offsets = lines.line_offsets() if isinstance(lines, LineIndex) else getattr(lines, "offsets", None)
+            if workers > 1 and len(lines) >= cfg["min_lines"]:
+                return self._parse_parallel(lines, log_type, workers, cfg["chunk_lines"], where, columns, offsets)
+            if log_type in self.CUSTOM_FORMAT_TYPES:
+                return self.parse_custom_format(lines, log_type, where, columns, offsets)
+            return self.parse_apache_nginx(lines, where, columns, offsets)
+
+        df = self._parse_sql_dump(lines, log_type, workers)
+        df["source_pos"] = np.arange(len(df), dtype=np.int64)
+        if where is not None:
+            df = keep_rows(df, where.mask(df), self.stats)
+        if columns is not None:
+            df = df[project(df.columns, list(columns) + ["source_pos"])]
+        return df
+
+    def _parse_sql_dump(self, lines, log_type: str, workers: int) -> pd.DataFrame:
+        if self.stats is not None and not isinstance(lines, str):
+            self.stats.lines += len(lines)  # строки дампа; записи считает разбор кортежей
+        if (log_type in self.SQL_DUMP_TYPES and workers > 1 and isinstance(lines, LineIndex)
+                and lines.size >= PARSER_CONFIG["sql_dump"]["parallel_min_bytes"]):
+            df = self._parse_sql_parallel(lines.path, log_type, workers)
+            if df is not None:
+                return df
+        if log_type == "Wordpress":
+            return self.parse_wordpress_activitylog(lines)
+        if log_type == "Bitrix":
+            return self.parse_bitrix_eventlog(lines)
+        raise ValueError(f"Неизвестный тип парсера: {log_type}")
+
+    def iter_sql_dump_frames(self, file_path: str, log_type: str):
+        """
+        Потоковый разбор SQL-дампа (Wordpress/Bitrix) прямо с диска:
+        файл читается кусками, кортежи переходят через границы кусков.
+        Возвращает пачки (DataFrame, bytes_read, total_bytes); source_pos —
+        номер записи в дампе, как у parse.
+        """
+        columns, build = self._sql_spec(log_type)
+        chunk_chars = PARSER_CONFIG["sql_dump"]["chunk_chars"]
+        done = 0
+        for rows, bytes_read, total_bytes in iter_sql_dump(file_path, columns, self._sql_tables(log_type),
+                                                           chunk_chars, on_reject=self._on_broken_tuple):
+            df = build(rows)
+            df["source_pos"] = np.arange(done, done + len(df), dtype=np.int64)
+            done += len(df)
+            yield df, bytes_read, total_bytes
+
+    def parse_sql_segment(self, text: str, log_type: str, table: str | None = None) -> tuple[pd.DataFrame, bool]:
+        """
+        Разбор куска дампа, вырезанного по границе из find_sql_split_points.
+        :param table: кусок начинается посреди VALUES оператора INSERT в эту таблицу
+        :return: (DataFrame, кусок кончился ровно на границе кортежей)
+        """
+        columns, build = self._sql_spec(log_type)
+        tokenizer = SqlValuesTokenizer(columns, self._sql_tables(log_type), on_reject=self._on_broken_tuple)
+        if table is not None:
+            tokenizer.resume(table)
+        with stage(self.stats, "regex"):
+            rows = tokenizer.feed(text)
+            at_boundary = tokenizer.at_boundary()
+            rows += tokenizer.close()
+        return build(rows), at_boundary
+
+    def _on_broken_tuple(self, sample: str) -> None:
+        """Токенизатор SQL пропустил нераспознаваемый кортеж."""
+        if self.stats is not None:
+            self.stats.reject(REJECT_BROKEN_TUPLE, sample)
+
+    def _parse_sql_parallel(self, file_path: str, log_type: str, workers: int) -> pd.DataFrame | None:
+        """
+        Делит несжатый SQL-дамп по границам кортежей, разбирает куски в пуле
+        процессов и склеивает результаты в исходном порядке.
+        Если какая-то граница оказалась внутри значения (дамп не от mysqldump,
+        с переводами строк в строках), возвращает None — разбор идёт последовательно.
+        """
+        size = os.path.getsize(file_path)
+        points = find_sql_split_points(file_path, workers * 2)
+        if not points:
+            return None
+        starts = [0] + [p for p, _ in points]
+        tables = [None] + [t for _, t in points]
+        bounds = list(zip(starts, starts[1:] + [size], tables))
+        workers = min(workers, len(bounds))
+        LOGGER.info(f"[LogParser] Параллельный разбор SQL-дампа: байт={size}, кусков={len(bounds)}, процессов={workers}")
+
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_parse_sql_range, file_path, a, b, log_type, t) for a, b, t in bounds]
+            results = [f.result() for f in futures]
+
+        # последний кусок кончается концом файла, его граница не проверяется
+        if not all(ok for _, ok, _ in results[:-1]):
+            LOGGER.warning("[LogParser] Граница куска попала внутрь значения, разбор SQL-дампа последовательно")
+            return None
+        if self.stats is not None:
+            for _, _, part in results:
+                self.stats.merge(part)
+        df = concat_frames([frame for frame, _, _ in results])
+        LOGGER.info(f"[LogParser] Получено {len(df)} записей {log_type} (параллельно)")
+        return df
+
+    def _sql_spec(self, log_type: str):
+        """Поля кортежа для проекции и сборщик DataFrame для типа SQL-дампа."""
+        if log_type == "Bitrix":
+            return self.BITRIX_FIELDS, self._bitrix_frame
+        if log_type == "Wordpress":
+            return [i for i, _ in self.WP_FIELDS], self._wp_frame
+        raise ValueError(f"Тип {log_type} не является SQL-дампом")
+
+    @staticmethod
+    def _sql_tables(log_type: str):
+        """Таблицы дампа, из которых берутся INSERT (пусто — любые)."""
+        return PARSER_CONFIG["sql_dump"]["tables"].get(log_type) or None
+
+    def _parse_parallel(self, lines, log_type: str, workers: int, chunk_lines: int,
+                        where: LogFilter | None = None, columns=None, offsets=None) -> pd.DataFrame:
+        """
+        Делит строки на куски, парсит их в пуле процессов (без GIL) и склеивает
+        результаты в исходном порядке. Для LineIndex процессам передаются
+        только байтовые диапазоны файла.
+        """
+        n = len(lines)
+        chunk_lines = max(1, int(chunk_lines))
+        bounds = [(i, min(i + chunk_lines, n)) for i in range(0, n, chunk_lines)]
+        workers = min(workers, len(bounds))
+        LOGGER.info(f"[LogParser] Параллельный парсинг: строк={n}, кусков={len(bounds)}, процессов={workers}")
+
+        # spawn: fork из многопоточного Qt-процесса небезопасен
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            if isinstance(lines, LineIndex):
+                futures = [pool.submit(_parse_file_range, lines.path, *lines.byte_range(a, b), log_type,
+                                       where, columns)
+                           for a, b in bounds]
+            else:
+                futures = [pool.submit(_parse_lines_chunk, lines[a:b], log_type, where, columns,
+                                       None if offsets is None else offsets[a:b])
+                           for a, b in bounds]
+            results = [f.result() for f in futures]
+
+        if self.stats is not None:
+            for _, part in results:
+                self.stats.merge(part)
+        df = concat_frames([frame for frame, _ in results])
+        LOGGER.info(f"[LogParser] Получено {len(df)} записей Apache/Nginx (параллельно)")
+        return df
+
+    # Колонки результата parse_apache_nginx (порядок = порядок в DataFrame)
+    APACHE_NGINX_COLUMNS = [
+        "date", "time", "source_ip", "method", "object", "protocol", "proto", "proto_ver", "code", "size", "referer", "user_agent",
+        "timestamp",
+    ]
+
+    def parse_apache_nginx(self, lines, where: LogFilter | None = None, columns=None, positions=None):
         """
         Парсит Apache/Nginx access logs в DataFrame.
          'time' разбивается на отдельные колонки 'date' и 'time'.
+
+        Колоночный путь: один проход скомпилированной регуляркой даёт сырые
+        группы, дальше всё делается целыми колонками. Время и протокол
+        разбираются только для уникальных значений (pd.factorize) и
+        раскладываются по строкам через коды — уникальных отметок времени
+        в логе на порядки меньше, чем строк.
+        'timestamp' — момент времени datetime64[ns, UTC] (с учётом пояса из лога)
+        для числовой сортировки и фильтрации по времени.
+
+        where/columns — фильтр и проекция (см. parse): строки отсекаются
+        предфильтром до регулярки и по сырым группам до разбора времени,
+        незапрошенные колонки не строятся.
+        positions — позиции строк в файле (np.ndarray по строке lines или None):
+        позиции совпавших строк попадают в колонку source_pos.
         """
         LOGGER.info(f"[LogParser] Парсинг Apache/Nginx логов, строк={len(lines)}")
-        parsed_data = []
-
-        for line in lines:
-            match = self.apache_nginx_pattern.search(line)
-            if match:
-                raw_time = match.group("time")
-                date_str, time_str = self._split_apache_time(raw_time)
-                protocol = match.group("protocol")
-                proto, proto_ver = self._split_protocol(protocol)
-
-                parsed_data.append([
-                    date_str,                         
-                    time_str,                         
-                    match.group("source_ip"),
-                    match.group("method"),
-                    match.group("object"),
-                    protocol,
-                    proto,
-                    proto_ver,
-                    (match.group("code")),
-                    match.group("referer"),
-                    match.group("agent")
-                ])
+        lines, positions = prefilter_lines(where, lines, self.stats, positions)
+        search = self.apache_nginx_pattern.search
+        with stage(self.stats, "regex"):
+            matches = list(map(search, lines))
+            groups = [m.groups() for m in matches if m]
+        if self.stats is not None:
+            self.stats.count_matches(lines, matches)
+        if not groups:
+            LOGGER.info("[LogParser] Получено 0 записей Apache/Nginx")
+            df = self._empty_apache_nginx(columns)
+            if positions is not None:
+                df["source_pos"] = pd.Series(dtype=np.int64)
+            return df
+
+        with stage(self.stats, "frame"):
+            raw = pd.DataFrame(groups, columns=list(self.apache_nginx_pattern.groupindex))
+            raw = raw.rename(columns={"agent": "user_agent", "time": "raw_time"})
+            if positions is not None:
+                raw["_pos"] = matched_positions(positions, matches)
+            if where is not None:
+                raw = keep_rows(raw, where.mask_raw(raw), self.stats)
+
+        wanted = project(self.APACHE_NGINX_COLUMNS, columns)
+        out = {col: raw[col] for col in raw.columns if col in wanted}
+        with stage(self.stats, "conversion"):
+            if {"date", "time", "timestamp"} & set(wanted) or (where is not None and where.needs_time):
+                out["date"], out["time"], out["timestamp"] = self._time.convert(raw["raw_time"])
+            if {"proto", "proto_ver"} & set(wanted):
+                out["proto"], out["proto_ver"] = self._map_unique(raw["protocol"], self._split_protocol)
+
+        with stage(self.stats, "frame"):
+            df = pd.DataFrame({col: out[col] for col in wanted}, columns=wanted)
+            if positions is not None:
+                df["source_pos"] = raw["_pos"].to_numpy(dtype=np.int64)
+            if where is not None and where.needs_time:
+                df = keep_rows(df, where.mask_time(out["timestamp"], out["date"], out["time"]), self.stats)
+        with stage(self.stats, "conversion"):
+            apply_schema(df, "Apache", columns)
 
-        df = pd.DataFrame(parsed_data, columns=[
-            "date", "time", "source_ip", "method", "object", "protocol", "proto", "proto_ver", "code", "referer", "user_agent"
-        ])
         LOGGER.info(f"[LogParser] Получено {len(df)} записей Apache/Nginx")
         return df
 
+    def parse_custom_format(self, lines, log_type: str, where: LogFilter | None = None, columns=None,
+                            positions=None) -> pd.DataFrame:
+        """
+        Access-лог в пользовательском формате: скомпилированная регулярка формата,
+        дальше тот же колоночный путь, что и в parse_apache_nginx (время и протокол —
+        по уникальным значениям, общий кэш времени парсера, фильтр, проекция и позиции).
+        """
+        LOGGER.info(f"[LogParser] Парсинг формата '{log_type}', строк={len(lines)}")
+        df = self.log_format(log_type).parse(lines, self._time, self._split_protocol, self.stats,
+                                             where=where, columns=columns, positions=positions)
+        LOGGER.info(f"[LogParser] Получено {len(df)} записей формата '{log_type}'")
+        return df
+
+    @classmethod
+    def _empty_apache_nginx(cls, columns=None) -> pd.DataFrame:
+        df = pd.DataFrame(columns=project(cls.APACHE_NGINX_COLUMNS, columns))
+        if "timestamp" in df:
+            df["timestamp"] = pd.Series(dtype="datetime64[ns, UTC]")
+        return apply_schema(df, "Apache", columns)
+
+    @staticmethod
+    def _map_unique(col: pd.Series, split) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Применяет split(str) -> (a, b) только к уникальным значениям колонки
+        и раскладывает результат по всем строкам через коды factorize.
+        """
+        codes, uniques = pd.factorize(col)
+        pairs = [split(u) for u in uniques]
+        first = np.array([p[0] for p in pairs], dtype=object)
+        second = np.array([p[1] for p in pairs], dtype=object)
+        return first.take(codes), second.take(codes)
+
+    # Поля кортежа wp_wsal / activity log, которые попадают в результат
+    # (номер поля в кортеже -> колонка), в порядке колонок DataFrame
+    WP_FIELDS = (
+        (4, "source_ip"),     # №5
+        (6, "object"),        # №7
+        (8, "user_agent"),    # №9
+        (7, "event_type"),    # №8
+        (9, "user_roles"),    # №10
+        (10, "username"),     # №11
+        (1, "site_id"),       # №2
+        (11, "user_id"),      # №12
+    )
+
     def parse_wordpress_activitylog(self, text) -> pd.DataFrame:
         """
         Парсер дампа WordPress activity log (кортежи в скобках).
         Возвращает DataFrame с колонками:
         ip, object, user_agent, event_type, user_roles, username, site_id, user_id
         """
-        if not isinstance(text, str):
-            try:
-                text = "".join(text)
-            except Exception:
-                text = str(text)
-
-        rows = []
-        for rec in self._iter_wp_tuples(text):
-            try:
-                row = {
-                    "source_ip":         str(rec[4]  or ""),   # №5
-                    "object":     str(rec[6]  or ""),   # №7
-                    "user_agent": str(rec[8]  or ""),   # №9
-                    "event_type": str(rec[7]  or ""),   # №8
-                    "user_roles": str(rec[9]  or ""),   # №10
-                    "username":   str(rec[10] or ""),   # №11
-                    "site_id":    self._to_int_or_empty_wp(rec[1]),   # №2
-                    "user_id":    self._to_int_or_empty_wp(rec[11]),  # №12
-                }
-                rows.append(row)
-            except Exception:
-                continue
-
-        df = pd.DataFrame(rows, columns=[
-            "source_ip", "object", "user_agent", "event_type",
-            "user_roles", "username", "site_id", "user_id"
-        ])
-
+        with stage(self.stats, "regex"):
+            tuples = list(self._iter_wp_tuples(text))
+        df = self._wp_frame(tuples)
         LOGGER.info(f"[LogParser] Получено {len(df)} записей WordPress")
         return df
 
-
-    def _iter_wp_tuples(self, text: str):
+    def _wp_frame(self, tuples) -> pd.DataFrame:
+        """Кортежи (поля WP_FIELDS) -> DataFrame WordPress."""
+        norm = self._normalize_wp_field
+        to_int = self._to_int_or_empty_wp
+        with stage(self.stats, "conversion"):
+            rows = [
+                [str(norm(ip) or ""), str(norm(obj) or ""), str(norm(ua) or ""), str(norm(ev) or ""),
+                 str(norm(roles) or ""), str(norm(user) or ""), to_int(norm(site)), to_int(norm(uid))]
+                for ip, obj, ua, ev, roles, user, site, uid in tuples
+            ]
+        if self.stats is not None:
+            self.stats.matched += len(rows)
+        with stage(self.stats, "frame"):
+            return apply_schema(pd.DataFrame(rows, columns=[name for _, name in self.WP_FIELDS]), "Wordpress")
+
+    def _iter_wp_tuples(self, text):
         """
-        Итерирует кортежи '(...)' верхнего уровня и возвращает список полей.
-        Учитывает одинарные кавычки и SQL-экранирование '' внутри строк.
+        Кортежи '(...)' верхнего уровня — только поля WP_FIELDS (строки, без нормализации).
+        Учитывает одинарные кавычки и экранирование '' и \\' внутри строк.
         """
-        for tup in self._find_parenthesized(text):
-            inner = tup[1:-1]
-            fields = self._split_fields_sql_quotes(inner)
-            norm = [self._normalize_wp_field(f) for f in fields]
-
-            if len(norm) < 16:
-                norm += [""] * (16 - len(norm))
-            elif len(norm) > 16:
-                norm = norm[:16]
-            yield norm
-
-    @staticmethod
-    def _find_parenthesized(text: str):
-
-        start, depth = None, 0
-        for i, ch in enumerate(text):
-            if ch == "(":
-                if depth == 0: start = i
-                depth += 1
-            elif ch == ")":
-                if depth > 0:
-                    depth -= 1
-                    if depth == 0 and start is not None:
-                        yield text[start:i+1]
-                        start = None
-
-    @staticmethod
-    def _split_fields_sql_quotes(s: str):
-
-
-        fields, buf = [], []
-        in_q = False
-        i = 0
-        while i < len(s):
-            ch = s[i]
-            if in_q:
-                if ch == "'":
-                    if i + 1 < len(s) and s[i + 1] == "'":  
-                        buf.append("'")
-                        i += 2
-                        continue
-                    in_q = False
-                    i += 1
-                    continue
-                else:
-                    buf.append(ch)
-                    i += 1
-                    continue
-            else:
-                if ch == "'":
-                    in_q = True
-                    i += 1
-                    continue
-                elif ch == ",":
-                    fields.append("".join(buf).strip())
-                    buf = []
-                    i += 1
-                    continue
-                else:
-                    buf.append(ch)
-                    i += 1
-        fields.append("".join(buf).strip())
-        return fields
+        return iter_sql_tuples(text, [i for i, _ in self.WP_FIELDS], self._sql_tables("Wordpress"),
+                               on_reject=self._on_broken_tuple)
 
     @staticmethod
     def _normalize_wp_field(token: str):
@@ -196,59 +482,63 @@ class LogParser:
         except Exception:
             return ""
 
-    def parse_bitrix_eventlog(self, text: str) -> pd.DataFrame:
+    # Ожидаемые позиции в b_event_log:
+    #  0: ID
+    #  1: TIMESTAMP_X  -> 'YYYY-MM-DD HH:MM:SS'
+    #  2: SEVERITY
+    #  3: AUDIT_TYPE_ID
+    #  4: MODULE_ID
+    #  5: ITEM_ID
+    #  6: REMOTE_ADDR  -> ip
+    #  7: USER_AGENT   -> user-agent
+    #  8: REQUEST_URI  -> object
+    #  9: SITE_ID
+    # 10: USER_ID
+    # 11: GUEST_ID
+    # 12: DESCRIPTION
+    BITRIX_FIELDS = (1, 6, 8, 7, 3, 9, 10, 11)
+
+    BITRIX_COLUMNS = [
+        "date", "time", "source_ip", "object", "user_agent",
+        "audit_type_id", "site_id", "user_id", "guest_id"
+    ]
+
+    def parse_bitrix_eventlog(self, text) -> pd.DataFrame:
         """
         Разбирает текстовую выгрузку b_event_log (кортежи в скобках, разделённые запятыми).
         Возвращает DataFrame с колонками:
         date, time, ip, object, user-agent, audit_type_id, site_id, user_id, guest_id
         """
-        if not isinstance(text, str):
-            try:
-                text = "".join(text)
-            except Exception:
-                text = str(text)
-        rows = []
-        for rec_fields in self._iter_bitrix_tuples(text):
-            # Ожидаемые позиции в b_event_log:
-            #  0: ID
-            #  1: TIMESTAMP_X  -> 'YYYY-MM-DD HH:MM:SS'
-            #  2: SEVERITY
-            #  3: AUDIT_TYPE_ID
-            #  4: MODULE_ID
-            #  5: ITEM_ID
-            #  6: REMOTE_ADDR  -> ip
-            #  7: USER_AGENT   -> user-agent
-            #  8: REQUEST_URI  -> object
-            #  9: SITE_ID
-            # 10: USER_ID
-            # 11: GUEST_ID
-            # 12: DESCRIPTION
-            try:
-                ts = str(rec_fields[1] or "")
-                date_str, time_str = (ts.split(" ", 1) + [""])[:2]
-                row = {
-                    "date": date_str,
-                    "time": time_str,
-                    "source_ip": str(rec_fields[6] or ""),
-                    "object": str(rec_fields[8] or ""),
-                    "user_agent": str(rec_fields[7] or ""),
-                    "audit_type_id": str(rec_fields[3] or ""),
-                    "site_id": str(rec_fields[9] or ""),
-                    "user_id": self._to_int_or_empty(rec_fields[10]),
-                    "guest_id": self._to_int_or_empty(rec_fields[11]),
-                }
-                rows.append(row)
-            except Exception as e:
-                LOGGER.warning(f"[Bitrix parser] skip malformed tuple: {e}")
-
-        df = pd.DataFrame(rows, columns=[
-            "date", "time", "source_ip", "object", "user_agent",
-            "audit_type_id", "site_id", "user_id", "guest_id"
-        ])
-
+        with stage(self.stats, "regex"):
+            tuples = list(self._iter_bitrix_tuples(text))
+        df = self._bitrix_frame(tuples)
         LOGGER.info(f"[LogParser] Получено {len(df)} записей Bitrix")
         return df
-    
+
+    def _bitrix_frame(self, tuples) -> pd.DataFrame:
+        """Кортежи (поля BITRIX_FIELDS) -> DataFrame Bitrix."""
+        norm = self._normalize_field
+        to_int = self._to_int_or_empty
+        rows = []
+        with stage(self.stats, "conversion"):
+            for ts, ip, obj, ua, audit, site, uid, gid in tuples:
+                date_str, _, time_str = str(norm(ts) or "").partition(" ")
+                rows.append([
+                    date_str,
+                    time_str,
+                    str(norm(ip) or ""),
+                    str(norm(obj) or ""),
+                    str(norm(ua) or ""),
+                    str(norm(audit) or ""),
+                    str(norm(site) or ""),
+                    to_int(norm(uid)),
+                    to_int(norm(gid)),
+                ])
+        if self.stats is not None:
+            self.stats.matched += len(rows)
+        with stage(self.stats, "frame"):
+            return apply_schema(pd.DataFrame(rows, columns=self.BITRIX_COLUMNS), "Bitrix")
+
     @staticmethod
     def _to_int_or_empty(val):
         if val is None or val == "":
@@ -258,86 +548,13 @@ class LogParser:
         except Exception:
             return ""
 
-    def _iter_bitrix_tuples(self, text: str):
+    def _iter_bitrix_tuples(self, text):
         """
-        Итерирует кортежи из b_event_log, корректно деля на поля по запятым
-        с учётом одинарных кавычек и экранирования (\' внутри строки).
-        Возвращает список значений.
+        Кортежи из b_event_log — только поля BITRIX_FIELDS (строки, без нормализации).
+        Поля делятся по запятым с учётом одинарных кавычек и экранирования
+        ('' и \\' внутри строки).
         """
-        # 1) вычленяем подстроки вида (...) — допускаем перевод строки внутри
-        for tup in self._find_parenthesized(text):
-            # 2) убираем скобки и парсим поля, учитывая кавычки
-            inner = tup[1:-1]
-            fields = self._split_fields_preserving_quotes(inner)
-            # нормализуем NULL/строки/числа
-            norm = [self._normalize_field(f) for f in fields]
-
-            if len(norm) < 13:
-                norm += [""] * (13 - len(norm))
-            elif len(norm) > 13:
-                norm = norm[:13]
-            yield norm
-
-    @staticmethod
-    def _find_parenthesized(text: str):
-
-
-        start = None
-        depth = 0
-        for i, ch in enumerate(text):
-            if ch == "(":
-                if depth == 0:
-                    start = i
-                depth += 1
-            elif ch == ")":
-                if depth > 0:
-                    depth -= 1
-                    if depth == 0 and start is not None:
-                        yield text[start:i+1]
-                        start = None
-
-
-    @staticmethod
-    def _split_fields_preserving_quotes(s: str):
-        """
-         Делит строку кортежа на поля по ',' с учётом одинарных кавычек.
-         Поддерживает SQL-экранирование одинарной кавычки удвоением: '' → '
-        """
-        fields, buf = [], []
-        in_q = False
-        i = 0
-        while i < len(s):
-            ch = s[i]
-            if in_q:
-                if ch == "'":
-                     # удвоенная кавычка внутри строки → добавляем одинарную и пропускаем вторую
-                    if i + 1 < len(s) and s[i + 1] == "'":
-                        buf.append("'")
-                        i += 2
-                        continue
-                     # конец строки
-                    in_q = False
-                    i += 1
-                    continue
-                else:
-                    buf.append(ch)
-                    i += 1
-                    continue
-            else:
-                if ch == "'":
-                    in_q = True
-                    i += 1
-                    continue
-                elif ch == ",":
-                    fields.append("".join(buf).strip())
-                    buf = []
-                    i += 1
-                    continue
-                else:
-                    buf.append(ch)
-                    i += 1
-        fields.append("".join(buf).strip())
-        return fields
+        return iter_sql_tuples(text, self.BITRIX_FIELDS, self._sql_tables("Bitrix"), on_reject=self._on_broken_tuple)
 
     @staticmethod
     def _normalize_field(token: str):
@@ -363,7 +580,6 @@ class LogParser:
                 return t
         return t
 
-
     @staticmethod
     def _split_apache_time(raw: str) -> tuple[str, str]:
         """
@@ -387,12 +603,7 @@ class LogParser:
             day_str, mon_str, rest = core.split("/", 2)           # '27', 'Jul', '2025:07:55:25'
             year_str, hh, mm, ss = rest.split(":", 3)             # '2025', '07', '55', '25'
 
-            mon_map = {
-            "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
-            "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
-            "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
-            }
-            mon = mon_map.get(mon_str, None)
+            mon = MONTHS.get(mon_str, None)
             if mon is None:
             # неожиданный месяц — падаем в except
                 raise ValueError(f"Unknown month: {mon_str}")
@@ -0,0 +1,262 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from progr.models.log_filter import LogFilter
+from progr.utils_app.apache_time import NAT
+
+
+class QueryTerm:
+    """
+    Одно условие запроса к таблице логов: колонка, оператор, значение.
+
+    Условие проверяется один раз на каждое уникальное отображаемое значение
+    колонки (label_mask), результат раскладывается по строкам через коды.
+    Равенство без сетей/диапазонов идёт через инвертированный индекс колонки
+    (значение -> строки), без прохода по всем строкам.
+
+    values — значения для = / != (уже разделённые по запятым вне кавычек, см.
+    LogQuery.parse); None — value делится по всем запятым.
+    """
+
+    NUMBER_RANGE_RE = re.compile(r"^(-?\d+(?:\.\d+)?)-(-?\d+(?:\.\d+)?)$")
+
+    def __init__(self, column: str | None, op: str, value: str, values: list[str] | None = None) -> None:
+        self.column = column   # None — любая колонка
+        self.op = op
+        self.value = value
+        self.values = values
+        self.negate = op in ("!=", "!~")
+        base = op.lstrip("!") if self.negate else op
+        self._exact: list[str] | None = None
+        self._predicate = self._build(base, value)
+
+    def __repr__(self) -> str:
+        return f"QueryTerm({self.column or '*'}{self.op}{self.value!r})"
+
+    def _build(self, op: str, value: str):
+        if op == "~":
+            if len(value) > 2 and value.startswith("/") and value.endswith("/"):
+                try:
+                    pattern = re.compile(value[1:-1], re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Неверное регулярное выражение {value}: {e}") from e
+                return lambda label: pattern.search(label) is not None
+            sub = value.casefold()
+            return lambda label: sub in label.casefold()
+
+        if op == "=":
+            values = self.values if self.values is not None else [v.strip() for v in value.split(",") if v.strip()]
+            if not values:
+                raise ValueError(f"Пустое значение в условии {self.column}=")
+            if self.column == "source_ip" and any("/" in v for v in values):
+                try:
+                    ip_filter = LogFilter(ips=values)
+                except ValueError as e:
+                    raise ValueError(f"Неверный адрес или сеть в {value}: {e}") from e
+                return lambda label: bool(label) and ip_filter._ip_ok(label)
+            ranges = [self.NUMBER_RANGE_RE.match(v) for v in values]
+            if any(ranges):
+                bounds = [(float(m.group(1)), float(m.group(2))) for m in ranges if m]
+                exact = {v for v, m in zip(values, ranges) if not m}
+                return lambda label: label in exact or any(lo <= n <= hi for lo, hi in bounds
+                                                           for n in [_number(label)] if n is not None)
+            self._exact = values
+            exact = set(values)
+            return lambda label: label in exact
+
+        # сравнения: числа — как числа, иначе как текст (date 'YYYY-MM-DD', time 'HH:MM:SS')
+        compare = _COMPARE[op]
+        number = _number(value)
+        if number is not None:
+            return lambda label: (n := _number(label)) is not None and compare(n, number)
+        return lambda label: bool(label) and compare(label, value)
+
+    def label_mask(self, labels: list[str]) -> np.ndarray:
+        """Результат условия (без учёта отрицания) для каждого значения labels."""
+        return np.fromiter((bool(self._predicate(label)) for label in labels), dtype=bool, count=len(labels))
+
+    def mask(self, model, start: int = 0) -> np.ndarray:
+        """Маска строк хранилища model начиная со start."""
+        if self.column is None:
+            out = np.zeros(model.total_rows() - start, dtype=bool)
+            for name in model.headers():
+                out |= self._column_mask(model.column(name), start)
+        else:
+            column = model.column(self.column)
+            if column is None:
+                raise ValueError(f"В таблице нет колонки «{self.column}»")
+            out = self._column_mask(column, start)
+        return ~out if self.negate else out
+
+    def _column_mask(self, column, start: int) -> np.ndarray:
+        if self._exact is not None and start == 0:
+            codes = [c for c in (column.lookup(v) for v in self._exact) if c is not None]
+            out = np.zeros(len(column), dtype=bool)
+            out[column.rows_of(codes)] = True
+            return out
+        return self.label_mask(column.labels).take(column.codes[start:])
+
+
+class TimeTerm:
+    """
+    Условие по моменту времени записи: time>=/time<=... с датой и временем
+    ('2025-07-27T07:00:00', "2025-07-27 07:00", '2025-07-27T04:00Z').
+    Сравнение числовое, по наносекундам от эпохи:
+    - момент без пояса — по часам лога, т. е. с датой и временем, как они
+      показаны в таблице (в поясе каждой записи);
+    - момент с поясом — со скрытой колонкой timestamp модели (UTC); если её
+      нет (Bitrix, WordPress), дата и время записи считаются UTC.
+    """
+
+    def __init__(self, op: str, value: str) -> None:
+        try:
+            moment = pd.Timestamp(value.strip())
+        except ValueError:
+            moment = pd.NaT
+        if moment is pd.NaT:
+            raise ValueError(f"Неверный момент времени {value!r}: ожидается ГГГГ-ММ-ДД ЧЧ:ММ[:СС][пояс]")
+        self.op = op
+        self.moment = moment
+        self.local = moment.tzinfo is None
+
+    def __repr__(self) -> str:
+        return f"TimeTerm(time{self.op}{self.moment.isoformat()})"
+
+    def mask(self, model, start: int = 0) -> np.ndarray:
+        values = None if self.local else model.timestamps(start)
+        if values is None:
+            values = model.wall_clock(start)
+        if values is None:
+            raise ValueError("Для условия по времени нужны колонки date и time")
+        return (values != NAT) & _COMPARE[self.op](values, self.moment.value)
+
+
+class LogQuery:
+    """
+    Запрос к таблице логов (строка фильтра). Условия через пробел, все через И:
+      source_ip=203.0.113.7        равенство
+      method=GET,POST              одно из значений
+      source_ip=10.0.0.0/8         адрес из сети (CIDR, можно вперемешку с адресами)
+      code=400-499                 числовой диапазон включительно
+      code>=500  size<1000         сравнение (числа — как числа, иначе как текст)
+      time>=2025-07-27T07:00       момент времени по date + time ("2025-07-27 07:00" в кавычках)
+      time<2025-07-27T04:00Z       момент с поясом — по timestamp записи (UTC)
+      date=2025-07-27              день
+      object~wp-login              подстрока без учёта регистра
+      user_agent~/bot|curl/        регулярное выражение
+      code!=200  object!~.css      отрицание
+      203.0.113.7                  подстрока в любой колонке
+    Значения с пробелами берутся в кавычки. Запятая в кавычках значения не
+    делит: object="/a,b" — ровно '/a,b', object="/a,b",/c — одно из двух.
+    Обратная косая черта — обычный символ (user_agent~/bot\\d+/), кавычка
+    без пары — тоже (object~it's). Ошибка разбора — ValueError.
+    """
+
+    # Условие — подряд идущие куски без пробелов и кавычек, строки в парных кавычках и одиночные кавычки
+    TOKEN_RE = re.compile(r"""(?:"[^"]*"|'[^']*'|[^\s"']+|["'])+""")
+    PART_RE = re.compile(r""""([^"]*)"|'([^']*)'|([^"']+|["'])""")
+    TERM_RE = re.compile(r"^(?P<column>[A-Za-z_][A-Za-z0-9_]*)(?P<op>!=|>=|<=|!~|=|>|<|~)(?P<value>.*)$", re.S)
+
+    def __init__(self, terms: list) -> None:
+        self.terms = terms
+
+    def __repr__(self) -> str:
+        return f"LogQuery({self.terms})"
+
+    @classmethod
+    def parse(cls, text: str) -> "LogQuery":
+        terms = []
+        for pieces in cls._pieces(text or ""):
+            part = "".join(piece for piece, _ in pieces)
+            m = cls.TERM_RE.match(part)
+            if m is None:
+                terms.append(QueryTerm(None, "~", part))
+                continue
+            column, op, value = m.group("column"), m.group("op"), m.group("value")
+            if column == "time" and op in _COMPARE and re.match(r"\d{4}-\d{2}-\d{2}", value):
+                terms.append(TimeTerm(op, value))
+            elif op in ("=", "!="):
+                terms.append(QueryTerm(column, op, value, cls._alternatives(pieces, m.start("value"))))
+            else:
+                terms.append(QueryTerm(column, op, value))
+        return cls(terms)
+
+    @classmethod
+    def split(cls, text: str) -> list[str]:
+        """
+        Делит строку запроса на условия по пробелам вне кавычек и снимает парные
+        кавычки. В отличие от shlex.split, не считает обратную косую черту
+        экранированием и не падает на кавычке без пары.
+        """
+        return ["".join(piece for piece, _ in pieces) for pieces in cls._pieces(text)]
+
+    @classmethod
+    def quote(cls, value: str) -> str:
+        """Значение в кавычках для строки запроса: пробелы, запятые и кавычки в нём — как есть."""
+        return "'" + value.replace("'", "'\"'\"'") + "'"
+
+    @classmethod
+    def equals(cls, column: str, value: str) -> str:
+        """Условие «column ровно value» для строки запроса (значение из таблицы, фасетов)."""
+        return f"{column}={cls.quote(value)}"
+
+    @classmethod
+    def _pieces(cls, text: str) -> list[list[tuple[str, bool]]]:
+        """Условия строки запроса — списки кусков (текст без кавычек, был ли в кавычках)."""
+        return [[(next(g for g in m.groups() if g is not None), m.group(3) is None) for m in cls.PART_RE.finditer(token)]
+                for token in cls.TOKEN_RE.findall(text)]
+
+    @staticmethod
+    def _alternatives(pieces: list[tuple[str, bool]], start: int) -> list[str]:
+        """
+        Значения условия «одно из» начиная с позиции start склеенного условия:
+        деление по запятым только вне кавычек. Значение без кавычек обрезается
+        по пробелам, пустое отбрасывается; в кавычках остаётся как есть ('' — пустое значение).
+        """
+        values, current, quoted = [], "", False
+        pos = 0
+        for text, in_quotes in pieces:
+            end = pos + len(text)
+            if pos < start and end <= start:  # кусок целиком до значения (колонка, оператор)
+                pos = end
+                continue
+            text, pos = text[max(start - pos, 0):], end
+            if not text and not in_quotes:
+                continue
+            if in_quotes:
+                current, quoted = current + text, True
+                continue
+            chunks = text.split(",")
+            for chunk in chunks[:-1]:
+                values.append((current + chunk, quoted))
+                current, quoted = "", False
+            current += chunks[-1]
+        values.append((current, quoted))
+        return [v if q else v.strip() for v, q in values if q or v.strip()]
+
+    def is_empty(self) -> bool:
+        return not self.terms
+
+    def mask(self, model, start: int = 0) -> np.ndarray:
+        """Маска строк хранилища LogsTableModel (начиная со start), прошедших все условия."""
+        out = np.ones(model.total_rows() - start, dtype=bool)
+        for term in self.terms:
+            out &= term.mask(model, start)
+        return out
+
+
+_COMPARE = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def _number(label: str) -> float | None:
+    try:
+        return float(label)
+    except ValueError:
+        return None
@@ -0,0 +1,244 @@
+import ipaddress
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Типы колонок результата парсинга по типу лога:
+# "category" — повторяющиеся значения (словарь + коды), "Int64" — целое с пропусками.
+# Колонки, которых нет в схеме (object, timestamp ...), остаются как есть.
+_ACCESS_LOG_SCHEMA = {
+    "date": "category",
+    "time": "category",
+    "source_ip": "category",
+    "method": "category",
+    "protocol": "category",
+    "proto": "category",
+    "proto_ver": "category",
+    "code": "category",
+    "size": "Int64",
+    "referer": "category",
+    "user_agent": "category",
+}
+
+SCHEMAS = {
+    "Apache": _ACCESS_LOG_SCHEMA,
+    "Nginx": _ACCESS_LOG_SCHEMA,
+    "Bitrix": {
+        "date": "category",
+        "time": "category",
+        "source_ip": "category",
+        "user_agent": "category",
+        "audit_type_id": "category",
+        "site_id": "category",
+        "user_id": "Int64",
+        "guest_id": "Int64",
+    },
+    "Wordpress": {
+        "source_ip": "category",
+        "user_agent": "category",
+        "event_type": "category",
+        "user_roles": "category",
+        "username": "category",
+        "site_id": "Int64",
+        "user_id": "Int64",
+    },
+}
+
+# Упакованный адрес из source_ip: IPv4 -> uint32, IPv6 -> два uint64 (старшие/младшие 64 бита).
+# Строятся только по запросу (columns в apply_schema / LogParser.parse): адрес уже
+# хранится категорией source_ip, постоянная копия в трёх колонках удваивала бы память
+IP_COLUMNS = ("ip_v4", "ip_v6_hi", "ip_v6_lo")
+
+_MASK64 = (1 << 64) - 1
+
+
+def apply_schema(df: pd.DataFrame, log_type: str, columns=None) -> pd.DataFrame:
+    """
+    Приводит колонки разобранного лога к компактным типам схемы (на месте).
+    Возвращает тот же DataFrame.
+    columns — запрошенные колонки (None — все колонки разбора): упакованные
+    IP-колонки добавляются, только если они в нём названы; без них адреса
+    не разбираются.
+    """
+    for col, kind in SCHEMAS.get(log_type, {}).items():
+        if col not in df.columns:
+            continue
+        if kind == "category":
+            df[col] = df[col].astype("category")
+        else:
+            df[col] = to_nullable_int(df[col])
+    ip_columns = [] if columns is None else [c for c in IP_COLUMNS if c in set(columns)]
+    if ip_columns and "source_ip" in df.columns:
+        for col, values in zip(IP_COLUMNS, pack_ips(df["source_ip"])):
+            if col in ip_columns:
+                df[col] = values
+    return df
+
+
+def to_nullable_int(values: pd.Series) -> pd.Series:
+    """
+    Числа как Int64; '', '-', None и прочие нечисловые значения -> <NA>.
+    Преобразуются только уникальные значения (размеры ответов, id повторяются).
+    """
+    if values.dtype == "Int64":
+        return values
+    codes, uniques = pd.factorize(values)
+    converted = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").astype("Int64")
+    # Последний элемент — для кода -1 (None/NaN в исходной колонке)
+    converted = pd.concat([converted, pd.Series([pd.NA], dtype="Int64")], ignore_index=True)
+    return pd.Series(converted.array.take(codes), index=values.index)
+
+
+def pack_ips(ips: pd.Series) -> tuple[pd.arrays.IntegerArray, pd.arrays.IntegerArray, pd.arrays.IntegerArray]:
+    """
+    source_ip -> (ip_v4 UInt32, ip_v6_hi UInt64, ip_v6_lo UInt64).
+    Адреса разбираются один раз на уникальное значение (категории) и
+    раскладываются по строкам через коды; нераспознанное -> <NA>.
+    """
+    cat = ips if isinstance(ips.dtype, pd.CategoricalDtype) else ips.astype("category")
+    uniques = cat.cat.categories
+    n = len(uniques)
+    # Последний элемент — для кода -1 (пропуск в категориальной колонке)
+    v4 = np.zeros(n + 1, dtype=np.uint32)
+    hi = np.zeros(n + 1, dtype=np.uint64)
+    lo = np.zeros(n + 1, dtype=np.uint64)
+    v4_na = np.ones(n + 1, dtype=bool)
+    v6_na = np.ones(n + 1, dtype=bool)
+
+    for i, value in enumerate(uniques):
+        try:
+            addr = ipaddress.ip_address(str(value).strip())
+        except ValueError:
+            continue
+        packed = int(addr)
+        if addr.version == 4:
+            v4[i] = packed
+            v4_na[i] = False
+        else:
+            hi[i] = packed >> 64
+            lo[i] = packed & _MASK64
+            v6_na[i] = False
+
+    codes = cat.cat.codes.to_numpy()
+    return (
+        pd.arrays.IntegerArray(v4.take(codes), v4_na.take(codes)),
+        pd.arrays.IntegerArray(hi.take(codes), v6_na.take(codes)),
+        pd.arrays.IntegerArray(lo.take(codes), v6_na.take(codes)),
+    )
+
+
+def concat_frames(frames) -> pd.DataFrame:
+    """
+    pd.concat для типизированных кусков: категориальные колонки с разными
+    словарями объединяются в один словарь (обычный concat свёл бы их к object).
+    """
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    categorical = {col for f in frames for col in f.columns if isinstance(f[col].dtype, pd.CategoricalDtype)}
+    if categorical:
+        frames = [f.copy(deep=False) for f in frames]
+        for col in categorical:
+            parts = [f[col] if isinstance(f[col].dtype, pd.CategoricalDtype) else f[col].astype("category")
+                     for f in frames if col in f.columns]
+            dtype = pd.CategoricalDtype(union_categoricals(parts, ignore_order=True).categories)
+            for f in frames:
+                if col in f.columns:
+                    f[col] = f[col].astype(dtype)
+    return pd.concat(frames, ignore_index=True)
+
+
+def encode_display(values: pd.Series) -> tuple[np.ndarray, list[str]]:
+    """
+    Колонка -> (коды строк int32, отображаемые строки уникальных значений).
+    str() вызывается один раз на уникальное значение; пропуски (<NA>, NaN, NaT, None) -> код -1.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    return codes.astype(np.int32, copy=False), [str(u) for u in uniques]
+
+
+class RowSourceIndex:
+    """
+    Записи, уже попавшие в таблицу, по месту в источнике: (файл, source_pos),
+    где source_pos — смещение строки в файле или номер записи SQL-дампа (см.
+    LogParser.parse). Нужен, чтобы повторный разбор тех же строк (тот же файл,
+    пересекающиеся куски, повторное дочитывание) не удваивал таблицу.
+    Одинаковые по содержимому события из разных строк — разные записи.
+
+    Файл записи — колонка source_file (разбор нескольких файлов), иначе
+    source, переданный вызывающим. Кадры без source_pos не сравниваются:
+    все их строки считаются новыми.
+
+    Позиции файла хранятся отсортированными кусками int64: пачка добавляет
+    кусок, последний кусок сливается с предыдущим, пока он не меньше половины
+    предыдущего. Кусков O(log n), каждая позиция переписывается O(log n) раз;
+    кусок, диапазон которого не пересекается с пачкой (дочитывание конца
+    файла), при проверке пропускается.
+    """
+
+    COLUMN = "source_pos"
+
+    def __init__(self) -> None:
+        self._runs: dict[str, list[np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(run) for runs in self._runs.values() for run in runs)
+
+    def clear(self) -> None:
+        self._runs = {}
+
+    def add(self, df: pd.DataFrame, source: str = "") -> None:
+        """Запомнить строки df без проверки."""
+        for key, rows in self._by_source(df, source):
+            self._insert(key, df[self.COLUMN].to_numpy(dtype=np.int64)[rows])
+
+    def drop_seen(self, df: pd.DataFrame, source: str = "") -> pd.DataFrame:
+        """Строки df, которых ещё нет среди запомненных, и запоминает их."""
+        if self.COLUMN not in df.columns:
+            return df
+        positions = df[self.COLUMN].to_numpy(dtype=np.int64)
+        new = np.ones(len(df), dtype=bool)
+        for key, rows in self._by_source(df, source):
+            pos = positions[rows]
+            seen = self._seen(key, pos)
+            new[rows] = ~seen
+            self._insert(key, pos[~seen])
+        return df if new.all() else df[new].reset_index(drop=True)
+
+    def _by_source(self, df: pd.DataFrame, source: str):
+        """(файл, строки df из него): по колонке source_file или все строки — source."""
+        if self.COLUMN not in df.columns or not len(df):
+            return []
+        if "source_file" not in df.columns:
+            return [(source, slice(None))]
+        codes, files = pd.factorize(df["source_file"])
+        return [(str(name), codes == i) for i, name in enumerate(files)]
+
+    def _seen(self, key: str, pos: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(pos), dtype=bool)
+        if not len(pos):
+            return seen
+        lo, hi = pos.min(), pos.max()
+        for run in self._runs.get(key, ()):
+            if run[0] > hi or run[-1] < lo:
+                continue
+            at = np.searchsorted(run, pos).clip(max=len(run) - 1)
+            seen |= run[at] == pos
+        return seen
+
+    def _insert(self, key: str, pos: np.ndarray) -> None:
+        if not len(pos):
+            return
+        runs = self._runs.setdefault(key, [])
+        runs.append(np.unique(pos))
+        while len(runs) > 1 and 2 * len(runs[-1]) >= len(runs[-2]):
+            last = runs.pop()
+            runs[-1] = np.union1d(runs[-1], last)
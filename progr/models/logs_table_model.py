@@ -1,41 +1,411 @@
 # models/logs_table_model.py
 from __future__ import annotations
+
+import numpy as np
+import pandas as pd
 from PyQt6.QtGui import QColor
 from PyQt6.QtCore import (
     Qt,
     QAbstractTableModel,
     QModelIndex,
     QVariant,
+    pyqtSignal,
 )
 
+from progr.models.check_store import CheckStore, CheckedValues
+from progr.models.log_schema import encode_display
+from progr.utils_app.apache_time import NAT, date_label_ns, time_label_ns, wall_clock
+from progr.config_app.parser_config import PARSER_CONFIG
+
+
+class DisplayColumn:
+    """
+    Колонка таблицы в словарном виде: коды строк (int32) + отображаемые строки
+    уникальных значений (labels). Код 0 — всегда "" (пропуск или колонки нет
+    в данных). Текст ячейки — labels[codes[row]], без str() при отрисовке.
+
+    Массив кодов растёт с запасом (как list), поэтому дописывание пачек не
+    копирует всю колонку; пока колонка во всех строках пустая, массив не хранится.
+    """
+
+    def __init__(self) -> None:
+        self.labels: list[str] = [""]
+        self._index: dict[str, int] = {"": 0}
+        self._codes: np.ndarray | None = None
+        self._size = 0
+        self._ranks: np.ndarray | None = None
+        self._rows_index: tuple[int, np.ndarray, np.ndarray] | None = None
+        self._counts = np.zeros(1, dtype=np.int64)  # число строк по коду значения (ведётся при дописывании)
+        self._parsed: dict = {}  # функция разбора -> int64-значения labels (индекс — код)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def codes(self) -> np.ndarray:
+        """Коды всех строк (для пустой колонки — нули)."""
+        if self._codes is None:
+            return np.zeros(self._size, dtype=np.int32)
+        return self._codes[:self._size]
+
+    def code(self, row: int) -> int:
+        return 0 if self._codes is None else int(self._codes[row])
+
+    def label(self, row: int) -> str:
+        if self._codes is None:
+            return ""
+        return self.labels[self._codes[row]]
+
+    def extend(self, values: pd.Series | None, n: int) -> None:
+        """Дописывает n строк: значения колонки DataFrame или пустые (values=None)."""
+        if values is None:
+            if self._codes is not None:
+                self._reserve(n)
+                self._codes[self._size:self._size + n] = 0
+            self._size += n
+            self._counts[0] += n
+            return
+
+        local_codes, local_labels = encode_display(values)
+        # Последний элемент — для кода -1 (пропуск)
+        mapping = np.array([self._code_of(label) for label in local_labels] + [0], dtype=np.int32)
+        codes = mapping.take(local_codes)
+        self._add_counts(np.bincount(codes, minlength=len(self.labels)))
+        if self._codes is None:
+            if not codes.any():
+                self._size += n
+                return
+            self._codes = np.zeros(self._size + n, dtype=np.int32)
+        self._reserve(n)
+        self._codes[self._size:self._size + n] = codes
+        self._size += n
+
+    def value_counts(self, rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        Число строк по коду значения: по всем строкам — готовые счётчики,
+        которые ведутся при дописывании; по подмножеству rows — bincount кодов.
+        """
+        if rows is None:
+            return np.pad(self._counts, (0, len(self.labels) - len(self._counts)))
+        if self._codes is None:
+            return np.pad(np.array([len(rows)], dtype=np.int64), (0, len(self.labels) - 1))
+        return np.bincount(self.codes.take(rows), minlength=len(self.labels))
+
+    def _add_counts(self, counts: np.ndarray) -> None:
+        if len(counts) > len(self._counts):
+            self._counts = np.pad(self._counts, (0, len(counts) - len(self._counts)))
+        self._counts[:len(counts)] += counts
+
+    def lookup(self, label: str) -> int | None:
+        """Код значения или None, если такого значения в колонке нет."""
+        return self._index.get(label)
+
+    def rows_of(self, codes) -> np.ndarray:
+        """
+        Строки хранилища со значениями codes по возрастанию — через инвертированный
+        индекс «код -> строки» (строки, упорядоченные по коду, + границы кодов).
+        Индекс строится при первом запросе и перестраивается после дописывания строк.
+        """
+        if self._codes is None:
+            return np.arange(self._size) if 0 in codes else np.empty(0, dtype=np.int64)
+        if self._rows_index is None or self._rows_index[0] != self._size:
+            codes_all = self.codes
+            order = np.argsort(codes_all, kind="stable")
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(codes_all, minlength=len(self.labels)))])
+            self._rows_index = (self._size, order, offsets)
+        _, order, offsets = self._rows_index
+        parts = [order[offsets[c]:offsets[c + 1]] for c in codes if 0 <= c < len(offsets) - 1]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def ranks(self) -> np.ndarray:
+        """Ранг каждого значения (индекс — код) для сортировки, см. label_ranks; кэшируется до новых значений."""
+        if self._ranks is None or len(self._ranks) != len(self.labels):
+            self._ranks = label_ranks(self.labels)
+        return self._ranks
+
+    def parsed(self, parse) -> np.ndarray:
+        """
+        parse(label) -> int64 для каждого значения (индекс — код). Значения только
+        дописываются, поэтому кэш досчитывается для новых значений, старые не разбираются.
+        """
+        done = self._parsed.get(parse, np.empty(0, dtype=np.int64))
+        if len(done) < len(self.labels):
+            fresh = np.fromiter((parse(label) for label in self.labels[len(done):]), dtype=np.int64,
+                                count=len(self.labels) - len(done))
+            done = self._parsed[parse] = np.concatenate([done, fresh])
+        return done
+
+    def row_ranks(self) -> np.ndarray:
+        """Ранги значений всех строк (ключ сортировки)."""
+        if self._codes is None:
+            return np.zeros(self._size, dtype=np.int64)
+        return self.ranks().take(self.codes)
+
+    def _reserve(self, n: int) -> None:
+        need = self._size + n
+        if need > len(self._codes):
+            grown = np.zeros(max(need, 2 * len(self._codes)), dtype=np.int32)
+            grown[:self._size] = self._codes[:self._size]
+            self._codes = grown
+
+    def _code_of(self, label: str) -> int:
+        code = self._index.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.labels.append(label)
+            self._index[label] = code
+        return code
+
+
+class TimestampColumn:
+    """
+    Скрытая колонка момента времени записи (timestamp из разбора): наносекунды
+    от эпохи в UTC, int64, NaT — NAT. В таблице не показывается — по ней
+    сортируются date/time и проверяются условия time>=... Растёт с запасом,
+    как DisplayColumn; пока ни в одной пачке не было timestamp, массив не хранится.
+    """
+
+    def __init__(self) -> None:
+        self._values: np.ndarray | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def values(self) -> np.ndarray | None:
+        """Моменты всех строк или None, если timestamp в данных не было."""
+        return None if self._values is None else self._values[:self._size]
+
+    def extend(self, values: pd.Series | None, n: int) -> None:
+        """Дописывает n строк: колонку timestamp DataFrame или NaT (values=None)."""
+        if values is None and self._values is None:
+            self._size += n
+            return
+        if self._values is None:
+            self._values = np.full(self._size + n, NAT, dtype=np.int64)
+        need = self._size + n
+        if need > len(self._values):
+            grown = np.full(max(need, 2 * len(self._values)), NAT, dtype=np.int64)
+            grown[:self._size] = self._values[:self._size]
+            self._values = grown
+        self._values[self._size:need] = NAT if values is None else \
+            pd.DatetimeIndex(pd.to_datetime(values, utc=True, errors="coerce")).asi8
+        self._size = need
+
+
+def label_ranks(labels: list[str]) -> np.ndarray:
+    """
+    Ранги отображаемых значений для сортировки (равные значения — равный ранг).
+    Если все непустые значения — числа (code, size, id ...), сравниваются
+    как числа, иначе как текст без учёта регистра. Пустое значение — первым.
+    """
+    try:
+        keys = np.array([-np.inf] + [float(label) for label in labels[1:]])
+    except ValueError:
+        keys = np.array([label.lower() for label in labels], dtype=object)
+    return np.unique(keys, return_inverse=True)[1].astype(np.int64).reshape(-1)
+
+
+def descending(order: np.ndarray, keys: list[np.ndarray]) -> np.ndarray:
+    """
+    Стабильный порядок по убыванию из стабильного порядка order по возрастанию
+    тех же ключей: группы равных ключей идут в обратном порядке, строки
+    внутри группы — в прежнем. Без повторной сортировки, за O(n).
+    """
+    n = len(order)
+    if n < 2:
+        return order
+    same = np.ones(n - 1, dtype=bool)
+    for key in keys:
+        k = key.take(order)
+        same &= k[1:] == k[:-1]
+    group = np.concatenate([[0], np.cumsum(~same)])
+    starts = np.flatnonzero(np.concatenate([[True], ~same]))
+    ends = np.append(starts[1:], n)
+    pos = (n - ends).take(group) + (np.arange(n) - starts.take(group))
+    out = np.empty_like(order)
+    out[pos] = order
+    return out
+
 
 class LogsTableModel(QAbstractTableModel):
     """
     Модель таблицы логов с чекбоксами в КАЖДОЙ ячейке.
 
     Основные моменты:
-    - Чекбоксы реализованы через ItemIsUserCheckable + CheckStateRole в data/setData.
+    - Данные хранятся по колонкам (DisplayColumn): коды строк + словарь
+      отображаемых строк, собранные прямо из DataFrame разбора, без копии
+      в виде списка списков. Строка для ячейки готовится один раз на
+      уникальное значение, цвет кода ответа — тоже (кэш по коду значения).
+    - Чекбоксы реализованы через ItemIsUserCheckable + CheckStateRole в data/setData;
+      состояние хранится разреженно (CheckStore), по отмеченным ячейкам.
     - Стандартный делегат Qt сам рисует чекбокс + текст и меняет состояние по клику.
     - Есть удобные хелперы для сборки отмеченных значений.
+    - Строки отдаются представлению порциями (canFetchMore/fetchMore по
+      PARSER_CONFIG["table"]["fetch_rows"]): rowCount() — сколько строк уже
+      показано, total_rows() — сколько хранится. Сортировка, отметки и поиск
+      значений работают по всем хранимым строкам.
+    - Сортировка не переставляет данные: порядок показа — индекс-перестановка
+      строк хранилища (argsort по типизированным рангам значений, см. label_ranks;
+      date/time — хронологически по скрытой колонке timestamp, см. TimestampColumn). Порядок по возрастанию
+      для колонки кэшируется, убывающий получается из него без сортировки.
+    - Фильтр (set_query, см. models/log_query.py) — маска по строкам хранилища;
+      таблица показывает подмножество строк в текущем порядке сортировки,
+      данные при этом не копируются.
+    - rowsAppended(n) — в хранилище дописано n строк (append_frame). Выдаётся
+      при каждом дописывании, даже если представлению строки ещё не отданы
+      (тогда rowsInserted нет) — для окон, считающих по всем строкам.
 
     """
 
-    def __init__(self, rows: list[list], headers: list[str], parent=None):
+    rowsAppended = pyqtSignal(int)
+
+    def __init__(self, frame: pd.DataFrame | None = None, headers: list[str] | None = None, parent=None):
         super().__init__(parent)
-        self._rows: list[list] = list(rows or [])
-        self._headers: list[str] = list(headers or [])
+        self._set_headers(headers or [])
+        self._fetch_rows = max(1, int(PARSER_CONFIG["table"]["fetch_rows"]))
+        self._extend(frame)
+        self._loaded = min(self._n, self._fetch_rows)
+
+        # состояния чекбоксов ячеек
+        self._checks = CheckStore(self.columnCount(), self._n)
+        self._checked_values = CheckedValues(self.columnCount())  # отмеченные значения по колонкам
+
+    def _set_headers(self, headers: list[str]) -> None:
+        self._headers: list[str] = list(headers)
+        self._columns: list[DisplayColumn] = [DisplayColumn() for _ in self._headers]
+        self._n = 0
+        lowered = [h.lower() for h in self._headers]
+        self._code_col = lowered.index("code") if "code" in lowered else -1
+        self._code_colors: dict[int, QColor | None] = {}  # код значения колонки code -> цвет
+        self._order: np.ndarray | None = None     # перестановка строк хранилища после сортировки
+        self._filter: np.ndarray | None = None    # маска строк хранилища, прошедших фильтр
+        self._query = None                        # фильтр (LogQuery), применяется и к дописанным строкам
+        self._view: np.ndarray | None = None      # показываемые строки хранилища по порядку (None — 0..n-1)
+        self._view_pos: np.ndarray | None = None  # обратный индекс: строка хранилища -> позиция в _view (-1 — скрыта)
+        self._sort_orders: dict[int, np.ndarray] = {}  # колонка -> стабильный порядок по возрастанию
+        self._timestamps = TimestampColumn()       # timestamp строк (в таблице не показывается)
+
+    def _extend(self, frame: pd.DataFrame | None) -> int:
+        """Дописывает строки DataFrame во все колонки; колонок, которых нет в frame, — пустые."""
+        if frame is None or not len(frame):
+            return 0
+        n = len(frame)
+        for name, column in zip(self._headers, self._columns):
+            column.extend(frame[name] if name in frame.columns else None, n)
+        self._timestamps.extend(frame["timestamp"] if "timestamp" in frame.columns else None, n)
+        self._n += n
+        return n
 
-        # матрица состояний чекбоксов для каждой ячейки
-        r, c = self.rowCount(), self.columnCount()
-        self._checked: list[list[bool]] = [[False for _ in range(c)] for __ in range(r)]
-    
     def headers(self):
 
         return list(self._headers)
 
+    def value(self, row: int, col: int) -> str:
+        """Отображаемое значение ячейки."""
+        return self._columns[col].label(self._row(row))
+
+    def _row(self, row: int) -> int:
+        """Строка таблицы -> строка хранилища."""
+        return row if self._view is None else int(self._view[row])
+
+    def _positions(self, rows: np.ndarray) -> np.ndarray:
+        """Строки хранилища -> позиции в таблице."""
+        if self._view is None:
+            return rows
+        if self._view_pos is None:
+            self._view_pos = np.full(self._n, -1, dtype=np.int64)
+            self._view_pos[self._view] = np.arange(len(self._view))
+        return self._view_pos.take(rows)
+
+    def _visible(self) -> int:
+        """Сколько строк в таблице с учётом фильтра (отданных представлению и нет)."""
+        return self._n if self._view is None else len(self._view)
+
+    def _rebuild_view(self) -> None:
+        """Показываемые строки: порядок сортировки, ограниченный маской фильтра."""
+        if self._filter is None:
+            self._view = self._order
+        elif self._order is None:
+            self._view = np.flatnonzero(self._filter)
+        else:
+            self._view = self._order[self._filter.take(self._order)]
+        self._view_pos = None
+
+    def column(self, name: str) -> DisplayColumn | None:
+        """Колонка хранилища по имени (для запросов, см. models/log_query.py)."""
+        return self._columns[self._headers.index(name)] if name in self._headers else None
+
+    def timestamps(self, start: int = 0) -> np.ndarray | None:
+        """Моменты строк хранилища начиная со start (нс UTC, NaT — NAT) или None, если timestamp нет."""
+        values = self._timestamps.values
+        return None if values is None else values[start:]
+
+    def wall_clock(self, start: int = 0) -> np.ndarray | None:
+        """
+        Моменты строк «по часам лога» — дата и время как показаны в таблице, без пояса
+        (нс, NaT — NAT) — начиная со start; None, если нет колонок date и time.
+        """
+        date_col, time_col = self.column("date"), self.column("time")
+        if date_col is None or time_col is None:
+            return None
+        return wall_clock(date_col.parsed(date_label_ns).take(date_col.codes[start:]),
+                          time_col.parsed(time_label_ns).take(time_col.codes[start:]))
+
+    # ------------- фильтр -------------
+    def set_query(self, query) -> int:
+        """
+        Показывает только строки, прошедшие фильтр query (LogQuery; None — все строки).
+        Маска считается по всем хранимым строкам, дописанные позже строки
+        проверяются по тому же фильтру. Возвращает число показываемых строк.
+        """
+        mask = query.mask(self) if query is not None else None
+        self.beginResetModel()
+        self._query = query
+        self._filter = mask
+        self._rebuild_view()
+        self._loaded = min(self._visible(), self._fetch_rows)
+        self.endResetModel()
+        return self._visible()
+
     # ------------- базовый интерфейс модели -------------
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self._rows)
+        return 0 if parent.isValid() else self._loaded
+
+    def total_rows(self) -> int:
+        """Сколько строк хранится в модели (rowCount — сколько из них уже отдано представлению)."""
+        return self._n
+
+    def visible_rows(self) -> int:
+        """Сколько строк проходит фильтр (все хранимые, если фильтра нет)."""
+        return self._visible()
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < self._visible()
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Отдаёт представлению следующую порцию хранимых строк."""
+        visible = self._visible()
+        if parent.isValid() or self._loaded >= visible:
+            return
+        count = min(self._fetch_rows, visible - self._loaded)
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def column_sample(self, col: int, size: int) -> list[str]:
+        """
+        Отображаемые значения колонки по size строкам, взятым равномерно по всем
+        хранимым строкам (для оценки ширины колонки без обхода таблицы).
+        """
+        if not self._n or size <= 0:
+            return []
+        rows = np.unique(np.linspace(0, self._n - 1, num=min(size, self._n)).astype(np.int64))
+        column = self._columns[col]
+        return [column.labels[code] for code in column.codes.take(rows).tolist()]
 
     def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return len(self._headers)
@@ -47,7 +417,7 @@ class LogsTableModel(QAbstractTableModel):
                     return self._headers[section]
                 return ""
             else:
-                # нумерация строк 
+                # нумерация строк
                 return str(section + 1)
         return None
 
@@ -55,39 +425,36 @@ class LogsTableModel(QAbstractTableModel):
         if not index.isValid():
             return None
 
-        r, c = index.row(), index.column()
+        r, c = self._row(index.row()), index.column()
 
         if role == Qt.ItemDataRole.DisplayRole:
             # Текст рядом с чекбоксом
-            try:
-                return str(self._rows[r][c])
-            except Exception:
-                return ""
+            return self._columns[c].label(r)
 
         if role == Qt.ItemDataRole.CheckStateRole:
             # Состояние чекбокса в ячейке
-            return Qt.CheckState.Checked if self._checked[r][c] else Qt.CheckState.Unchecked
+            return Qt.CheckState.Checked if self._checks.is_checked(r, c) else Qt.CheckState.Unchecked
 
-        if role == Qt.ItemDataRole.ForegroundRole:
-            try:
-                col_name = self._headers[c].lower()
-            except Exception:
-                col_name = ""
-            if col_name == "code":
-
-                val = str(self._rows[r][c]).strip()
-                try:
-                    code = int(val)
-                except Exception:
-                    code = None
-                if code is not None:
-                    if 200 <= code <= 299:
-                        return QColor(0, 128, 0)   # зелёный
-                    if 300 <= code <= 399:
-                        return QColor(255, 165, 0)   # оранжевый
-                    if 400 <= code <= 599:
-                        return QColor(200, 0, 0)   # красный
+        if role == Qt.ItemDataRole.ForegroundRole and c == self._code_col:
+            value_code = self._columns[c].code(r)
+            if value_code not in self._code_colors:
+                self._code_colors[value_code] = self._code_color(self._columns[c].labels[value_code])
+            return self._code_colors[value_code]
+
+        return None
 
+    @staticmethod
+    def _code_color(value: str) -> QColor | None:
+        try:
+            code = int(value.strip())
+        except ValueError:
+            return None
+        if 200 <= code <= 299:
+            return QColor(0, 128, 0)   # зелёный
+        if 300 <= code <= 399:
+            return QColor(255, 165, 0)   # оранжевый
+        if 400 <= code <= 599:
+            return QColor(200, 0, 0)   # красный
         return None
 
     def flags(self, index: QModelIndex):
@@ -103,133 +470,293 @@ class LogsTableModel(QAbstractTableModel):
             return False
 
         if role == Qt.ItemDataRole.CheckStateRole:
-            r, c = index.row(), index.column()
+            r, c = self._row(index.row()), index.column()
             try:
                 state = Qt.CheckState(value)
             except Exception:
                 state = Qt.CheckState.Unchecked
 
             new_val = (state == Qt.CheckState.Checked)
-            if self._checked[r][c] != new_val:
-                self._checked[r][c] = new_val
+            if self._checks.set(r, c, new_val):
+                code = np.array([self._columns[c].code(r)])
+                if new_val:
+                    self._checked_values.add(c, code)
+                else:
+                    self._checked_values.remove(c, code)
                 self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
             return True
 
         return False
 
-
-    def set_rows(self, rows: list[list], headers: list[str] | None = None):
+    def set_frame(self, frame: pd.DataFrame | None, headers: list[str] | None = None):
         """
         Полная замена данных модели (например, после загрузки/фильтрации).
-        Корректно пересоздаёт матрицу чекбоксов нужного размера.
+        Отметки чекбоксов сбрасываются.
         """
         self.beginResetModel()
-        self._rows = list(rows or [])
-        if headers is not None:
-            self._headers = list(headers or [])
-        r, c = self.rowCount(), self.columnCount()
-        self._checked = [[False for _ in range(c)] for __ in range(r)]
+        self._set_headers(self._headers if headers is None else headers)
+        self._extend(frame)
+        self._loaded = min(self._n, self._fetch_rows)
+        self._checks.reset(self.columnCount(), self._n)
+        self._checked_values.reset(self.columnCount())
         self.endResetModel()
 
+    def set_rows(self, rows: list[list], headers: list[str] | None = None):
+        """Полная замена данных списком строк (значения в порядке headers)."""
+        headers = self._headers if headers is None else headers
+        self.set_frame(pd.DataFrame(list(rows or []), columns=headers, dtype=object), headers)
+
+    def clear(self):
+        self.set_frame(None)
+
+    def append_frame(self, frame: pd.DataFrame) -> int:
+        """
+        Дописывает записи DataFrame в конец таблицы через beginInsertRows/endInsertRows,
+        не сбрасывая модель: отметки и прокрутка существующих строк сохраняются.
+        Преобразуются только новые строки. Возвращает количество добавленных строк.
+        Если представлению были отданы все строки (конец таблицы на виду, например
+        при слежении за файлом), новые строки показываются сразу — не больше одной
+        порции, остальное отдаётся через fetchMore.
+        """
+        if frame is None or not len(frame):
+            return 0
+        shown_all = self._loaded == self._visible()
+        first = self._n
+        n = self._extend(frame)
+        self._checks.extend(n)
+        self._sort_orders.clear()
+        if self._view is not None or self._query is not None:
+            # новые строки — в конец (до следующей сортировки), только прошедшие фильтр
+            new_rows = np.arange(first, self._n)
+            if self._query is not None:
+                new_mask = self._query.mask(self, first)
+                self._filter = np.concatenate([self._filter, new_mask])
+                new_rows = new_rows[new_mask]
+            if self._order is not None:
+                self._order = np.concatenate([self._order, np.arange(first, self._n)])
+            base = self._view if self._view is not None else np.arange(first)
+            self._view = np.concatenate([base, new_rows])
+            self._view_pos = None
+        added = self._visible() - self._loaded
+        if shown_all and added > 0:
+            count = min(added, self._fetch_rows)
+            self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+            self._loaded += count
+            self.endInsertRows()
+        self.rowsAppended.emit(n)
+        return n
+
+    def append_rows(self, rows: list[list]):
+        """Дописывает строки-списки (значения в порядке headers), см. append_frame."""
+        rows = list(rows or [])
+        if rows:
+            self.append_frame(pd.DataFrame(rows, columns=self._headers, dtype=object))
+
     def clear_checks(self):
-        """Снять все отметки чекбоксов и обновить вид."""
-        if not self._checked:
+        """Снять все отметки чекбоксов и обновить вид (одно dataChanged на занятый отметками диапазон)."""
+        rect = self._checks.clear()
+        self._checked_values.clear()
+        if rect is None:
             return
-        for r in range(len(self._checked)):
-            for c in range(len(self._checked[r])):
-                if self._checked[r][c]:
-                    self._checked[r][c] = False
-                    idx = self.index(r, c)
-                    self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.CheckStateRole])
+        r0, r1, c0, c1 = rect
+        if self._view is not None:
+            r0, r1 = 0, self._n - 1
+        if r0 >= self._loaded:
+            return
+        r1 = min(r1, self._loaded - 1)
+        self.dataChanged.emit(self.index(r0, c0), self.index(r1, c1), [Qt.ItemDataRole.CheckStateRole])
+
+    # ------------- массовые отметки -------------
+    def visible_row_ids(self) -> np.ndarray:
+        """Строки хранилища, показываемые в таблице (с учётом фильтра и сортировки)."""
+        return np.arange(self._n) if self._view is None else self._view
+
+    def check_value(self, col: int, value: str, checked: bool = True) -> int:
+        """
+        Отмечает (снимает) ячейки колонки col со значением value во всех
+        показываемых строках — по инвертированному индексу колонки.
+        Возвращает число затронутых строк.
+        """
+        column = self._columns[col]
+        code = column.lookup(value)
+        if code is None:
+            return 0
+        rows = column.rows_of([code])
+        if self._view is not None:
+            rows = rows[self._positions(rows) >= 0]
+        return self._bulk_check([col], rows, checked)
+
+    def check_mask(self, mask: np.ndarray, cols: list[int] | None = None, checked: bool = True) -> int:
+        """
+        Отмечает (снимает) ячейки колонок cols (None — всех) в строках хранилища
+        по маске mask, ограниченной показываемыми строками. Возвращает число строк.
+        """
+        if self._filter is not None:
+            mask = mask & self._filter
+        return self._bulk_check(cols, np.flatnonzero(mask), checked)
+
+    def check_visible(self, cols: list[int] | None = None, checked: bool = True) -> int:
+        """Отмечает (снимает) ячейки колонок cols (None — всех) во всех показываемых строках."""
+        return self._bulk_check(cols, self.visible_row_ids(), checked)
+
+    def invert_checks(self, cols: list[int] | None = None) -> int:
+        """Инвертирует отметки колонок cols (None — всех) в показываемых строках."""
+        rows = self.visible_row_ids()
+        cols = list(range(self.columnCount())) if cols is None else cols
+        for col in cols:
+            added, removed = self._checks.invert(col, rows)
+            codes = self._columns[col].codes
+            self._checked_values.add(col, codes.take(added))
+            self._checked_values.remove(col, codes.take(removed))
+        self._emit_checks_changed(cols)
+        return len(rows)
+
+    # ------------- статистика значений -------------
+    def facet(self, col: int, top: int = 20) -> dict:
+        """
+        Статистика значений колонки по показываемым строкам (с учётом фильтра):
+        rows — строк, distinct — различных непустых значений, empty — пустых,
+        empty_ratio — доля пустых, top — [(значение, число строк), ...] по убыванию.
+        Без фильтра берутся счётчики, которые колонка ведёт при дописывании строк.
+        """
+        column = self._columns[col]
+        counts = column.value_counts(self._view if self._filter is not None else None)
+        rows = int(counts.sum())
+        values = counts[1:]
+        nonzero = np.flatnonzero(values)
+        if len(nonzero) > top:
+            nonzero = nonzero[np.argpartition(values[nonzero], -top)[-top:]]
+        best = nonzero[np.lexsort((nonzero, -values[nonzero]))]
+        return {
+            "column": self._headers[col],
+            "rows": rows,
+            "distinct": int(np.count_nonzero(values)),
+            "empty": int(counts[0]),
+            "empty_ratio": float(counts[0]) / rows if rows else 0.0,
+            "top": [(column.labels[code + 1], int(values[code])) for code in best.tolist()],
+        }
+
+    def _bulk_check(self, cols: list[int] | None, rows: np.ndarray, checked: bool) -> int:
+        cols = list(range(self.columnCount())) if cols is None else cols
+        for col in cols:
+            changed = self._checks.set_many(col, rows, checked)
+            if checked:
+                self._checked_values.add(col, self._columns[col].codes.take(changed))
+            else:
+                self._checked_values.remove(col, self._columns[col].codes.take(changed))
+        self._emit_checks_changed(cols)
+        return len(rows)
 
+    def _emit_checks_changed(self, cols: list[int]) -> None:
+        """Одно dataChanged на отданные представлению строки в диапазоне колонок cols."""
+        if cols and self._loaded:
+            self.dataChanged.emit(self.index(0, min(cols)), self.index(self._loaded - 1, max(cols)),
+                                  [Qt.ItemDataRole.CheckStateRole])
 
     def get_checked_cells(self) -> list[tuple[int, int]]:
-        """Список координат (row, col) всех отмеченных ячеек."""
-        out = []
-        for r, row in enumerate(self._checked):
-            for c, v in enumerate(row):
-                if v:
-                    out.append((r, c))
-        return out
+        """Список координат (row, col) отмеченных ячеек, видимых в таблице (в порядке её строк)."""
+        cells = self._checks.cells()
+        if self._view is None or not cells:
+            return cells
+        rows = self._positions(np.array([r for r, _ in cells], dtype=np.int64)).tolist()
+        return sorted((r, c) for r, (_, c) in zip(rows, cells) if r >= 0)
 
     def get_checked_values(self) -> list:
         """Список значений (текстов) всех отмеченных ячеек."""
-        out = []
-        for r, c in self.get_checked_cells():
-            try:
-                out.append(self._rows[r][c])
-            except Exception:
-                pass
-        return out
+        return [self.value(r, c) for r, c in self.get_checked_cells()]
 
     def get_checked_values_by_column(self, col: int) -> list:
-        """Список значений отмеченных ячеек только из колонки col."""
-        out = []
+        """
+        Список значений отмеченных ячеек только из колонки col (в порядке хранилища;
+        учитываются и строки, скрытые фильтром — отметки при фильтрации сохраняются).
+        """
+        if not (0 <= col < self.columnCount()):
+            return []
+        column = self._columns[col]
+        return [column.label(r) for r in self._checks.column_rows(col).tolist()]
+
+    def checked_values(self, col: int) -> list[str]:
+        """
+        Отмеченные непустые значения колонки col без повторов, в порядке первой
+        отметки — из индекса отмеченных значений, без обхода строк.
+        """
         if not (0 <= col < self.columnCount()):
-            return out
-        for r in range(self.rowCount()):
-            if self._checked[r][col]:
-                out.append(self._rows[r][col])
-        return out
+            return []
+        labels = self._columns[col].labels
+        return [labels[code] for code in self._checked_values.codes(col) if code]
 
-    # ------------- сортировка (по тексту) -------------
+    # ------------- сортировка -------------
     def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder) -> None:
         """
-        Простейшая сортировка по значению DisplayRole.
-        Матрица чекбоксов переупорядочивается вместе со строками.
+        Сортировка по колонке (клик по заголовку). Порядок по возрастанию
+        считается один раз и кэшируется до изменения данных, поэтому
+        переключение возрастание/убывание не сортирует заново.
         """
         if not (0 <= column < self.columnCount()):
             return
-        self.layoutAboutToBeChanged.emit()
-
-        # подготавливаем пары (строка, чек-строка), чтобы сортировать синхронно
-        paired = list(zip(self._rows, self._checked))
-        reverse = (order == Qt.SortOrder.DescendingOrder)
-
-        def key_func(pair):
-            row, _chk = pair
-            val = row[column] if 0 <= column < len(row) else ""
-            return str(val).lower()
-
-        paired.sort(key=key_func, reverse=reverse)
-
-        # распаковываем обратно
-        if paired:
-            self._rows, self._checked = map(list, zip(*paired))
+        ascending = self._sort_orders.get(column)
+        if ascending is None:
+            keys = self._sort_keys(column)
+            ascending = np.lexsort(keys[::-1]) if len(keys) > 1 else np.argsort(keys[0], kind="stable")
+            self._sort_orders[column] = ascending
+        if order == Qt.SortOrder.DescendingOrder:
+            self._set_view(descending(ascending, self._sort_keys(column)))
         else:
-            self._rows, self._checked = [], []
+            self._set_view(ascending)
 
+    def sort_by(self, keys: list[tuple[int, Qt.SortOrder]]) -> None:
+        """
+        Стабильная сортировка по нескольким колонкам: keys — [(колонка, порядок), ...],
+        первая — главная. Равные по всем ключам строки остаются в порядке хранилища.
+        """
+        arrays = []
+        for column, order in keys:
+            if not (0 <= column < self.columnCount()):
+                continue
+            for key in self._sort_keys(column):
+                arrays.append(~key if order == Qt.SortOrder.DescendingOrder else key)
+        if arrays:
+            self._set_view(np.lexsort(arrays[::-1]))
+
+    def _sort_keys(self, column: int) -> list[np.ndarray]:
+        """
+        Ключи строк для колонки: ранги значений; для date/time — моменты времени:
+        timestamp (UTC, записи с разными поясами идут хронологически), при равенстве
+        или без timestamp — дата и время по часам лога.
+        """
+        if self._headers[column] in ("date", "time"):
+            keys = [k for k in (self.timestamps(), self.wall_clock()) if k is not None]
+            if keys:
+                return keys
+        return [self._columns[column].row_ranks()]
+
+    def _set_view(self, order: np.ndarray) -> None:
+        """Новый порядок показа строк (перестановка строк хранилища)."""
+        self.layoutAboutToBeChanged.emit()
+        self._order = order
+        self._rebuild_view()
         self.layoutChanged.emit()
 
-
-
     def checked_columns(self) -> list[int]:
         """Список индексов колонок, где есть хотя бы одна отмеченная ячейка."""
-        res = []
-        for c in range(self.columnCount()):
-            if any(self._checked[r][c] for r in range(self.rowCount())):
-                res.append(c)
-        return res
+        return self._checked_values.columns()
 
     def checked_rows(self) -> list[int]:
-        """Список индексов строк, где есть хотя бы одна отмеченная ячейка."""
-        res = []
-        for r in range(self.rowCount()):
-            if any(self._checked[r]):
-                res.append(r)
-        return res
+        """Список индексов строк таблицы, где есть хотя бы одна отмеченная ячейка."""
+        rows = self._positions(self._checks.rows())
+        return np.sort(rows[rows >= 0]).tolist()
 
     def is_column_checked(self, col: int) -> bool:
         """Считалось ранее как «галка в заголовке колонки». Теперь — есть ли отмеченные ячейки в колонке."""
         if not (0 <= col < self.columnCount()):
             return False
-        return any(self._checked[r][col] for r in range(self.rowCount()))
+        return self._checks.column_has(col)
 
     def is_row_checked(self, row: int) -> bool:
         """Считалось ранее как «галка в заголовке строки». Теперь — есть ли отмеченные ячейки в строке."""
-        if not (0 <= row < self.rowCount()):
+        if not (0 <= row < self._visible()):
             return False
-        return any(self._checked[row])
+        return self._checks.row_has(self._row(row))
 
 
     def toggle_column_checked(self, col: int):
@@ -1,39 +1,67 @@
-
 from typing import Optional, List
 from PyQt6.QtCore import QThread, pyqtSignal
+from progr.utils_app.log_reader import SourceLines, iter_line_batches, detect_compression
+from progr.utils_app.line_index import LineIndex
 from progr.utils_app.logger import LOGGER
 
 
 class FileLoaderThread(QThread):
     """
     Поток для загрузки файла логов без блокировки UI.
-    Совместим по интерфейсу: finished(list[str]), error(str).
+    Совместим по интерфейсу: finished(list[str]), error(str). Прочитанный
+    целиком файл приходит как SourceLines — список строк со смещениями строк
+    в файле (по ним таблица узнаёт уже добавленные записи). Потоковое чтение
+    с разбором пачек — LogStreamThread.
+
+    Режим индекса (use_mmap=True): файл отображается в память, строится
+    LineIndex со смещениями строк и отдаётся через indexed(LineIndex);
+    строки как str не создаются. Сжатый файл отобразить нельзя — тогда он
+    читается целиком с распаковкой, и indexed получает SourceLines.
     """
 
-    finished = pyqtSignal(list)  # Сигнал при успешной загрузке (список строк)
+    finished = pyqtSignal(object)  # Сигнал при успешной загрузке (SourceLines; object — без копии в QVariantList)
     error = pyqtSignal(str)      # Сигнал с текстом ошибки
+    progress = pyqtSignal("qint64", "qint64")  # (bytes_read, total_bytes)
+    indexed = pyqtSignal(object)  # LineIndex (режим use_mmap)
+
+    READ_BATCH = 10000  # строк за одну проверку прерывания и отметку прогресса
 
-    def __init__(self, file_path: str, parent: Optional[object] = None) -> None:
+    def __init__(self, file_path: str, parent: Optional[object] = None, use_mmap: bool = False) -> None:
         super().__init__(parent)
         self._file_path = str(file_path)
+        self._use_mmap = use_mmap
 
     def run(self) -> None:
         try:
             LOGGER.info(f"[FileLoaderThread] Загрузка файла: {self._file_path}")
-            lines: List[str] = []
-            # Читаем построчно с проверкой прерывания, чтобы не подвесить закрытие
-            with open(self._file_path, "r", encoding="utf-8", errors="ignore") as f:
-                for i, line in enumerate(f):
-                    if self.isInterruptionRequested():
-                        LOGGER.info("[FileLoaderThread] Прервано по requestInterruption().")
-                        return
-                    lines.append(line)
-                    # Небольшая батч-буферизация, чтобы не раздувать память на очень больших файлах
-                    # (оставлено простым; при необходимости можно делать emit частями)
-
-            LOGGER.info(f"[FileLoaderThread] Файл успешно загружен, строк: {len(lines)}")
+            if self._use_mmap:
+                compression = detect_compression(self._file_path)
+                if compression is None:
+                    self._run_indexed()
+                    return
+                LOGGER.warning(f"[FileLoaderThread] Файл сжат ({compression}), mmap невозможен — "
+                               f"читаем с распаковкой")
+
+            chunks: List[SourceLines] = []
+            total_lines = 0
+            # Читаем пачками с проверкой прерывания, чтобы не подвесить закрытие
+            for chunk, bytes_read, total_bytes in iter_line_batches(self._file_path, self.READ_BATCH):
+                if self.isInterruptionRequested():
+                    LOGGER.info("[FileLoaderThread] Прервано по requestInterruption().")
+                    return
+                total_lines += len(chunk)
+                chunks.append(chunk)
+                self.progress.emit(bytes_read, total_bytes)
+
+            lines = SourceLines.concat(chunks)
+            LOGGER.info(f"[FileLoaderThread] Файл успешно загружен, строк: {total_lines}")
+            if self._use_mmap:
+                self.indexed.emit(lines)
+                lines = SourceLines()
             self.finished.emit(lines)
 
+        except InterruptedError:
+            LOGGER.info("[FileLoaderThread] Прервано по requestInterruption().")
         except FileNotFoundError:
             error_msg = f"Файл не найден: {self._file_path}"
             LOGGER.error(f"[FileLoaderThread] {error_msg}")
@@ -42,3 +70,12 @@ class FileLoaderThread(QThread):
             error_msg = f"Ошибка при чтении файла {self._file_path}: {e}"
             LOGGER.error(f"[FileLoaderThread] {error_msg}", exc_info=True)
             self.error.emit(error_msg)
+
+    def _run_indexed(self) -> None:
+        index = LineIndex(self._file_path,
+                          progress=self.progress.emit,
+                          cancelled=self.isInterruptionRequested)
+        LOGGER.info(f"[FileLoaderThread] Построен индекс строк: {len(index)} строк, "
+                    f"{len(index) * 8 // 1024} КБ смещений")
+        self.indexed.emit(index)
+        self.finished.emit([])
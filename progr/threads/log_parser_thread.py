@@ -1,6 +1,9 @@
 from PyQt6.QtCore import QThread, pyqtSignal
 from progr.utils_app.logger import LOGGER
 from progr.models.log_parser_model import LogParser  
+from progr.utils_app.parse_cache import get_parse_cache
+from progr.utils_app.parse_stats import ParseStats
+from progr.utils_app.line_index import LineIndex
 import pandas as pd
 
 
@@ -8,22 +11,47 @@ class LogParserThread(QThread):
     """
     Поток для парсинга логов.
     На вход получает сырые строки и тип парсера, на выход отдаёт pandas.DataFrame.
+    Если задан cache_path (файл, из которого прочитаны строки), результат
+    сохраняется в дисковый кэш прямо в рабочем потоке; cache_fingerprint —
+    отпечаток файла на момент начала чтения строк.
+    where/columns — фильтр (LogFilter) и проекция для LogParser.parse;
+    выборочный результат в дисковый кэш не сохраняется.
+
+    from_cache=True — строки не разбираются: разбор cache_path только читается
+    из дискового кэша (распаковка большого DataFrame тоже не должна идти в потоке
+    интерфейса); finished(None) — записи в кэше нет.
+
+    Перед finished отправляется stats (ParseStats): скорость, принятые и
+    отклонённые строки по причинам, время этапов; выборка отклонённых строк
+    пишется в файл рядом с логами приложения.
     """
     finished = pyqtSignal(object)  # pandas.DataFrame
+    stats = pyqtSignal(object)     # ParseStats
     error = pyqtSignal(str)
 
-    def __init__(self, log_lines, log_type):
+    def __init__(self, log_lines, log_type, cache_path=None, cache_fingerprint=None, where=None, columns=None,
+                 from_cache=False):
         super().__init__()
+        self.from_cache = from_cache
         self.log_lines = log_lines
         self.log_type = log_type
+        self.cache_path = cache_path
+        self.cache_fingerprint = cache_fingerprint
+        self.where = where
+        self.columns = columns
 
     def run(self):
+        if self.from_cache:
+            self._load_cached()
+            return
         try:
             LOGGER.info(f"[LogParserThread] Запуск парсинга: type={self.log_type}, lines={len(self.log_lines)}")
-            parser = LogParser()
+            stats = ParseStats(self.log_type)
+            stats.bytes = self._input_bytes()
+            parser = LogParser(stats)
 
             if hasattr(parser, "parse"):
-                df = parser.parse(self.log_lines, self.log_type)
+                df = parser.parse(self.log_lines, self.log_type, where=self.where, columns=self.columns)
             else:
                 if self.log_type in ("Apache", "Nginx"):
                     df = parser.parse_apache_nginx(self.log_lines)
@@ -37,6 +65,20 @@ class LogParserThread(QThread):
             if df is None:
                 df = pd.DataFrame()
 
+            partial = self.columns is not None or (self.where is not None and not self.where.is_empty())
+            cache = get_parse_cache() if self.cache_path and not partial else None
+            if cache is not None:
+                cache.store(self.cache_path, LogParser.cache_tag(self.log_type), df,
+                            fingerprint=self.cache_fingerprint)
+
+            stats.finish()
+            LOGGER.info(f"[LogParserThread] Статистика: {stats.as_dict()}")
+            rejected_path = stats.save_rejected()
+            if rejected_path:
+                LOGGER.info(f"[LogParserThread] Отклонено строк: {stats.rejected_total}, "
+                            f"выборка в {rejected_path}")
+            self.stats.emit(stats)
+
             self.finished.emit(df)
             LOGGER.info("[LogParserThread] Парсинг завершён, поток завершается.")
 
@@ -44,3 +86,30 @@ class LogParserThread(QThread):
             msg = f"Ошибка парсинга: {e}"
             LOGGER.error(f"[LogParserThread] {msg}", exc_info=True)
             self.error.emit(msg)
+
+    def _load_cached(self):
+        try:
+            cache = get_parse_cache()
+            df = cache.load(self.cache_path, LogParser.cache_tag(self.log_type)) if cache is not None else None
+            LOGGER.info(f"[LogParserThread] Разбор из кэша: {self.cache_path}, "
+                        f"{'нет записи' if df is None else f'записей: {len(df)}'}")
+            self.finished.emit(df)
+        except Exception as e:
+            msg = f"Ошибка чтения кэша разбора: {e}"
+            LOGGER.error(f"[LogParserThread] {msg}", exc_info=True)
+            self.error.emit(msg)
+
+    def _input_bytes(self) -> int:
+        """
+        Объём входных данных в байтах: размер файла для LineIndex, прочитанные
+        байты для SourceLines (FileLoaderThread), иначе длина строк в UTF-8
+        (len строки — это символы, не байты).
+        """
+        if isinstance(self.log_lines, LineIndex):
+            return self.log_lines.size
+        nbytes = getattr(self.log_lines, "nbytes", None)
+        if nbytes is not None:
+            return nbytes
+        if isinstance(self.log_lines, str):
+            return len(self.log_lines.encode("utf-8", errors="ignore"))
+        return sum(len(line.encode("utf-8", errors="ignore")) for line in self.log_lines)
@@ -0,0 +1,95 @@
+from typing import Optional
+from PyQt6.QtCore import QThread, pyqtSignal
+from progr.models.log_parser_model import LogParser
+from progr.utils_app.log_reader import iter_line_batches
+from progr.utils_app.parse_cache import get_parse_cache
+from progr.utils_app.logger import LOGGER
+
+
+class LogStreamThread(QThread):
+    """
+    Потоковая загрузка + парсинг: файл читается пачками строк, каждая пачка
+    сразу парсится и отдаётся в UI как pandas.DataFrame.
+    Пиковая память ограничена размером пачки, первые строки таблицы
+    появляются сразу после разбора первой пачки.
+
+    SQL-дампы (Wordpress/Bitrix) читаются кусками текста: кортежи
+    переходят через границы кусков, весь дамп в память не загружается.
+
+    Сигналы: batch_parsed(DataFrame), progress(bytes_read, total_bytes),
+    finished(int — всего записей), error(str).
+    При включённом дисковом кэше каждая пачка сразу дописывается в запись
+    кэша (ParseCache.writer) — разобранный файл в памяти не собирается;
+    запись становится видна только после разбора всего файла.
+    """
+
+    batch_parsed = pyqtSignal(object)  # pandas.DataFrame очередной пачки
+    progress = pyqtSignal("qint64", "qint64")
+    finished = pyqtSignal(int)
+    error = pyqtSignal(str)
+
+    def __init__(self, file_path: str, log_type: str, batch_size: int, parent: Optional[object] = None) -> None:
+        super().__init__(parent)
+        self._file_path = str(file_path)
+        self._log_type = log_type
+        self._batch_size = int(batch_size)
+
+    def run(self) -> None:
+        try:
+            LOGGER.info(f"[LogStreamThread] Потоковый парсинг: type={self._log_type}, "
+                        f"file={self._file_path}, batch={self._batch_size}")
+            parser = LogParser()
+            if self._log_type in LogParser.LINE_BASED_TYPES:
+                batches = ((parser.parse(lines, self._log_type), bytes_read, total_bytes)
+                           for lines, bytes_read, total_bytes in iter_line_batches(self._file_path, self._batch_size))
+            elif self._log_type in LogParser.SQL_DUMP_TYPES:
+                batches = parser.iter_sql_dump_frames(self._file_path, self._log_type)
+            else:
+                raise ValueError(f"Потоковый режим не поддерживается для типа: {self._log_type}")
+
+            cache = get_parse_cache()
+            writer = None
+            if cache is not None:
+                writer = cache.writer(self._file_path, LogParser.cache_tag(self._log_type),
+                                      fingerprint=cache.fingerprint(self._file_path))
+            try:
+                total = self._emit_batches(batches, writer)
+            except BaseException:
+                if writer is not None:
+                    writer.discard()
+                raise
+            if total is None:
+                LOGGER.info("[LogStreamThread] Прервано по requestInterruption().")
+                if writer is not None:
+                    writer.discard()
+                return
+            if writer is not None:
+                if not total:
+                    writer.add(parser.parse([], self._log_type))
+                writer.commit()
+
+            LOGGER.info(f"[LogStreamThread] Потоковый парсинг завершён, записей: {total}")
+            self.finished.emit(total)
+
+        except FileNotFoundError:
+            msg = f"Файл не найден: {self._file_path}"
+            LOGGER.error(f"[LogStreamThread] {msg}")
+            self.error.emit(msg)
+        except Exception as e:  # noqa: BLE001
+            msg = f"Ошибка потокового парсинга: {e}"
+            LOGGER.error(f"[LogStreamThread] {msg}", exc_info=True)
+            self.error.emit(msg)
+
+    def _emit_batches(self, batches, writer) -> int | None:
+        """Отдаёт пачки в UI (и в запись кэша); число записей или None, если прервано."""
+        total = 0
+        for df, bytes_read, total_bytes in batches:
+            if self.isInterruptionRequested():
+                return None
+            if len(df):
+                total += len(df)
+                if writer is not None:
+                    writer.add(df)
+                self.batch_parsed.emit(df)
+            self.progress.emit(bytes_read, total_bytes)
+        return total
@@ -0,0 +1,104 @@
+import os
+from typing import Optional
+from PyQt6.QtCore import QThread, pyqtSignal
+from progr.models.log_parser_model import LogParser
+from progr.utils_app.log_reader import SourceLines, detect_compression
+from progr.utils_app.logger import LOGGER
+
+
+class LogTailThread(QThread):
+    """
+    Слежение за растущим файлом логов (аналог tail -f).
+    Периодически дочитывает байты после последнего прочитанного смещения,
+    разбирает только новые полные строки и отдаёт их как pandas.DataFrame.
+    Незавершённая последняя строка откладывается до следующего опроса.
+    Усечение или ротация файла (размер меньше смещения / другой inode)
+    начинают чтение с начала нового файла.
+
+    once=True — один опрос (ручное «Обновить»), затем поток завершается.
+
+    Сигналы: appended(DataFrame), offset_changed(int), finished(), error(str).
+    """
+
+    appended = pyqtSignal(object)          # pandas.DataFrame новых записей
+    offset_changed = pyqtSignal("qint64")  # новое смещение после опроса
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, file_path: str, log_type: str, start_offset: int = 0, interval_ms: int = 1000,
+                 max_read_bytes: int = 64 * 1024 * 1024, once: bool = False,
+                 parent: Optional[object] = None) -> None:
+        super().__init__(parent)
+        self._file_path = str(file_path)
+        self._log_type = log_type
+        self._offset = max(0, int(start_offset))
+        self._interval_ms = max(50, int(interval_ms))
+        self._max_read_bytes = max(4096, int(max_read_bytes))
+        self._once = once
+        self._pending = b""
+        self._inode = None
+        self._parser = LogParser()
+
+    def run(self) -> None:
+        try:
+            if self._log_type not in LogParser.LINE_BASED_TYPES:
+                raise ValueError(f"Слежение не поддерживается для типа: {self._log_type}")
+            if detect_compression(self._file_path) is not None:
+                raise ValueError("Слежение за сжатым файлом невозможно")
+
+            LOGGER.info(f"[LogTailThread] Слежение за {self._file_path} с offset={self._offset}")
+            self._inode = os.stat(self._file_path).st_ino
+
+            while not self.isInterruptionRequested():
+                self._poll()
+                if self._once:
+                    break
+                # Спим короткими шагами, чтобы быстро реагировать на остановку
+                slept = 0
+                while slept < self._interval_ms and not self.isInterruptionRequested():
+                    self.msleep(50)
+                    slept += 50
+
+            LOGGER.info(f"[LogTailThread] Слежение остановлено, offset={self._offset}")
+            self.finished.emit()
+
+        except FileNotFoundError:
+            msg = f"Файл не найден: {self._file_path}"
+            LOGGER.error(f"[LogTailThread] {msg}")
+            self.error.emit(msg)
+        except Exception as e:  # noqa: BLE001
+            msg = f"Ошибка слежения за файлом: {e}"
+            LOGGER.error(f"[LogTailThread] {msg}", exc_info=True)
+            self.error.emit(msg)
+
+    def _poll(self) -> None:
+        try:
+            st = os.stat(self._file_path)
+        except FileNotFoundError:
+            # Между ротацией и созданием нового файла его может не быть
+            return
+
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            LOGGER.info("[LogTailThread] Файл усечён или ротирован — читаем с начала")
+            self._inode = st.st_ino
+            self._offset = 0
+            self._pending = b""
+
+        while st.st_size > self._offset and not self.isInterruptionRequested():
+            with open(self._file_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(min(st.st_size - self._offset, self._max_read_bytes))
+            if not data:
+                break
+            self._offset += len(data)
+
+            data = self._pending + data
+            cut = data.rfind(b"\n") + 1
+            self._pending = data[cut:]
+            if cut:
+                # Строки со смещениями в файле: повторно дочитанные строки таблица узнаёт по ним
+                lines = SourceLines.from_bytes(data[:cut], self._offset - len(data))
+                df = self._parser.parse(lines, self._log_type)
+                if len(df):
+                    self.appended.emit(df)
+            self.offset_changed.emit(self._offset - len(self._pending))
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+import pandas as pd
+from PyQt6.QtCore import QThread, pyqtSignal
+from progr.models.log_parser_model import parse_log_file
+from progr.models.log_schema import concat_frames
+from progr.utils_app.logger import LOGGER
+
+
+class MultiFileParserThread(QThread):
+    """
+    Параллельный парсинг нескольких файлов логов в пуле процессов.
+    Каждый файл читается и разбирается в отдельном процессе (без GIL),
+    результаты склеиваются в один DataFrame в исходном порядке файлов
+    с колонкой source_file.
+
+    Сигналы: file_done(path, done, total, rows) — по каждому файлу
+    (rows = -1, если файл не удалось разобрать), finished(DataFrame), error(str).
+    """
+
+    file_done = pyqtSignal(str, int, int, int)
+    finished = pyqtSignal(object)  # pandas.DataFrame
+    error = pyqtSignal(str)
+
+    def __init__(self, file_paths, log_type: str, max_workers: Optional[int] = None,
+                 parent: Optional[object] = None) -> None:
+        super().__init__(parent)
+        self._file_paths = [str(p) for p in file_paths]
+        self._log_type = log_type
+        self._max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self) -> None:
+        try:
+            total = len(self._file_paths)
+            workers = max(1, min(self._max_workers, total))
+            LOGGER.info(f"[MultiFileParserThread] Парсинг {total} файлов, type={self._log_type}, "
+                        f"процессов={workers}")
+
+            results: dict[int, pd.DataFrame] = {}
+            # spawn: fork из многопоточного Qt-процесса небезопасен
+            ctx = multiprocessing.get_context("spawn")
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            try:
+                futures = {
+                    executor.submit(parse_log_file, path, self._log_type): i
+                    for i, path in enumerate(self._file_paths)
+                }
+                done = 0
+                for fut in as_completed(futures):
+                    if self.isInterruptionRequested():
+                        LOGGER.info("[MultiFileParserThread] Прервано по requestInterruption().")
+                        return
+                    i = futures[fut]
+                    path = self._file_paths[i]
+                    done += 1
+                    try:
+                        df = fut.result()
+                        results[i] = df
+                        rows = len(df)
+                        LOGGER.info(f"[MultiFileParserThread] {path}: {rows} записей")
+                    except Exception as e:  # noqa: BLE001 — один битый файл не валит остальные
+                        rows = -1
+                        LOGGER.error(f"[MultiFileParserThread] Не удалось разобрать {path}: {e}")
+                    self.file_done.emit(path, done, total, rows)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+            frames = [results[i] for i in sorted(results)]
+            df = concat_frames(frames)
+            LOGGER.info(f"[MultiFileParserThread] Готово: {len(df)} записей из {len(frames)} файлов")
+            self.finished.emit(df)
+
+        except Exception as e:  # noqa: BLE001
+            msg = f"Ошибка параллельного парсинга файлов: {e}"
+            LOGGER.error(f"[MultiFileParserThread] {msg}", exc_info=True)
+            self.error.emit(msg)
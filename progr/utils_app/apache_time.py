@@ -0,0 +1,156 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Месяцы в формате Apache/Nginx (%b)
+MONTHS = {
+    "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
+    "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
+    "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+NAT = np.iinfo(np.int64).min  # представление NaT в datetime64[ns]
+
+
+class ApacheTimeConverter:
+    """
+    Преобразование времени Apache/Nginx '27/Jul/2025:07:55:25 +0700'
+    в строки для отображения ('2025-07-27', '07:55:25') и момент времени
+    (наносекунды от эпохи в UTC, смещение пояса учитывается).
+
+    Соседние строки лога почти всегда относятся к одной дате, а часто
+    и к одной секунде, поэтому результаты запоминаются:
+    - по префиксу даты 'DD/Mon/YYYY' — строка даты и номер дня;
+    - по целой строке времени (одна секунда + пояс) — готовый результат.
+    Экземпляр живёт вместе с LogParser, так что кэш переиспользуется
+    между пачками потокового и tail-парсинга.
+    """
+
+    MAX_CACHED_SECONDS = 200000
+
+    def __init__(self) -> None:
+        self._dates: dict[tuple[str, str, str], tuple[str, int | None] | None] = {}
+        self._seconds: dict[str, tuple[str, str, int]] = {}
+
+    def convert(self, raw_time: pd.Series) -> tuple[np.ndarray, np.ndarray, pd.Series]:
+        """
+        Целая колонка сырых отметок времени -> (date, time, timestamp).
+        Разбираются только уникальные значения (pd.factorize), результат
+        раскладывается по строкам через коды.
+        timestamp — Series datetime64[ns, UTC]; нераспознанное время -> NaT.
+        """
+        codes, uniques = pd.factorize(raw_time)
+        if len(self._seconds) > self.MAX_CACHED_SECONDS:
+            self._seconds.clear()
+
+        converted = [self.convert_one(u) for u in uniques]
+        dates = np.array([c[0] for c in converted], dtype=object)
+        times = np.array([c[1] for c in converted], dtype=object)
+        stamps = np.array([c[2] for c in converted], dtype=np.int64)
+
+        ts = pd.Series(stamps.take(codes).view("datetime64[ns]")).dt.tz_localize("UTC")
+        return dates.take(codes), times.take(codes), ts
+
+    def convert_one(self, raw: str) -> tuple[str, str, int]:
+        """
+        Одна отметка времени -> ('YYYY-MM-DD', 'HH:MM:SS', ns_utc).
+        Строки совпадают с LogParser._split_apache_time; если момент времени
+        вычислить нельзя, вместо ns возвращается NaT-значение.
+        """
+        cached = self._seconds.get(raw)
+        if cached is not None:
+            return cached
+        result = self._convert(raw)
+        self._seconds[raw] = result
+        return result
+
+    def _convert(self, raw: str) -> tuple[str, str, int]:
+        if not raw:
+            return "", "", NAT
+        s = str(raw).strip()
+        core, _, zone = s.partition(" ")
+
+        parts = core.split("/", 2)
+        if len(parts) != 3:
+            return "", s, NAT
+        day_str, mon_str, rest = parts
+        clock = rest.split(":", 3)
+        if len(clock) != 4:
+            return "", s, NAT
+        year_str, hh, mm, ss = clock
+
+        day = self._date(day_str, mon_str, year_str)
+        if day is None:
+            return "", s, NAT
+        date_str, day_number = day
+        time_str = f"{hh.zfill(2)}:{mm.zfill(2)}:{ss.zfill(2)}"
+
+        seconds = self._seconds_of_day(hh, mm, ss)
+        offset = self._offset_seconds(zone.strip())
+        if day_number is None or seconds is None or offset is None:
+            return date_str, time_str, NAT
+        return date_str, time_str, (day_number * 86400 + seconds - offset) * 1_000_000_000
+
+    def _date(self, day_str: str, mon_str: str, year_str: str) -> tuple[str, int | None] | None:
+        """Префикс 'DD/Mon/YYYY' -> ('YYYY-MM-DD', дней от эпохи | None) с кэшем."""
+        key = (day_str, mon_str, year_str)
+        if key in self._dates:
+            return self._dates[key]
+
+        mon = MONTHS.get(mon_str)
+        if mon is None:
+            result = None
+        else:
+            try:
+                day_number = date(int(year_str), int(mon), int(day_str)).toordinal() - _EPOCH_ORDINAL
+            except ValueError:
+                day_number = None
+            result = (f"{year_str}-{mon}-{day_str.zfill(2)}", day_number)
+        self._dates[key] = result
+        return result
+
+    @staticmethod
+    def _seconds_of_day(hh: str, mm: str, ss: str) -> int | None:
+        if not (hh.isdigit() and mm.isdigit() and ss.isdigit()):
+            return None
+        h, m, s = int(hh), int(mm), int(ss)
+        if h > 23 or m > 59 or s > 59:
+            return None
+        return h * 3600 + m * 60 + s
+
+    @staticmethod
+    def _offset_seconds(zone: str) -> int | None:
+        """'+0700' -> 25200; пустой пояс трактуется как UTC."""
+        if not zone:
+            return 0
+        if len(zone) != 5 or zone[0] not in "+-" or not zone[1:].isdigit():
+            return None
+        value = int(zone[1:3]) * 3600 + int(zone[3:5]) * 60
+        return -value if zone[0] == "-" else value
+
+
+def date_label_ns(label: str) -> int:
+    """Отображаемая дата 'YYYY-MM-DD' -> наносекунды от эпохи до её полуночи; иначе NAT."""
+    if len(label) != 10 or label[4] != "-" or label[7] != "-":
+        return NAT
+    try:
+        return (date(int(label[:4]), int(label[5:7]), int(label[8:])).toordinal() - _EPOCH_ORDINAL) * 86400 * 1_000_000_000
+    except ValueError:
+        return NAT
+
+
+def time_label_ns(label: str) -> int:
+    """Отображаемое время 'HH:MM:SS' -> наносекунды от полуночи; иначе NAT."""
+    parts = label.split(":")
+    seconds = ApacheTimeConverter._seconds_of_day(*parts) if len(parts) == 3 else None
+    return NAT if seconds is None else seconds * 1_000_000_000
+
+
+def wall_clock(day_ns: np.ndarray, time_ns: np.ndarray) -> np.ndarray:
+    """
+    Момент «по часам лога» (дата + время как в таблице, без пояса) в наносекундах
+    от эпохи из date_label_ns и time_label_ns по строкам; NAT, если что-то не разобрано.
+    """
+    return np.where((day_ns == NAT) | (time_ns == NAT), NAT, day_ns + time_ns)
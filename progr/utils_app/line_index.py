@@ -0,0 +1,122 @@
+import mmap
+import os
+from array import array
+
+import numpy as np
+
+
+class LineIndex:
+    """
+    Индекс строк файла поверх mmap.
+
+    Вместо списка str хранит только смещения начала строк (array('Q'),
+    8 байт на строку). Строки декодируются по требованию — по одной или
+    диапазоном, поэтому открытие многогигабайтного файла стоит один проход
+    индексации. Поддерживает протокол последовательности (len, [], итерация),
+    так что его можно передавать в LogParser вместо списка строк.
+    """
+
+    SCAN_CHUNK = 64 * 1024 * 1024   # байт за один проход numpy при индексации
+    ITER_BATCH = 10000              # строк за одно декодирование при итерации
+
+    def __init__(self, file_path: str, progress=None, cancelled=None) -> None:
+        """
+        :param progress: коллбек (bytes_done, total_bytes) во время индексации
+        :param cancelled: коллбек () -> bool для прерывания индексации
+        """
+        self.path = str(file_path)
+        self._file = open(self.path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        try:
+            self._offsets = self._build_offsets(progress, cancelled)
+        except BaseException:
+            self.close()
+            raise
+
+    def _build_offsets(self, progress, cancelled) -> array:
+        """
+        Один проход по файлу: ищем '\\n' векторно (numpy) кусками SCAN_CHUNK.
+        Последний элемент — конец файла, поэтому строка i = [off[i], off[i+1]).
+        """
+        offsets = array("Q", [0])
+        if not self._mm:
+            return offsets
+
+        buf = np.frombuffer(self._mm, dtype=np.uint8)
+        try:
+            for start in range(0, self.size, self.SCAN_CHUNK):
+                if cancelled is not None and cancelled():
+                    raise InterruptedError("Индексация прервана")
+                newlines = np.flatnonzero(buf[start:start + self.SCAN_CHUNK] == 0x0A)
+                newlines += start + 1
+                offsets.frombytes(newlines.astype(np.uint64).tobytes())
+                if progress is not None:
+                    progress(min(start + self.SCAN_CHUNK, self.size), self.size)
+        finally:
+            # mmap нельзя закрыть, пока на него есть экспортированный буфер
+            del buf
+
+        if offsets[-1] != self.size:
+            offsets.append(self.size)  # последняя строка без '\n'
+        return offsets
+
+    # ------------- протокол последовательности -------------
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self.line(i) for i in range(start, stop, step)]
+            return self.lines(start, stop)
+        i = item + len(self) if item < 0 else item
+        if not (0 <= i < len(self)):
+            raise IndexError("LineIndex: индекс строки вне диапазона")
+        return self.line(i)
+
+    def __iter__(self):
+        for start in range(0, len(self), self.ITER_BATCH):
+            yield from self.lines(start, start + self.ITER_BATCH)
+
+    # ------------- доступ к строкам -------------
+    def byte_range(self, start: int, stop: int) -> tuple[int, int]:
+        """Байтовые границы [a, b) диапазона строк [start, stop)."""
+        n = len(self)
+        start = max(0, min(start, n))
+        stop = max(start, min(stop, n))
+        return self._offsets[start], self._offsets[stop]
+
+    def line_offsets(self) -> np.ndarray:
+        """Смещения начала всех строк (int64, по элементу на строку)."""
+        return np.frombuffer(self._offsets, dtype=np.uint64)[:-1].astype(np.int64)
+
+    def line(self, i: int) -> str:
+        """Одна строка по номеру (с переводом строки, если он был в файле)."""
+        a, b = self._offsets[i], self._offsets[i + 1]
+        return self._mm[a:b].decode("utf-8", errors="ignore")
+
+    def lines(self, start: int, stop: int) -> list[str]:
+        """Диапазон строк [start, stop): одно декодирование на весь диапазон."""
+        a, b = self.byte_range(start, stop)
+        if a == b:
+            return []
+        parts = self._mm[a:b].decode("utf-8", errors="ignore").split("\n")
+        tail = parts.pop()
+        out = [p + "\n" for p in parts]
+        if tail:
+            out.append(tail)
+        return out
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,227 @@
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+# Сигнатуры сжатых форматов (ротированные логи: access.log.2.gz, .bz2, .xz)
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+
+_DECOMPRESSORS = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+# Сколько пачек распаковщик может подготовить впрок, пока потребитель парсит
+PREFETCH_BATCHES = 4
+
+
+class SourceLines(list):
+    """
+    Пачка строк файла вместе с байтовыми смещениями их начала в файле
+    (offsets, int64 по строке; для сжатого файла — в распакованном потоке)
+    и объёмом строк в байтах (nbytes, до декодирования; None — неизвестен).
+    Обычный список строк для всех, кому смещения не нужны; LogParser по ним
+    проставляет позиции записей (колонка source_pos).
+    """
+
+    def __init__(self, lines=(), offsets=None, nbytes: int | None = None) -> None:
+        super().__init__(lines)
+        self.offsets = np.asarray(offsets if offsets is not None else [], dtype=np.int64)
+        self.nbytes = nbytes
+
+    @classmethod
+    def from_bytes(cls, data: bytes, start: int = 0) -> "SourceLines":
+        """
+        Строки из байт data (прочитанных с позиции start файла):
+        деление только по '\\n', как у LineIndex, поэтому число строк совпадает
+        с числом смещений; '\\r\\n' приводится к '\\n'.
+        """
+        if not data:
+            return cls(nbytes=0)
+        ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A) + 1
+        starts = np.concatenate(([0], ends))
+        text = data.decode("utf-8", errors="ignore")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        parts = text.split("\n")
+        tail = parts.pop()
+        lines = [p + "\n" for p in parts]
+        if tail:
+            lines.append(tail)
+        return cls(lines, starts[:len(lines)] + start, len(data))
+
+    @classmethod
+    def concat(cls, batches) -> "SourceLines":
+        """Склейка пачек одного файла в одну (список строк + смещения)."""
+        out = cls(nbytes=0)
+        offsets = []
+        for batch in batches:
+            out.extend(batch)
+            offsets.append(batch.offsets)
+            out.nbytes = None if out.nbytes is None or batch.nbytes is None else out.nbytes + batch.nbytes
+        if offsets:
+            out.offsets = np.concatenate(offsets)
+        return out
+
+
+def detect_compression(file_path: str) -> str | None:
+    """
+    Определяет сжатие по сигнатуре (magic bytes), а не по расширению.
+    Возвращает 'gzip' | 'bz2' | 'xz' или None для обычного текста.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(6)
+    for magic, name in _COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def expand_log_paths(paths, pattern: str = "*") -> list[str]:
+    """
+    Раскрывает выбор пользователя в список файлов логов:
+    - каталог -> файлы в нём по маске pattern (например 'access.log*');
+    - путь с символами glob (*, ?, [) -> совпавшие файлы;
+    - обычный путь -> как есть.
+    Порядок стабильный (по имени), дубликаты убираются.
+    """
+    out: list[str] = []
+    seen = set()
+    for p in paths or []:
+        p = str(p)
+        if os.path.isdir(p):
+            found = glob.glob(os.path.join(p, pattern or "*"))
+        elif glob.has_magic(p):
+            found = glob.glob(p)
+        else:
+            found = [p]
+        for f in sorted(found):
+            if os.path.isfile(f) and f not in seen:
+                seen.add(f)
+                out.append(f)
+    return out
+
+
+def iter_line_batches(file_path: str, batch_size: int):
+    """
+    Читает файл логов пачками по batch_size строк.
+    Возвращает кортежи (lines, bytes_read, total_bytes), где lines — SourceLines
+    (строки со смещениями в файле), bytes_read — сколько байт файла уже
+    прочитано (для индикатора прогресса).
+
+    Сжатые файлы распаковываются на лету без временных файлов; распаковка
+    идёт в отдельном потоке и перекрывается с обработкой пачек потребителем.
+    В памяти одновременно находится только несколько пачек строк.
+    """
+    compression = detect_compression(file_path)
+    batches = _read_line_batches(file_path, batch_size, compression)
+    if compression is None:
+        return batches
+    return _prefetch(batches, PREFETCH_BATCHES)
+
+
+def iter_text_chunks(file_path: str, chunk_chars: int):
+    """
+    Читает файл кусками по chunk_chars символов без учёта границ строк
+    (SQL-дампы: одна строка extended INSERT может занимать мегабайты).
+    Возвращает кортежи (text, bytes_read, total_bytes); сжатые файлы
+    распаковываются на лету, как в iter_line_batches.
+    """
+    compression = detect_compression(file_path)
+    chunks = _read_text_chunks(file_path, chunk_chars, compression)
+    if compression is None:
+        return chunks
+    return _prefetch(chunks, PREFETCH_BATCHES)
+
+
+def _read_text_chunks(file_path: str, chunk_chars: int, compression: str | None):
+    chunk_chars = max(1, int(chunk_chars))
+    total_bytes = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as raw:
+        stream = _DECOMPRESSORS[compression](raw) if compression else raw
+        text = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
+        while True:
+            chunk = text.read(chunk_chars)
+            if not chunk:
+                break
+            yield chunk, raw.tell(), total_bytes
+
+
+def _read_line_batches(file_path: str, batch_size: int, compression: str | None):
+    batch_size = max(1, int(batch_size))
+    total_bytes = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as raw:
+        # Прогресс считаем по позиции в исходном (сжатом) файле
+        stream = _DECOMPRESSORS[compression](raw) if compression else raw
+        # Строки читаются байтами: смещение каждой строки известно точно,
+        # пачка декодируется одним вызовом (SourceLines.from_bytes)
+        chunk: list[bytes] = []
+        start = pos = 0
+        for line in stream:
+            chunk.append(line)
+            pos += len(line)
+            if len(chunk) >= batch_size:
+                yield SourceLines.from_bytes(b"".join(chunk), start), raw.tell(), total_bytes
+                chunk, start = [], pos
+        if chunk:
+            yield SourceLines.from_bytes(b"".join(chunk), start), raw.tell(), total_bytes
+
+
+def _prefetch(gen, depth: int):
+    """
+    Прогоняет генератор в фоновом потоке через ограниченную очередь.
+    zlib/bz2/lzma отпускают GIL при распаковке, поэтому распаковка
+    следующих пачек идёт параллельно с парсингом текущей.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Не блокируемся навсегда, если потребитель уже ушёл
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in gen:
+                if not put(item):
+                    return
+            put(done)
+        except BaseException as e:  # noqa: BLE001 — пробрасываем потребителю
+            put(e)
+        finally:
+            gen.close()
+
+    worker = threading.Thread(target=produce, name="log-prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        worker.join(timeout=1.0)
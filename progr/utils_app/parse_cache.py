@@ -0,0 +1,194 @@
+import glob
+import hashlib
+import os
+import pickle
+import uuid
+
+import pandas as pd
+
+from progr.config_app.parser_config import PARSER_CONFIG
+from progr.models.log_schema import concat_frames
+from progr.utils_app.logger import LOGGER
+
+
+class ParseCache:
+    """
+    Дисковый кэш результатов парсинга.
+
+    Ключ = отпечаток файла (путь, размер, mtime, хэш первых и последних
+    FINGERPRINT_BYTES байт) + тег парсера (тип лога и версия парсера).
+    Значение — DataFrame в бинарном виде (pickle pandas: каждая колонка/блок
+    хранится numpy-массивом, без повторного разбора строк): один DataFrame
+    или несколько подряд (пачки потокового разбора, см. writer), при чтении
+    они склеиваются.
+    Имя файла: '<отпечаток>_<тег>.pkl', поэтому записи одного файла
+    находятся по префиксу. При превышении бюджета на диске вытесняются
+    давно не использованные записи (LRU по mtime записи).
+    """
+
+    FINGERPRINT_BYTES = 64 * 1024
+    SUFFIX = ".pkl"
+
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        self._dir = os.path.abspath(cache_dir)
+        self._max_bytes = int(max_bytes)
+
+    # ------------- ключи -------------
+    def fingerprint(self, file_path: str) -> str:
+        """Отпечаток содержимого файла: меняется при любой перезаписи/дописывании."""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8"))
+        with open(path, "rb") as f:
+            h.update(f.read(self.FINGERPRINT_BYTES))
+            if st.st_size > self.FINGERPRINT_BYTES:
+                f.seek(max(self.FINGERPRINT_BYTES, st.st_size - self.FINGERPRINT_BYTES))
+                h.update(f.read(self.FINGERPRINT_BYTES))
+        return h.hexdigest()
+
+    @staticmethod
+    def _tag_digest(parser_tag: str) -> str:
+        return hashlib.blake2b(parser_tag.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _entry_path(self, file_path: str, parser_tag: str, fingerprint: str | None = None) -> str:
+        fp = fingerprint or self.fingerprint(file_path)
+        return os.path.join(self._dir, f"{fp}_{self._tag_digest(parser_tag)}{self.SUFFIX}")
+
+    # ------------- чтение/запись -------------
+    def contains(self, file_path: str, parser_tag: str) -> bool:
+        try:
+            return os.path.exists(self._entry_path(file_path, parser_tag))
+        except OSError:
+            return False
+
+    def load(self, file_path: str, parser_tag: str) -> pd.DataFrame | None:
+        """Возвращает DataFrame из кэша или None, если записи нет/она битая."""
+        try:
+            entry = self._entry_path(file_path, parser_tag)
+            if not os.path.exists(entry):
+                return None
+            frames = []
+            with open(entry, "rb") as f:
+                while True:
+                    try:
+                        frames.append(pickle.load(f))
+                    except EOFError:
+                        break
+            df = frames[0] if len(frames) == 1 else concat_frames(frames)
+            os.utime(entry)  # отметка использования для LRU
+            LOGGER.info(f"[ParseCache] Попадание в кэш: {file_path} ({parser_tag}), записей: {len(df)}")
+            return df
+        except Exception as e:  # noqa: BLE001 — битая запись = промах
+            LOGGER.warning(f"[ParseCache] Не удалось прочитать кэш для {file_path}: {e}")
+            return None
+
+    def store(self, file_path: str, parser_tag: str, df: pd.DataFrame, fingerprint: str | None = None) -> None:
+        """
+        Сохраняет разбор атомарно (tmp + rename) и вытесняет старые записи.
+        :param fingerprint: отпечаток, снятый ДО чтения файла. Если файл с тех
+            пор изменился (лог дописывается), разбор не соответствует ни одному
+            состоянию файла и не сохраняется.
+        """
+        writer = self.writer(file_path, parser_tag, fingerprint)
+        writer.add(df)
+        writer.commit()
+
+    def writer(self, file_path: str, parser_tag: str, fingerprint: str | None = None) -> "CacheWriter":
+        """
+        Запись разбора по частям (потоковый разбор): пачки дописываются во
+        временный файл по мере разбора, в памяти целиком не собираются.
+        """
+        return CacheWriter(self, file_path, parser_tag, fingerprint)
+
+    def _evict(self) -> None:
+        entries = []
+        for p in glob.glob(os.path.join(self._dir, f"*{self.SUFFIX}")):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                LOGGER.info(f"[ParseCache] Вытеснена запись кэша: {os.path.basename(p)}")
+            except OSError:
+                pass
+
+
+class CacheWriter:
+    """
+    Запись в ParseCache по частям: add(df) дописывает пачку во временный файл,
+    commit() атомарно переименовывает его в запись кэша (если файл лога за это
+    время не изменился), discard() — выбрасывает. Ошибки записи не пробрасываются:
+    кэш не должен ломать парсинг, испорченная запись просто не сохраняется.
+    """
+
+    def __init__(self, cache: ParseCache, file_path: str, parser_tag: str, fingerprint: str | None) -> None:
+        self._cache = cache
+        self._file_path = file_path
+        self._parser_tag = parser_tag
+        self._fingerprint = fingerprint
+        self._rows = 0
+        self._file = None
+        self._tmp = None
+        try:
+            os.makedirs(cache._dir, exist_ok=True)
+            self._tmp = os.path.join(cache._dir, f"{uuid.uuid4().hex}.{os.getpid()}.tmp")
+            self._file = open(self._tmp, "wb")
+        except OSError as e:
+            self._fail(e)
+
+    def add(self, df: pd.DataFrame) -> None:
+        if self._file is None:
+            return
+        try:
+            pickle.dump(df.reset_index(drop=True), self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._rows += len(df)
+        except Exception as e:  # noqa: BLE001
+            self._fail(e)
+
+    def commit(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            self._file = None
+            current = self._cache.fingerprint(self._file_path)
+            if self._fingerprint is not None and self._fingerprint != current:
+                LOGGER.info(f"[ParseCache] Файл изменился во время чтения, кэш не сохраняется: {self._file_path}")
+                self.discard()
+                return
+            os.replace(self._tmp, self._cache._entry_path(self._file_path, self._parser_tag, current))
+            LOGGER.info(f"[ParseCache] Сохранено в кэш: {self._file_path} ({self._parser_tag}), "
+                        f"записей: {self._rows}")
+            self._cache._evict()
+        except Exception as e:  # noqa: BLE001
+            self._fail(e)
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp is not None and os.path.exists(self._tmp):
+            try:
+                os.remove(self._tmp)
+            except OSError:
+                pass
+
+    def _fail(self, error: Exception) -> None:
+        LOGGER.warning(f"[ParseCache] Не удалось сохранить кэш для {self._file_path}: {error}")
+        self.discard()
+
+
+def get_parse_cache() -> ParseCache | None:
+    """Кэш по настройкам PARSER_CONFIG['cache'] или None, если он выключен."""
+    cfg = PARSER_CONFIG["cache"]
+    if not cfg.get("enabled"):
+        return None
+    return ParseCache(cfg["dir"], cfg["max_bytes"])
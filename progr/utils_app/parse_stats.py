@@ -0,0 +1,148 @@
+import contextlib
+import os
+import time
+from datetime import datetime
+
+from progr.config_app.parser_config import PARSER_CONFIG
+from progr.utils_app.logger import LOG_DIR, LOGGER
+
+# Причины отказа (ключи ParseStats.rejected)
+REJECT_NO_MATCH = "не совпал формат"
+REJECT_EMPTY = "пустая строка"
+REJECT_BROKEN_TUPLE = "битый кортеж"
+
+
+class ParseStats:
+    """
+    Статистика одного разбора: сколько строк/байт обработано, сколько записей
+    получено, сколько отклонено (по причинам), сколько отброшено фильтром
+    (LogFilter — это не ошибки) и время по этапам (read — чтение, prefilter —
+    предфильтр строк, regex — сопоставление/токенизация, conversion — разбор
+    времени, протокола, чисел, frame — сборка DataFrame).
+
+    Хранит ограниченную выборку отклонённых строк (не больше
+    PARSER_CONFIG["stats"]["rejected_samples"]) для записи в файл рядом с логами.
+    Объект простой (словари/списки), поэтому передаётся из процессов пула
+    и объединяется через merge(); время этапов при этом суммируется
+    по процессам и может превышать общее время разбора.
+    """
+
+    def __init__(self, log_type: str = "") -> None:
+        self.log_type = log_type
+        self.lines = 0
+        self.bytes = 0
+        self.matched = 0
+        self.filtered = 0
+        self.rejected: dict[str, int] = {}
+        self.stages: dict[str, float] = {}
+        self.samples: list[tuple[str, str]] = []
+        self.max_samples = int(PARSER_CONFIG["stats"]["rejected_samples"])
+        self.elapsed = 0.0
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Накопить время блока в этапе name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def reject(self, reason: str, sample: str | None = None, count: int = 1) -> None:
+        self.rejected[reason] = self.rejected.get(reason, 0) + count
+        if sample is not None and len(self.samples) < self.max_samples:
+            self.samples.append((reason, sample))
+
+    def count_matches(self, lines, matches) -> None:
+        """
+        Учёт построчного разбора: matches — результаты regex.match/search
+        для lines (None — строка не разобрана).
+        """
+        self.lines += len(lines)
+        rejected = [i for i, m in enumerate(matches) if m is None]
+        self.matched += len(matches) - len(rejected)
+        for i in rejected:
+            line = lines[i]
+            if line.strip():
+                self.reject(REJECT_NO_MATCH, line.rstrip("\r\n"))
+            else:
+                self.reject(REJECT_EMPTY)
+
+    def count_filtered(self, before: int, after: int) -> None:
+        """Фильтр оставил after записей из before."""
+        self.filtered += before - after
+
+    def merge(self, other: "ParseStats") -> None:
+        """Добавляет статистику куска (параллельный разбор)."""
+        self.lines += other.lines
+        self.bytes += other.bytes
+        self.matched += other.matched
+        self.filtered += other.filtered
+        for reason, n in other.rejected.items():
+            self.rejected[reason] = self.rejected.get(reason, 0) + n
+        for name, sec in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + sec
+        self.samples.extend(other.samples[:max(0, self.max_samples - len(self.samples))])
+
+    def finish(self) -> "ParseStats":
+        self.elapsed = time.perf_counter() - self._started
+        return self
+
+    @property
+    def rejected_total(self) -> int:
+        return sum(self.rejected.values())
+
+    def as_dict(self) -> dict:
+        elapsed = self.elapsed or 1e-9
+        return {
+            "log_type": self.log_type,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "matched": self.matched,
+            "filtered": self.filtered,
+            "rejected": dict(self.rejected),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "elapsed": round(self.elapsed, 4),
+            "lines_per_sec": round(self.lines / elapsed),
+            "bytes_per_sec": round(self.bytes / elapsed),
+        }
+
+    def summary(self) -> str:
+        """Одна строка для строки состояния и лога."""
+        elapsed = self.elapsed or 1e-9
+        parts = [
+            f"{self.log_type}: записей {self.matched}",
+            f"отклонено {self.rejected_total}",
+            *([f"отфильтровано {self.filtered}"] if self.filtered else []),
+            f"{self.lines / elapsed:,.0f} строк/с".replace(",", " "),
+            f"{self.bytes / elapsed / (1024 * 1024):.1f} МБ/с",
+            f"{self.elapsed:.2f} с",
+        ]
+        if self.stages:
+            parts.append(" ".join(f"{k}={v:.2f}с" for k, v in self.stages.items()))
+        return ", ".join(parts)
+
+    def save_rejected(self, path: str | None = None) -> str | None:
+        """
+        Пишет выборку отклонённых строк в файл (по умолчанию в LOG_DIR,
+        перезаписывается при каждом разборе). Возвращает путь или None, если писать нечего.
+        """
+        if not self.samples:
+            return None
+        path = path or os.path.join(LOG_DIR, PARSER_CONFIG["stats"]["rejected_file"])
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# {datetime.now():%Y-%m-%d %H:%M:%S} {self.summary()}\n")
+                f.write(f"# отклонено по причинам: {self.rejected}; в файле первые {len(self.samples)}\n")
+                for reason, line in self.samples:
+                    f.write(f"[{reason}] {line}\n")
+        except OSError as e:
+            LOGGER.warning(f"[ParseStats] Не удалось записать отклонённые строки в {path}: {e}")
+            return None
+        return path
+
+
+def stage(stats: ParseStats | None, name: str):
+    """stats.stage(name) или пустой контекст, если статистика не собирается."""
+    return stats.stage(name) if stats is not None else contextlib.nullcontext()
@@ -0,0 +1,286 @@
+import mmap
+import os
+import re
+from typing import Callable, Iterable, Sequence
+
+from progr.utils_app.log_reader import iter_text_chunks
+
+# Строка в кавычках с экранированием '' и \x (possessive — без возвратов на длинных строках)
+_QUOTED = r"'(?:[^'\\]++|\\.|'')*+'"
+# Вложенные скобки вне кавычек внутри поля (вызов функции и т.п.), один уровень
+_NESTED = rf"\((?:[^()']++|{_QUOTED})*+\)"
+
+# Поле кортежа вместе с разделителем: ',' после поля или ')' после последнего
+_FIELD_RE = re.compile(rf"((?:[^,()']++|{_QUOTED}|{_NESTED})*+)[,)]")
+
+# Начало секции значений: INSERT/REPLACE INTO <таблица> [(колонки)] VALUES
+# либо строка, начинающаяся с '(' (голый список кортежей без INSERT)
+_START_RE = re.compile(
+    r"(?:INSERT|REPLACE)(?:\s+(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE))*\s+INTO\s+"
+    r"(?P<table>(?:`[^`]*`|[\w$]+)(?:\s*\.\s*(?:`[^`]*`|[\w$]+))?)\s*"
+    r"(?:\([^)]*\)\s*)?VALUES?\s*"
+    r"|^[ \t]*(?=\()",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Очередной кортеж секции VALUES (скобки внутри кавычек не считаются)
+# и разделитель после него (',' — дальше ещё кортежи)
+_ROW_RE = re.compile(rf"\s*(\((?:[^()']++|{_QUOTED}|{_NESTED})*+\))\s*([,;]?)")
+# Незаконченный кортеж, упирающийся в конец буфера (продолжение придёт следующим куском)
+_OPEN_QUOTED = r"'(?:[^'\\]++|\\.|'')*+[\\']?"
+_PARTIAL_RE = re.compile(
+    rf"\((?:[^()']++|{_QUOTED}|{_NESTED})*+"
+    rf"(?:{_OPEN_QUOTED}|\((?:[^()']++|{_QUOTED})*+(?:{_OPEN_QUOTED})?)?\Z"
+)
+_SPACE_RE = re.compile(r"\s*")
+
+# Начало строки, с которой можно начинать кусок дампа при параллельном разборе:
+# оператор INSERT/REPLACE или кортеж '(' (mysqldump экранирует переводы строк
+# внутри значений, поэтому такие строки лежат вне кавычек)
+_SPLIT_LINE_B = re.compile(rb"\n(?=[ \t]*(?:\(|INSERT\b|REPLACE\b))", re.IGNORECASE)
+
+_ESCAPE_RE = re.compile(r"\\(.)|''", re.DOTALL)
+
+# Экранирование mysqldump: \0 \n \r \t \Z; остальные \x -> x
+_ESCAPES = {"0": "\0", "n": "\n", "r": "\r", "t": "\t", "Z": "\x1a"}
+
+
+def _unescape(match: re.Match) -> str:
+    ch = match.group(1)
+    if ch is None:
+        return "'"
+    return _ESCAPES.get(ch, ch)
+
+
+def unquote_sql(token: str) -> str:
+    """'it''s' / 'it\\'s' -> it's (внешние кавычки снимаются, экранирование раскрывается)."""
+    body = token[1:-1] if len(token) > 1 and token.endswith("'") else token[1:]
+    if "\\" in body or "''" in body:
+        return _ESCAPE_RE.sub(_unescape, body)
+    return body
+
+
+class SqlValuesTokenizer:
+    """
+    Потоковый разбор кортежей '(...)' из SQL-выгрузки (mysqldump).
+
+    Текст подаётся кусками через feed(); распознаются операторы
+    INSERT/REPLACE INTO ... VALUES, а также голые списки кортежей
+    (строки, начинающиеся с '('). Кортежи и поля режутся скомпилированными
+    регулярками (match/findall работают в C), Python-код трогает только
+    поля из проекции. Скобки внутри кавычек не считаются; вложенные скобки
+    вне кавычек (например, вызов функции) остаются частью значения поля.
+
+    Состояние между кусками — «внутри VALUES или нет» и хвост буфера
+    с незаконченным кортежем (не больше одного кортежа), поэтому память
+    не зависит от размера дампа.
+
+    Каждый кортеж возвращается списком строк-полей (кавычки сняты,
+    экранирование раскрыто, пробелы по краям обрезаны). При заданной
+    проекции columns собираются только нужные поля — в порядке columns,
+    отсутствующие в кортеже поля дают "". При заданном tables берутся
+    только INSERT в эти таблицы (имя совпадает или оканчивается на него —
+    префикс таблиц WordPress бывает разным).
+
+    on_reject(фрагмент) вызывается для каждого пропущенного битого кортежа
+    (начало текста с места ошибки) — для статистики разбора.
+    """
+
+    # Сколько конца буфера держать вне VALUES: заголовок INSERT мог разорваться на границе куска
+    MAX_HEADER = 64 * 1024
+    # Длина фрагмента битого кортежа, передаваемого в on_reject
+    REJECT_SAMPLE_CHARS = 200
+
+    def __init__(self, columns: Sequence[int] | None = None, tables: Sequence[str] | None = None,
+                 on_reject: Callable[[str], None] | None = None) -> None:
+        self._columns = list(columns) if columns is not None else None
+        self._tables = tuple(t.lower() for t in tables) if tables else None
+        self._on_reject = on_reject
+        self._buf = ""
+        self._in_values = False
+        self._emit = True
+        self._mid_line = False  # буфер начинается не с начала строки
+
+    def resume(self, table: str | None) -> None:
+        """
+        Начать сразу внутри списка VALUES оператора INSERT в table —
+        для куска дампа, вырезанного посередине оператора (параллельный разбор).
+        """
+        self._in_values = True
+        self._emit = self._accepts(table)
+
+    def at_boundary(self) -> bool:
+        """
+        Поданный текст кончился между кортежами (вне VALUES, после ',' или сразу
+        после целого кортежа) — а не посреди кортежа или строки в кавычках.
+        """
+        return not self._in_values or not self._buf.strip() or _ROW_RE.fullmatch(self._buf) is not None
+
+    def tuples(self, text: str) -> list[list[str]]:
+        """Все кортежи из цельного текста (feed + close)."""
+        return self.feed(text) + self.close()
+
+    def feed(self, text: str) -> list[list[str]]:
+        """Очередной кусок текста -> кортежи, которые в нём закончились."""
+        self._buf += text
+        return self._consume(final=False)
+
+    def close(self) -> list[list[str]]:
+        """Конец данных: разбирает остаток буфера, незаконченный кортеж отбрасывается."""
+        rows = self._consume(final=True)
+        self._buf = ""
+        self._in_values = False
+        self._mid_line = False
+        return rows
+
+    def _consume(self, final: bool) -> list[list[str]]:
+        buf = self._buf
+        n = len(buf)
+        pos = 0
+        out = []
+
+        while True:
+            if not self._in_values:
+                m = _START_RE.search(buf, pos)
+                if m is not None and self._mid_line and m.start() == 0 and m.group("table") is None:
+                    m = _START_RE.search(buf, 1)
+                if m is None:
+                    pos = n if final else max(pos, n - self.MAX_HEADER)
+                    break
+                self._emit = self._accepts(m.group("table"))
+                self._in_values = True
+                pos = m.end()
+                continue
+
+            m = _ROW_RE.match(buf, pos)
+            if m is None:
+                start = _SPACE_RE.match(buf, pos).end()
+                if start == n:
+                    pos = n
+                    break
+                if not final and _PARTIAL_RE.match(buf, start):
+                    pos = start
+                    break
+                # битый кортеж — ищем следующий оператор
+                if self._on_reject is not None and self._emit:
+                    self._on_reject(buf[start:start + self.REJECT_SAMPLE_CHARS])
+                self._in_values = False
+                pos = start + 1
+                continue
+
+            sep = m.group(2)
+            if not sep and m.end() == n and not final:
+                break  # за кортежем может прийти ',' — дождёмся следующего куска
+            if self._emit:
+                out.append(self._row(buf, m.start(1), m.end(1)))
+            pos = m.end()
+            if sep != ",":
+                self._in_values = False
+
+        self._mid_line = 0 < pos < n and buf[pos - 1] != "\n"
+        self._buf = buf[pos:]
+        return out
+
+    def _accepts(self, table: str | None) -> bool:
+        if self._tables is None or table is None:
+            return True
+        name = table.replace("`", "").split(".")[-1].strip().lower()
+        return any(name == t or name.endswith(t) for t in self._tables)
+
+    def _row(self, buf: str, start: int, end: int) -> list[str]:
+        fields = _FIELD_RE.findall(buf, start + 1, end)
+        value = self._value
+        if self._columns is None:
+            return [value(f) for f in fields]
+        n = len(fields)
+        return [value(fields[i]) if i < n else "" for i in self._columns]
+
+    @staticmethod
+    def _value(raw: str) -> str:
+        v = raw.strip()
+        if v[:1] == "'":
+            return unquote_sql(v).strip()
+        return v
+
+
+def iter_sql_tuples(text: str | Iterable[str], columns: Sequence[int] | None = None,
+                    tables: Sequence[str] | None = None, batch_lines: int = 10000,
+                    on_reject: Callable[[str], None] | None = None):
+    """
+    Кортежи SQL-выгрузки (см. SqlValuesTokenizer) из строки или строк файла
+    (список или LineIndex). Строки подаются токенизатору пачками, без склейки
+    всего дампа в одну строку.
+    """
+    tokenizer = SqlValuesTokenizer(columns, tables, on_reject)
+    if isinstance(text, str):
+        yield from tokenizer.tuples(text)
+        return
+    lines = text if hasattr(text, "__len__") else list(text)
+    for i in range(0, len(lines), batch_lines):
+        yield from tokenizer.feed("".join(lines[i:i + batch_lines]))
+    yield from tokenizer.close()
+
+
+def find_sql_split_points(file_path: str, parts: int) -> list[tuple[int, str | None]]:
+    """
+    Делит несжатый дамп примерно на parts кусков по границам между кортежами:
+    от каждой цели (size * k / parts) ищется ближайшее начало строки
+    с оператором INSERT/REPLACE или кортежем '(' — поиск в C по mmap,
+    файл целиком не просматривается.
+
+    Граница выбирается без учёта кавычек (в mysqldump переводов строк внутри
+    значений нет), поэтому разбор кусков её проверяет: кусок перед верной
+    границей заканчивается ровно на конце кортежа (SqlValuesTokenizer.at_boundary).
+
+    Возвращает [(смещение, таблица)]: таблица задана, если кусок начинается
+    посреди списка VALUES (предыдущая строка кончается на ','), и его нужно
+    разбирать с SqlValuesTokenizer.resume(таблица); None — кусок самостоятельный.
+    """
+    points: list[tuple[int, str | None]] = []
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or parts < 2:
+            return points
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            for k in range(1, parts):
+                m = _SPLIT_LINE_B.search(mm, max(pos, size * k // parts))
+                if m is None:
+                    break
+                pos = m.end()
+                points.append((pos, _enclosing_table(mm, pos)))
+    return points
+
+
+def _enclosing_table(mm, pos: int) -> str | None:
+    """Таблица INSERT, внутри списка VALUES которого начинается строка pos (или None)."""
+    prev = mm[max(0, pos - 16):pos].rstrip()
+    if not (mm[pos:pos + 64].lstrip()[:1] == b"(" and prev.endswith(b",")):
+        return None
+    # начало оператора — ближайшее предыдущее INSERT/REPLACE в начале строки
+    end = pos
+    while True:
+        i = max(mm.rfind(word, 0, end) for word in (b"INSERT", b"REPLACE", b"insert", b"replace"))
+        if i < 0:
+            return None
+        if not mm[mm.rfind(b"\n", 0, i) + 1:i].strip():
+            header = mm[i:i + SqlValuesTokenizer.MAX_HEADER].decode("utf-8", errors="ignore")
+            m = _START_RE.match(header)
+            return m.group("table") if m is not None and m.group("table") else None
+        end = i
+
+
+def iter_sql_dump(file_path: str, columns: Sequence[int] | None = None,
+                  tables: Sequence[str] | None = None, chunk_chars: int = 8 * 1024 * 1024,
+                  on_reject: Callable[[str], None] | None = None):
+    """
+    Потоковое чтение дампа с диска (в т.ч. .gz/.bz2/.xz).
+    Возвращает пачки (rows, bytes_read, total_bytes) — кортежи, закончившиеся
+    в очередном куске файла; в памяти только текущий кусок.
+    """
+    tokenizer = SqlValuesTokenizer(columns, tables, on_reject)
+    total_bytes = 0
+    for chunk, bytes_read, total_bytes in iter_text_chunks(file_path, chunk_chars):
+        yield tokenizer.feed(chunk), bytes_read, total_bytes
+    rows = tokenizer.close()
+    if rows:
+        yield rows, total_bytes, total_bytes
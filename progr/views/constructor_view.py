@@ -1,14 +1,21 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QFileDialog,
-    QComboBox, QMenu, QTableView, QMessageBox, QToolButton, QStyle, QHBoxLayout
+    QComboBox, QMenu, QTableView, QMessageBox, QToolButton, QStyle, QHBoxLayout,
+    QProgressBar, QCheckBox, QInputDialog, QLineEdit
 )
 from PyQt6.QtCore import Qt
-import pandas as pd
+import os
 from progr.controllers.constructor_controller import ConstructorController
 from progr.threads.file_loader_thread import FileLoaderThread
+from progr.models.log_parser_model import LogParser
+from progr.models.log_schema import RowSourceIndex
+from progr.models.log_query import LogQuery
+from progr.utils_app.log_reader import expand_log_paths
 from progr.dialogs.create_rule_dialog import CreateRuleDialog
+from progr.dialogs.facets_dialog import FacetsDialog
 from progr.utils_app.logger import LOGGER
 from progr.config_app.ui_helpers import fix_widget_wigths
+from progr.config_app.parser_config import PARSER_CONFIG
 
 
 
@@ -21,12 +28,22 @@ class ConstructorView(QWidget):
     - Создание правил IDS/IPS.
     """
 
+    LOAD_MODE_LIST = "Обычная загрузка"
+    LOAD_MODE_STREAM = "Потоковая загрузка"
+    LOAD_MODE_MMAP = "Индекс строк (mmap)"
+
     def __init__(self, thread_manager):
         super().__init__()
         self.thread_manager = thread_manager
         self.controller = ConstructorController()
         self.log_lines = []
-        self.df = None
+        self.log_path = None
+        self._log_fingerprint = None  # отпечаток файла на момент чтения (ключ кэша)
+        self.log_paths = []          # несколько файлов / каталог
+        self._loaded_offset = 0      # до какого байта файл уже попал в таблицу
+        self._row_sources = RowSourceIndex()  # (файл, позиция) строк, добавленных при включённом dedup (пропуск повторов)
+        self._tail_thread = None
+        self._refresh_thread = None  # однократное дочитывание («Обновить»), пока оно идёт
         self.logs_model = None
 
         self.layout = QVBoxLayout(self)
@@ -37,10 +54,26 @@ class ConstructorView(QWidget):
 
         self.layout.addWidget(self.load_button)
 
+        #  Загрузка нескольких файлов или каталога (парсинг в пуле процессов)
+        self.load_many_button = QToolButton()
+        self.load_many_button.setText("Несколько файлов / папка")
+        self.load_many_button.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        load_many_menu = QMenu(self)
+        load_many_menu.addAction("Выбрать файлы…", self.load_many_files)
+        load_many_menu.addAction("Выбрать папку…", self.load_log_dir)
+        self.load_many_button.setMenu(load_many_menu)
+        self.load_many_button.setFixedWidth(250)
+        self.layout.addWidget(self.load_many_button)
+
+        # Режим загрузки: обычный (список строк), потоковый (чтение+парсинг пачками
+        # при формировании таблицы) или индекс строк поверх mmap (большие файлы)
+        self.load_mode_selector = QComboBox()
+        self.load_mode_selector.addItems([self.LOAD_MODE_LIST, self.LOAD_MODE_STREAM, self.LOAD_MODE_MMAP])
+        self.layout.addWidget(self.load_mode_selector)
 
         #  Выбор типа парсера 
         self.parser_selector = QComboBox()
-        self.parser_selector.addItems(["Apache", "Nginx", "Wordpress", "Bitrix"])
+        self.parser_selector.addItems(["Apache", "Nginx", "Wordpress", "Bitrix", *LogParser.CUSTOM_FORMAT_TYPES])
         self.layout.addWidget(self.parser_selector)
 
         #  Кнопка парсинга 
@@ -54,6 +87,19 @@ class ConstructorView(QWidget):
         
         self.layout.addLayout(btn_row)
 
+        # Слежение за растущим файлом: новые строки дописываются в таблицу
+        self.follow_checkbox = QCheckBox("Следить за файлом (tail -f)")
+        self.follow_checkbox.toggled.connect(self._on_follow_toggled)
+        self.layout.addWidget(self.follow_checkbox)
+
+        #  Пропускать строки, которые уже есть в таблице (повторный разбор того же файла)
+        self.dedup_checkbox = QCheckBox("Не добавлять повторяющиеся строки")
+        self.dedup_checkbox.setChecked(PARSER_CONFIG["table"]["dedup"])
+        self.dedup_checkbox.setToolTip(
+            "Повтор — та же строка того же файла (по смещению в файле), добавленная при включённом\n"
+            "флажке. Одинаковые по содержимому записи из разных строк добавляются все.")
+        self.layout.addWidget(self.dedup_checkbox)
+
         # Кнопка с тремя точками (меню)
         self.btn_menu = QToolButton()
         self.btn_menu.setText("⋮")
@@ -61,7 +107,46 @@ class ConstructorView(QWidget):
         self.btn_menu.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
         self.columns_menu = QMenu(self)
         self.btn_menu.setMenu(self.columns_menu)
-        self.layout.addWidget(self.btn_menu, 0, Qt.AlignmentFlag.AlignRight)
+        # Массовые отметки ячеек (по значению, по фильтру, по запросу)
+        self.btn_checks = QToolButton()
+        self.btn_checks.setText("Отметки")
+        self.btn_checks.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        checks_menu = QMenu(self)
+        checks_menu.addAction("Отметить значение текущей ячейки во всех строках", self._check_current_value)
+        checks_menu.addAction("Отметить текущий столбец во всех строках", self._check_current_column)
+        checks_menu.addAction("Отметить все ячейки показанных строк", self._check_all_visible)
+        checks_menu.addAction("Отметить текущий столбец по запросу…", self._check_by_query)
+        checks_menu.addAction("Инвертировать отметки текущего столбца", self._invert_current_column)
+        checks_menu.addSeparator()
+        checks_menu.addAction("Снять все отметки", self._clear_checks)
+        self.btn_checks.setMenu(checks_menu)
+        # Статистика значений столбцов (частые значения, различные, пустые)
+        self.btn_facets = QToolButton()
+        self.btn_facets.setText("Значения столбцов")
+        self.btn_facets.clicked.connect(self._show_facets)
+        self._facets_dialog = None
+
+        menus_row = QHBoxLayout()
+        menus_row.addStretch(1)
+        menus_row.addWidget(self.btn_facets)
+        menus_row.addWidget(self.btn_checks)
+        menus_row.addWidget(self.btn_menu)
+        self.layout.addLayout(menus_row)
+
+        # Прогресс чтения файла
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        self.layout.addWidget(self.progress_bar)
+
+        # Строка фильтра таблицы (синтаксис — models/log_query.py -> LogQuery)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText(
+            "Фильтр: source_ip=10.0.0.0/8 code=400-499 object~wp-login time>=2025-07-27T07:00 (Enter — применить)")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.returnPressed.connect(self._apply_filter)
+        self.layout.addWidget(self.filter_edit)
 
         # Таблица логов 
         self.table = QTableView()
@@ -80,28 +165,165 @@ class ConstructorView(QWidget):
     #  Загрузка файла 
     def load_logs(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Выбери лог-файл", "", "Log files (*.log *.txt)"
+            self, "Выбери лог-файл", "", "Log files (*.log *.txt *.log.* *.gz *.bz2 *.xz);;Все файлы (*)"
         )
         if file_path:
             LOGGER.info(f"[ConstructorView] Выбран файл: {file_path}")
+            self._stop_tail()
+            self.log_path = file_path
+            self.log_paths = []
+            self.log_lines = []
+            self._loaded_offset = 0
+
+            mode = self.load_mode_selector.currentText()
+            if self.controller.has_cached_parse(file_path, self.parser_selector.currentText()):
+                # Разбор уже есть в дисковом кэше — файл читать не нужно
+                QMessageBox.information(self, "Файл выбран",
+                                        "Разбор этого файла найден в кэше, таблица сформируется сразу.")
+                return
+
+            if mode == self.LOAD_MODE_STREAM:
+                # Файл будет прочитан пачками прямо при формировании таблицы
+                QMessageBox.information(self, "Файл выбран",
+                                        "Файл будет прочитан потоково при формировании таблицы.")
+                return
+
+            self._start_file_loader(file_path)
+
+    def _start_file_loader(self, file_path, parse_after=False):
+        """
+        Читает файл в память (список строк или индекс mmap).
+        :param parse_after: сразу запустить парсинг после загрузки (без сообщения)
+        """
+        self._log_fingerprint = self.controller.file_fingerprint(file_path)
+        if self.load_mode_selector.currentText() == self.LOAD_MODE_MMAP:
+            thread = FileLoaderThread(file_path, use_mmap=True)
+            on_loaded, signal = self.on_file_indexed, thread.indexed
+        else:
             thread = FileLoaderThread(file_path)
-            thread.finished.connect(self.on_file_loaded)
-            thread.error.connect(lambda msg: QMessageBox.critical(self, "Ошибка загрузки файла", msg))
-            self.thread_manager.start(thread)
+            on_loaded, signal = self.on_file_loaded, thread.finished
+        if parse_after:
+            signal.connect(lambda data: (on_loaded(data, quiet=True), self._on_click_parse()))
+        else:
+            signal.connect(on_loaded)
+        thread.progress.connect(self._on_progress)
+        thread.error.connect(self._on_load_error)
+        self.progress_bar.show()
+        self.thread_manager.start(thread)
+
+    def load_many_files(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Выбери лог-файлы", "", "Log files (*.log *.txt *.log.* *.gz *.bz2 *.xz);;Все файлы (*)"
+        )
+        if file_paths:
+            self._set_log_paths(file_paths)
 
-    def on_file_loaded(self, lines):
+    def load_log_dir(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "Выбери папку с логами")
+        if not dir_path:
+            return
+        pattern, ok = QInputDialog.getText(
+            self, "Маска файлов", "Маска (glob), например access.log*:",
+            text=PARSER_CONFIG["multi_file"]["pattern"]
+        )
+        if ok:
+            self._set_log_paths([dir_path], pattern.strip() or "*")
+
+    def _set_log_paths(self, paths, pattern="*"):
+        files = expand_log_paths(paths, pattern)
+        if not files:
+            QMessageBox.warning(self, "Нет файлов", "По выбору не найдено ни одного файла.")
+            return
+        self._stop_tail()
+        self.log_paths = files
+        self.log_path = None
+        self.log_lines = []
+        self._loaded_offset = 0
+        LOGGER.info(f"[ConstructorView] Выбрано файлов: {len(files)}")
+        QMessageBox.information(self, "Файлы выбраны",
+                                f"Выбрано файлов: {len(files)}. Они будут разобраны параллельно "
+                                f"при формировании таблицы.")
+
+    def on_file_loaded(self, lines, quiet=False):
+        self.progress_bar.hide()
         self.log_lines = lines
-        QMessageBox.information(self, "Файл загружен", "Файл логов успешно загружен.")
+        if not quiet:
+            QMessageBox.information(self, "Файл загружен", "Файл логов успешно загружен.")
         LOGGER.info(f"[ConstructorView] Загружено строк: {len(lines)}")
 
+    def on_file_indexed(self, index, quiet=False):
+        # LineIndex ведёт себя как последовательность строк: парсер читает её диапазонами
+        self.progress_bar.hide()
+        self.log_lines = index
+        self._loaded_offset = getattr(index, "size", self._loaded_offset)
+        if not quiet:
+            QMessageBox.information(self, "Файл загружен", f"Проиндексировано строк: {len(index)}.")
+        LOGGER.info(f"[ConstructorView] Проиндексировано строк: {len(index)}")
+
+    def _on_load_error(self, msg):
+        self.progress_bar.hide()
+        QMessageBox.critical(self, "Ошибка загрузки файла", msg)
+
+    def _on_progress(self, bytes_read, total_bytes):
+        self._loaded_offset = bytes_read
+        self.progress_bar.setValue(int(bytes_read * 1000 / total_bytes) if total_bytes else 1000)
+
     # === Парсинг логов ===
     def _on_click_parse(self):
+        log_type = self.parser_selector.currentText()
+
+        if self.log_paths:
+            self._start_multi_file_parse(log_type)
+            return
+
+        # Повторное открытие того же файла: разбор читается из дискового кэша в рабочем потоке
+        if self.log_path and self.controller.has_cached_parse(self.log_path, log_type):
+            self._start_cached_parse(log_type)
+            return
+        self._parse_loaded(log_type)
+
+    def _start_cached_parse(self, log_type):
+        starter = getattr(self.thread_manager, "start", None)
+        if starter is None:
+            QMessageBox.critical(self, "Ошибка", "Не найден thread-starter у главного окна Parse.")
+            return
+        self.process_button.setEnabled(False)
+        path = self.log_path
+
+        def on_ok(df):
+            try:
+                self._show_parsed(df)
+                self._loaded_offset = os.path.getsize(path)
+            finally:
+                self.process_button.setEnabled(True)
+
+        def on_miss():
+            # Запись пропала или битая — обычный разбор
+            self.process_button.setEnabled(True)
+            self._parse_loaded(log_type)
+
+        def on_err(msg):
+            self.process_button.setEnabled(True)
+            QMessageBox.critical(self, "Ошибка парсинга", msg)
+
+        self.controller.start_cached_parse(path, log_type, starter, on_finished=on_ok, on_miss=on_miss,
+                                           on_error=on_err)
+
+    def _parse_loaded(self, log_type):
+        """Разбор выбранного файла: потоково или из загруженных строк (без кэша)."""
+        stream_mode = self.load_mode_selector.currentText() == self.LOAD_MODE_STREAM
+        if stream_mode and self.log_path:
+            self._start_stream_parse(log_type)
+            return
+
         if not self.log_lines:
+            if self.log_path:
+                # Чтение файла пропускалось ради кэша, но разбора этим парсером нет
+                self._start_file_loader(self.log_path, parse_after=True)
+                return
             QMessageBox.warning(self, "Нет данных", "Сначала загрузите файл логов.")
             return
 
-        log_type = self.parser_selector.currentText()
-
         # Берём стартер потоков из MainWindow, переданный в конструктор
         starter = getattr(self.thread_manager, "start", None)
         if starter is None:
@@ -112,33 +334,10 @@ class ConstructorView(QWidget):
 
         def on_ok(df):
             try:
-        # Если уже что-то было — склеиваем старое и новое
-                if self.df is not None:
-                    try:
-                        self.df = pd.concat([self.df, df], ignore_index=True)
-                    except Exception:
-                # На случай несовпадения столбцов — выравниваем
-                        self.df = pd.concat([self.df, df.reindex(columns=self.df.columns)], ignore_index=True)
-                else:
-                    self.df = df
-
-        # Пересобираем модель по совокупным данным
-                self.logs_model = self.controller.create_logs_model(self.df, parent=self)
-                self.table.setModel(self.logs_model)
-                self.table.horizontalHeader().viewport().update()
-                self.table.verticalHeader().viewport().update()
-                self.table.resizeColumnsToContents()
-
-        # Обновляем меню столбцов
-                self._rebuild_columns_menu()
-
-            except Exception as e:
-                LOGGER.error(f"[ConstructorView] Ошибка отображения таблицы: {e}", exc_info=True)
-                QMessageBox.critical(self, "Ошибка", f"Не удалось отобразить таблицу: {e}")
+                self._show_parsed(df)
             finally:
                 self.process_button.setEnabled(True)
 
-
         def on_err(msg):
             self.process_button.setEnabled(True)
             QMessageBox.critical(self, "Ошибка парсинга", msg)
@@ -149,8 +348,367 @@ class ConstructorView(QWidget):
             thread_starter=starter,
             on_finished=on_ok,
             on_error=on_err,
+            cache_path=self.log_path,
+            cache_fingerprint=self._log_fingerprint,
+            on_stats=self._show_parse_stats,
         )
 
+    def _show_parse_stats(self, stats):
+        """Статистика разбора в строке состояния главного окна."""
+        self._show_status(stats.summary())
+
+    def _show_status(self, text, timeout=15000):
+        status = getattr(self.thread_manager, "status_bar", None)
+        if status is not None:
+            status.showMessage(text, timeout)
+
+    def _apply_filter(self):
+        """Применяет строку фильтра к таблице (пустая строка — показать все строки)."""
+        if self.logs_model is None:
+            return
+        text = self.filter_edit.text().strip()
+        try:
+            shown = self.controller.filter_logs(self.logs_model, text)
+        except ValueError as e:
+            QMessageBox.warning(self, "Фильтр", str(e))
+            return
+        total = self.logs_model.total_rows()
+        self._show_status(f"Фильтр: показано {shown} из {total}" if text else f"Фильтр снят: {total} строк")
+
+    # ---------------- Массовые отметки ----------------
+    def _current_cell(self):
+        """(строка, столбец) текущей ячейки таблицы или None с подсказкой пользователю."""
+        index = self.table.currentIndex()
+        if self.logs_model is None or not index.isValid():
+            QMessageBox.information(self, "Отметки", "Сначала выберите ячейку в таблице.")
+            return None
+        return index.row(), index.column()
+
+    def _check_current_value(self):
+        cell = self._current_cell()
+        if cell is None:
+            return
+        row, col = cell
+        value = self.logs_model.value(row, col)
+        rows = self.logs_model.check_value(col, value)
+        self._show_status(f"Отмечено «{value}» в {rows} строках")
+
+    def _check_current_column(self):
+        cell = self._current_cell()
+        if cell is not None:
+            rows = self.logs_model.check_visible([cell[1]])
+            self._show_status(f"Отмечено ячеек столбца: {rows}")
+
+    def _check_all_visible(self):
+        if self.logs_model is not None:
+            rows = self.logs_model.check_visible()
+            self._show_status(f"Отмечены все ячейки в {rows} строках")
+
+    def _check_by_query(self):
+        cell = self._current_cell()
+        if cell is None:
+            return
+        text, ok = QInputDialog.getText(self, "Отметить по запросу",
+                                        "Запрос (как в строке фильтра), например code=400-499 object~wp-login:")
+        if not ok or not text.strip():
+            return
+        try:
+            rows = self.controller.check_by_query(self.logs_model, text, [cell[1]])
+        except ValueError as e:
+            QMessageBox.warning(self, "Отметки", str(e))
+            return
+        self._show_status(f"Отмечено по запросу: {rows} строк")
+
+    def _invert_current_column(self):
+        cell = self._current_cell()
+        if cell is not None:
+            self.logs_model.invert_checks([cell[1]])
+
+    def _clear_checks(self):
+        if self.logs_model is not None:
+            self.logs_model.clear_checks()
+
+    # ---------------- Статистика значений столбцов ----------------
+    def _show_facets(self):
+        if self.logs_model is None:
+            QMessageBox.information(self, "Значения столбцов", "Сначала сформируйте таблицу логов.")
+            return
+        if self._facets_dialog is not None and self._facets_dialog.model is not self.logs_model:
+            self._facets_dialog.close()
+            self._facets_dialog = None
+        if self._facets_dialog is None:
+            index = self.table.currentIndex()
+            self._facets_dialog = FacetsDialog(
+                self, self.logs_model,
+                on_filter=self._filter_by_value,
+                on_check=lambda col, value: self.logs_model.check_value(col, value),
+                column=index.column() if index.isValid() else 0,
+            )
+        self._facets_dialog.show()
+        self._facets_dialog.raise_()
+
+    def _filter_by_value(self, column, value):
+        """Добавляет условие «column ровно value» к строке фильтра и применяет её."""
+        term = LogQuery.equals(column, value)
+        text = self.filter_edit.text().strip()
+        self.filter_edit.setText(f"{text} {term}" if text else term)
+        self._apply_filter()
+
+    def _show_parsed(self, df):
+        """Добавляет результат парсинга к накопленным данным и обновляет таблицу."""
+        try:
+            self._add_frame(df)
+        except Exception as e:
+            LOGGER.error(f"[ConstructorView] Ошибка отображения таблицы: {e}", exc_info=True)
+            QMessageBox.critical(self, "Ошибка", f"Не удалось отобразить таблицу: {e}")
+
+    def _start_multi_file_parse(self, log_type):
+        """
+        Параллельный парсинг выбранных файлов; прогресс — по числу готовых файлов.
+        """
+        starter = getattr(self.thread_manager, "start", None)
+        if starter is None:
+            QMessageBox.critical(self, "Ошибка", "Не найден thread-starter у главного окна Parse.")
+            return
+
+        total = len(self.log_paths)
+        self.process_button.setEnabled(False)
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Файлов: %v из %m")
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.show()
+        failed = []
+
+        def reset_progress():
+            self.progress_bar.hide()
+            self.progress_bar.setTextVisible(False)
+            self.progress_bar.setRange(0, 1000)
+            self.process_button.setEnabled(True)
+
+        def on_file_done(path, done, total_files, rows):
+            self.progress_bar.setValue(done)
+            if rows < 0:
+                failed.append(path)
+            status = getattr(self.thread_manager, "status_bar", None)
+            if status is not None:
+                status.showMessage(f"[{done}/{total_files}] {path}: "
+                                   f"{'ошибка' if rows < 0 else f'{rows} записей'}", 5000)
+
+        def on_ok(df):
+            try:
+                self._show_parsed(df)
+                if failed:
+                    QMessageBox.warning(self, "Часть файлов не разобрана",
+                                        "Не удалось разобрать:\n" + "\n".join(failed))
+            finally:
+                reset_progress()
+
+        def on_err(msg):
+            reset_progress()
+            QMessageBox.critical(self, "Ошибка парсинга", msg)
+
+        self.controller.start_multi_file_parse(
+            file_paths=self.log_paths,
+            log_type=log_type,
+            thread_starter=starter,
+            on_file_done=on_file_done,
+            on_finished=on_ok,
+            on_error=on_err,
+            max_workers=PARSER_CONFIG["multi_file"]["max_workers"],
+        )
+
+    def _start_stream_parse(self, log_type):
+        """
+        Потоковый парсинг: каждая разобранная пачка сразу дописывается в таблицу.
+        """
+        starter = getattr(self.thread_manager, "start", None)
+        if starter is None:
+            QMessageBox.critical(self, "Ошибка", "Не найден thread-starter у главного окна Parse.")
+            return
+
+        self.process_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.show()
+        self._loaded_offset = 0
+
+        def on_done(total):
+            self.progress_bar.hide()
+            self.process_button.setEnabled(True)
+            LOGGER.info(f"[ConstructorView] Потоково добавлено записей: {total}")
+
+        def on_err(msg):
+            self.progress_bar.hide()
+            self.process_button.setEnabled(True)
+            QMessageBox.critical(self, "Ошибка парсинга", msg)
+
+        self.controller.start_stream_parse(
+            file_path=self.log_path,
+            log_type=log_type,
+            batch_size=PARSER_CONFIG["stream"]["batch_size"],
+            thread_starter=starter,
+            on_batch=self._append_parsed_rows,
+            on_progress=self._on_progress,
+            on_finished=on_done,
+            on_error=on_err,
+        )
+
+    # ---------------- Слежение за файлом (tail -f) ----------------
+    def _on_follow_toggled(self, checked):
+        if not checked:
+            self._stop_tail()
+            return
+        log_type = self.parser_selector.currentText()
+        if not self.log_path:
+            QMessageBox.warning(self, "Нет данных", "Сначала выберите файл логов.")
+            self.follow_checkbox.setChecked(False)
+            return
+        if log_type not in LogParser.LINE_BASED_TYPES:
+            QMessageBox.warning(self, "Слежение недоступно",
+                                "Слежение за файлом поддерживается только для Apache/Nginx.")
+            self.follow_checkbox.setChecked(False)
+            return
+        self._tail_thread = self._start_tail(log_type, once=False)
+        if self._tail_thread is None:
+            self.follow_checkbox.setChecked(False)
+
+    def _start_tail(self, log_type, once):
+        """
+        Дочитывает файл с последнего смещения. Если таблица ещё не построена,
+        файл читается с начала — дальше только новые строки.
+        """
+        starter = getattr(self.thread_manager, "start", None)
+        if starter is None:
+            QMessageBox.critical(self, "Ошибка", "Не найден thread-starter у главного окна Parse.")
+            return None
+        start_offset = self._loaded_offset if self.logs_model is not None else 0
+        cfg = PARSER_CONFIG["tail"]
+
+        def on_offset(offset):
+            self._loaded_offset = offset
+
+        def on_err(msg):
+            if not once:
+                self._tail_thread = None
+                self.follow_checkbox.setChecked(False)
+            QMessageBox.critical(self, "Ошибка слежения", msg)
+
+        return self.controller.start_tail(
+            file_path=self.log_path,
+            log_type=log_type,
+            start_offset=start_offset,
+            thread_starter=starter,
+            on_rows=self._append_parsed_rows,
+            on_offset=on_offset,
+            on_error=on_err,
+            once=once,
+            interval_ms=cfg["interval_ms"],
+            max_read_bytes=cfg["max_read_bytes"],
+        )
+
+    def _stop_tail(self):
+        threads = (self._tail_thread, self._refresh_thread)
+        self._tail_thread = self._refresh_thread = None
+        for thread in threads:
+            if thread is not None and thread.isRunning():
+                thread.requestInterruption()
+        self.follow_checkbox.setEnabled(True)
+        if self.follow_checkbox.isChecked():
+            self.follow_checkbox.blockSignals(True)
+            self.follow_checkbox.setChecked(False)
+            self.follow_checkbox.blockSignals(False)
+
+    def _append_parsed_rows(self, df):
+        """
+        Дописывает новые записи (пачка потокового парсинга или слежения)
+        в конец таблицы без пересборки модели.
+        """
+        try:
+            self._add_frame(df)
+        except Exception as e:
+            LOGGER.error(f"[ConstructorView] Ошибка добавления новых строк: {e}", exc_info=True)
+
+    def _add_frame(self, df):
+        """
+        Общий путь добавления записей: первая порция создаёт модель, следующие
+        дописываются через beginInsertRows/endInsertRows — преобразуются только
+        новые строки, отметки и прокрутка существующих сохраняются.
+        Данные хранятся только в модели (колоночное хранилище), отдельной копии
+        DataFrame представление не держит.
+        При включённом dedup_checkbox пропускаются строки, уже добавленные в таблицу
+        при включённом флажке (по файлу и позиции строки в нём, см. RowSourceIndex).
+        """
+        if self.dedup_checkbox.isChecked():
+            total = len(df)
+            df = self._row_sources.drop_seen(df, self.log_path or "")
+            if len(df) < total:
+                LOGGER.info(f"[ConstructorView] Пропущено повторяющихся строк: {total - len(df)}")
+
+        if self.logs_model is None:
+            self.logs_model = self.controller.create_logs_model(df, parent=self)
+            self.table.setModel(self.logs_model)
+            self._resize_columns_from_sample()
+            self._rebuild_columns_menu()
+        elif len(df):
+            self.controller.append_logs_df(self.logs_model, df)
+
+    def _resize_columns_from_sample(self):
+        """
+        Ширина колонок по выборке строк (PARSER_CONFIG["table"]["width_sample"])
+        вместо resizeColumnsToContents(), который обходит все строки модели.
+        """
+        cfg = PARSER_CONFIG["table"]
+        fm = self.table.fontMetrics()
+        style = self.table.style()
+        # чекбокс в ячейке + отступы
+        extra = (style.pixelMetric(QStyle.PixelMetric.PM_IndicatorWidth)
+                 + 4 * style.pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin) + 8)
+        header = self.table.horizontalHeader()
+        for col, name in enumerate(self.logs_model.headers()):
+            sample = self.logs_model.column_sample(col, cfg["width_sample"])
+            text_width = max((fm.horizontalAdvance(v) for v in set(sample)), default=0) + extra
+            header_width = header.fontMetrics().horizontalAdvance(name) + 24  # место под стрелку сортировки
+            self.table.setColumnWidth(col, min(max(text_width, header_width), cfg["max_column_width"]))
+
+    def reload_logs(self):
+        """
+        «Обновить данные»: дочитывает только новые строки файла после
+        последнего смещения, без повторного парсинга и дублирования строк.
+        Пока дочитывание идёт, повторные запросы пропускаются (второй поток
+        начал бы с того же смещения и добавил те же строки), а слежение
+        не включается.
+        """
+        if self._tail_thread is not None:
+            # Слежение уже дописывает новые строки само
+            return
+        if self._refresh_thread is not None:
+            LOGGER.info("[ConstructorView] Обновление уже выполняется, повторный запрос пропущен")
+            return
+        log_type = self.parser_selector.currentText()
+        if self.logs_model is None:
+            self._on_click_parse()
+            return
+        if not self.log_path:
+            QMessageBox.information(self, "Обновление",
+                                    "Дочитывание новых строк доступно только для одного файла.")
+            return
+        if log_type not in LogParser.LINE_BASED_TYPES:
+            QMessageBox.information(self, "Обновление",
+                                    "Дочитывание новых строк поддерживается только для Apache/Nginx.")
+            return
+        thread = self._start_tail(log_type, once=True)
+        if thread is None:
+            return
+        self._refresh_thread = thread
+        self.follow_checkbox.setEnabled(False)
+        thread.finished.connect(lambda: self._on_refresh_done(thread))
+        thread.error.connect(lambda _msg: self._on_refresh_done(thread))
+
+    def _on_refresh_done(self, thread):
+        if self._refresh_thread is thread:
+            self._refresh_thread = None
+            self.follow_checkbox.setEnabled(True)
+
     # ---------------- Меню '⋮' — чекбоксы видимости столбцов ----------------
     def _rebuild_columns_menu(self):
         self.columns_menu.clear()
@@ -211,8 +769,14 @@ class ConstructorView(QWidget):
             else:
                 self.table.setModel(None)
         # Сбросим внутренние ссылки/данные
+            self._stop_tail()
             self.logs_model = None
-            self.df = None
+            self._row_sources.clear()
+            self._loaded_offset = 0
+            self.filter_edit.clear()
+            if self._facets_dialog is not None:
+                self._facets_dialog.close()
+                self._facets_dialog = None
         # Почистим меню столбцов
             self.columns_menu.clear()
         except Exception as e:
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """QApplication для тестов моделей Qt (без окон)."""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
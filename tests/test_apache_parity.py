@@ -0,0 +1,120 @@
+"""
+Паритет колоночного разбора Apache/Nginx (LogParser.parse_apache_nginx)
+с построчной эталонной реализацией: тот же DataFrame, включая типы колонок,
+время с учётом пояса и пропуск строк, которые не совпали с форматом.
+"""
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from progr.models.log_parser_model import LogParser
+from progr.models.log_schema import apply_schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Битые строки и необычные смещения поясов
+EXTRA_LINES = [
+    "",
+    "garbage line without structure",
+    '10.0.0.1 - - [27/Jul/2025:07:55:25 +0700] "GET / HTTP/1.1" 200',  # обрезана
+    '10.0.0.1 - - [27/Jul/2025:07:55:25 +0700] "get / HTTP/1.1" 200 1 "-" "ua"',  # метод не в верхнем регистре
+    '10.0.0.2 - - [01/Jan/2025:00:00:00 +0545] "GET /np HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.3 - - [31/Dec/2024:23:59:59 -0930] "POST /mq HTTP/2" 302 - "-" "ua"',
+    '10.0.0.4 - - [01/Mar/2025:12:00:00 +1400] "GET /ki HTTP/1.0" 404 0 "-" "ua"',
+    '10.0.0.5 - - [01/Mar/2025:12:00:00 -1200] "GET /bi HTTP/1.1" 500 5 "-" "ua"',
+    '10.0.0.6 - - [01/Mar/2025:12:00:00 +0000] "GET /utc HTTP/1.1" 200 5 "-" "ua"',
+    '10.0.0.7 - - [01/Mar/2025:12:00:00] "GET /nozone HTTP/1.1" 200 5 "-" "ua"',
+    '10.0.0.8 - - [32/Foo/2025:12:00:00 +0300] "GET /badmonth HTTP/1.1" 200 5 "-" "ua"',
+    '10.0.0.9 - - [not a time] "GET /badtime HTTP/1.1" 200 5 "-" "ua"',
+    '2001:db8::1 - - [29/Feb/2024:06:07:08 +0330] "DELETE /v6 HTTP/1.1" 204 - "http://r/" ""',
+]
+
+
+def _apache_timestamp(raw: str):
+    """Момент времени через strptime (без пояса — UTC) или NaT."""
+    core, _, zone = str(raw).strip().partition(" ")
+    try:
+        return datetime.strptime(f"{core} {zone.strip() or '+0000'}", "%d/%b/%Y:%H:%M:%S %z")
+    except ValueError:
+        return pd.NaT
+
+
+def reference_parse(parser: LogParser, lines) -> pd.DataFrame:
+    """Построчная эталонная реализация parse_apache_nginx."""
+    parsed_data = []
+    stamps = []
+    for line in lines:
+        match = parser.apache_nginx_pattern.search(line)
+        if not match:
+            continue
+        raw_time = match.group("time")
+        date_str, time_str = parser._split_apache_time(raw_time)
+        protocol = match.group("protocol")
+        proto, proto_ver = parser._split_protocol(protocol)
+        parsed_data.append([
+            date_str,
+            time_str,
+            match.group("source_ip"),
+            match.group("method"),
+            match.group("object"),
+            protocol,
+            proto,
+            proto_ver,
+            match.group("code"),
+            match.group("size"),
+            match.group("referer"),
+            match.group("agent"),
+        ])
+        stamps.append(_apache_timestamp(raw_time))
+
+    if not parsed_data:
+        return parser._empty_apache_nginx()
+    df = pd.DataFrame(parsed_data, columns=LogParser.APACHE_NGINX_COLUMNS[:-1])
+    df["timestamp"] = pd.to_datetime(pd.Series(stamps, dtype=object), utc=True)
+    return apply_schema(df, "Apache")
+
+
+def _read_lines(name):
+    with open(os.path.join(ROOT, name), encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+@pytest.mark.parametrize("name", ["apache.log", "nginx.txt"])
+def test_parity_on_sample_logs(name):
+    lines = _read_lines(name)
+    parser = LogParser()
+    df = parser.parse_apache_nginx(lines)
+    assert len(df) > 0
+    pd.testing.assert_frame_equal(df, reference_parse(LogParser(), lines))
+    assert df.equals(reference_parse(LogParser(), lines))
+
+
+@pytest.mark.parametrize("name", ["apache.log", "nginx.txt"])
+def test_parity_with_malformed_lines_and_offsets(name):
+    lines = _read_lines(name) + EXTRA_LINES
+    df = LogParser().parse_apache_nginx(lines)
+    expected = reference_parse(LogParser(), lines)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.equals(expected)
+
+
+def test_unusual_offsets_are_applied():
+    df = LogParser().parse_apache_nginx(EXTRA_LINES)
+    stamps = dict(zip(df["object"], df["timestamp"]))
+    assert stamps["/np"] == pd.Timestamp("2024-12-31 18:15:00", tz="UTC")
+    assert stamps["/mq"] == pd.Timestamp("2025-01-01 09:29:59", tz="UTC")
+    assert stamps["/ki"] == pd.Timestamp("2025-02-28 22:00:00", tz="UTC")
+    assert stamps["/bi"] == pd.Timestamp("2025-03-02 00:00:00", tz="UTC")
+    assert stamps["/nozone"] == pd.Timestamp("2025-03-01 12:00:00", tz="UTC")
+    assert pd.isna(stamps["/badmonth"]) and pd.isna(stamps["/badtime"])
+    assert "/" not in set(df["object"])  # обрезанная строка и метод в нижнем регистре не разобраны
+
+
+def test_parity_after_converter_cache_reuse():
+    """Кэш времени ApacheTimeConverter живёт в парсере между пачками — результат тот же."""
+    lines = _read_lines("nginx.txt") + EXTRA_LINES
+    parser = LogParser()
+    parser.parse_apache_nginx(lines)
+    pd.testing.assert_frame_equal(parser.parse_apache_nginx(lines), reference_parse(LogParser(), lines))
@@ -0,0 +1,34 @@
+"""ConstructorView: «Обновить» не запускает второе дочитывание, пока идёт первое."""
+import os
+
+from progr.views.constructor_view import ConstructorView
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Threads:
+    """Стартер потоков, который только запоминает потоки (не запускает)."""
+
+    def __init__(self):
+        self.started = []
+
+    def start(self, thread):
+        self.started.append(thread)
+
+
+def test_reload_ignored_while_refresh_runs(qapp):
+    threads = _Threads()
+    view = ConstructorView(threads)
+    view.log_path = os.path.join(ROOT, "nginx.txt")
+    view.logs_model = object()  # таблица уже построена
+    view.parser_selector.setCurrentText("Nginx")
+
+    view.reload_logs()
+    view.reload_logs()
+    assert len(threads.started) == 1
+    assert not view.follow_checkbox.isEnabled()
+
+    threads.started[0].finished.emit()
+    assert view.follow_checkbox.isEnabled()
+    view.reload_logs()
+    assert len(threads.started) == 2
@@ -0,0 +1,57 @@
+"""
+Отбор по времени при разборе (LogFilter.time_range) и в таблице (LogQuery time>=...)
+одинаково трактует границы: без пояса — по часам лога, с поясом — по UTC.
+Проекция columns не строит незапрошенные IP-колонки.
+"""
+import pytest
+
+from progr.models.log_filter import LogFilter
+from progr.models.log_parser_model import LogParser
+from progr.models.log_query import LogQuery
+from progr.models.logs_table_model import LogsTableModel
+from progr.models.log_schema import IP_COLUMNS
+
+LINES = [
+    '10.0.0.1 - - [01/Jan/2025:00:00:00 +0545] "GET /np HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.2 - - [31/Dec/2024:23:59:59 -0930] "GET /mq HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.3 - - [01/Mar/2025:12:00:00 +1400] "GET /ki HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.4 - - [01/Mar/2025:12:00:00 +0000] "GET /utc HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.5 - - [not a time] "GET /bad HTTP/1.1" 200 10 "-" "ua"',
+]
+
+BOUNDS = [
+    (("2025-03-01 12:00", None), "time>=2025-03-01T12:00"),
+    ((None, "2024-12-31 23:59:59"), "time<=2024-12-31T23:59:59"),
+    (("2025-03-01T12:00Z", None), "time>=2025-03-01T12:00Z"),
+    ((None, "2025-01-01T00:00+00:00"), "time<=2025-01-01T00:00+00:00"),
+]
+
+
+@pytest.mark.parametrize("time_range, query", BOUNDS)
+def test_parse_filter_matches_table_query(qapp, time_range, query):
+    parsed = LogParser().parse_apache_nginx(LINES, where=LogFilter(time_range=time_range))
+    model = LogsTableModel(LogParser().parse_apache_nginx(LINES), ["object", "date", "time"])
+    model.set_query(LogQuery.parse(query))
+    assert list(parsed["object"]) == [model.value(r, 0) for r in range(model.rowCount())]
+
+
+def test_naive_bound_uses_log_clock():
+    df = LogParser().parse_apache_nginx(LINES, where=LogFilter(time_range=("2025-03-01 12:00", None)))
+    assert list(df["object"]) == ["/ki", "/utc"]
+    df = LogParser().parse_apache_nginx(LINES, where=LogFilter(time_range=("2025-03-01T12:00+00:00", None)))
+    assert list(df["object"]) == ["/utc"]
+
+
+def test_mask_on_parsed_frame_matches_pushdown():
+    df = LogParser().parse_apache_nginx(LINES)
+    where = LogFilter(time_range=("2024-12-31 23:00", "2025-01-01 00:00"))
+    assert list(where.apply(df)["object"]) == ["/np", "/mq"]
+
+
+def test_projection_skips_ip_columns():
+    parser = LogParser()
+    df = parser.parse_apache_nginx(LINES, columns=["source_ip", "object"])
+    assert list(df.columns) == ["source_ip", "object"]
+    df = parser.parse_apache_nginx(LINES, columns=["source_ip", "ip_v4"])
+    assert list(df.columns) == ["source_ip", "ip_v4"]
+    assert not set(IP_COLUMNS) & set(parser.parse_apache_nginx(LINES).columns)  # только по запросу
@@ -0,0 +1,80 @@
+"""compile_log_format на форматах из PARSER_CONFIG["log_formats"]: извлечение полей и отказ на чужих строках."""
+import pandas as pd
+import pytest
+
+from progr.config_app.parser_config import PARSER_CONFIG
+from progr.models.log_formats import compile_log_format
+from progr.models.log_parser_model import LogParser
+from progr.utils_app.apache_time import ApacheTimeConverter
+
+NGINX = "Nginx (vhost + время ответа)"
+APACHE = "Apache (vhost_combined + %D)"
+
+SAMPLES = {
+    NGINX: 'example.com 10.0.0.1 - - [01/Mar/2025:12:00:00 +1400] "GET /x?a=1 HTTP/1.1" 200 5 '
+           '"http://r/" "ua 1" 0.123 0.100, 0.020',
+    APACHE: 'example.com:443 10.0.0.2 - bob [27/Jul/2025:07:55:25 +0700] "POST /login HTTP/2.0" 302 120 '
+            '"-" "curl/8.0" 2500',
+}
+
+EXPECTED = {
+    NGINX: {"vhost": "example.com", "source_ip": "10.0.0.1", "method": "GET", "object": "/x?a=1",
+            "protocol": "HTTP/1.1", "code": "200", "size": 5, "referer": "http://r/", "user_agent": "ua 1",
+            "date": "2025-03-01", "time": "12:00:00", "request_time": 0.123,
+            "timestamp": pd.Timestamp("2025-02-28 22:00:00", tz="UTC")},
+    APACHE: {"vhost": "example.com", "apache_p": "443", "source_ip": "10.0.0.2", "remote_user": "bob",
+             "method": "POST", "object": "/login", "protocol": "HTTP/2.0", "code": "302", "size": 120,
+             "user_agent": "curl/8.0", "date": "2025-07-27", "time": "07:55:25", "request_time": 0.0025,
+             "timestamp": pd.Timestamp("2025-07-27 00:55:25", tz="UTC")},
+}
+
+REJECTED = [
+    "",
+    "garbage line without structure",
+    '10.0.0.1 - - [27/Jul/2025:07:55:25 +0700] "GET / HTTP/1.1" 200 1 "-" "ua"',  # combined без vhost и времени
+]
+
+
+def _compiled(name):
+    spec = PARSER_CONFIG["log_formats"][name]
+    return compile_log_format(spec.get("syntax", "nginx"), spec["format"])
+
+
+def _parse(name, lines):
+    return _compiled(name).parse(lines, ApacheTimeConverter(), LogParser._split_protocol)
+
+
+@pytest.mark.parametrize("name", [NGINX, APACHE])
+def test_shipped_format_extracts_fields(name):
+    df = _parse(name, [SAMPLES[name]])
+    assert len(df) == 1
+    row = df.iloc[0]
+    for col, value in EXPECTED[name].items():
+        assert row[col] == value, col
+
+
+def test_upstream_times_are_summed():
+    df = _parse(NGINX, [SAMPLES[NGINX]])
+    assert df["upstream_response_time"].iloc[0] == pytest.approx(0.12)
+
+
+@pytest.mark.parametrize("name", [NGINX, APACHE])
+def test_shipped_format_rejects_other_lines(name):
+    other = SAMPLES[APACHE if name == NGINX else NGINX]
+    df = _parse(name, REJECTED + [other, SAMPLES[name]])
+    assert list(df["object"]) == [EXPECTED[name]["object"]]
+
+
+def test_compile_is_cached_and_rejects_unknown_syntax():
+    assert _compiled(NGINX) is _compiled(NGINX)
+    with pytest.raises(ValueError):
+        compile_log_format("iis", "%h")
+
+
+def test_apache_directive_argument_names_the_column():
+    fmt = compile_log_format("apache", '%h %{UNIQUE_ID}e %{SSL_PROTOCOL}e %{remote}p %p "%r" %>s')
+    df = fmt.parse(['10.0.0.1 abc TLSv1.3 51000 443 "GET / HTTP/1.1" 200'], ApacheTimeConverter(),
+                   LogParser._split_protocol)
+    row = df.iloc[0]
+    assert (row["apache_e_unique_id"], row["apache_e_ssl_protocol"]) == ("abc", "TLSv1.3")
+    assert (row["apache_p_remote"], row["apache_p"]) == ("51000", "443")
@@ -0,0 +1,119 @@
+"""
+Разбор строки фильтра LogQuery и применение его к LogsTableModel:
+регулярные выражения с обратной косой чертой, значения в кавычках,
+кавычка без пары.
+"""
+import pandas as pd
+import pytest
+
+from progr.models.log_query import LogQuery, QueryTerm
+from progr.models.logs_table_model import LogsTableModel
+
+HEADERS = ["object", "user_agent"]
+
+
+@pytest.fixture
+def model(qapp):
+    frame = pd.DataFrame({
+        "object": ["/index.php", "/it's", "/a b", "/robots.txt"],
+        "user_agent": ["bot12", "Mozilla/5.0 (X11)", "curl/8.0", "bot"],
+    })
+    return LogsTableModel(frame, HEADERS)
+
+
+def _shown(model, text):
+    model.set_query(LogQuery.parse(text))
+    return [model.value(r, 0) for r in range(model.visible_rows())]
+
+
+def test_split_keeps_backslash_and_lone_quote():
+    assert LogQuery.split(r"user_agent~/bot\d+/") == [r"user_agent~/bot\d+/"]
+    assert LogQuery.split("object~it's code=200") == ["object~it's", "code=200"]
+    assert LogQuery.split('time>="2025-07-27 07:00"  object~\'a b\'') == ["time>=2025-07-27 07:00", "object~a b"]
+    assert LogQuery.split("  ") == []
+
+
+def test_regex_term_with_escape(model):
+    term = LogQuery.parse(r"user_agent~/bot\d+/").terms[0]
+    assert isinstance(term, QueryTerm) and term.value == r"/bot\d+/"
+    assert _shown(model, r"user_agent~/bot\d+/") == ["/index.php"]
+    assert _shown(model, r"user_agent~/\(X11\)$/") == ["/it's"]
+
+
+def test_quoted_phrase(model):
+    assert _shown(model, 'object="/a b"') == ["/a b"]
+    assert _shown(model, "object~'a b'") == ["/a b"]
+
+
+def test_lone_quote(model):
+    assert LogQuery.parse("object~it's").terms[0].value == "it's"
+    assert _shown(model, "object~it's") == ["/it's"]
+    assert _shown(model, "it's") == ["/it's"]
+
+
+def test_quoted_comma_is_part_of_value(qapp):
+    """Запятая в кавычках значения не делит; без кавычек — список «одно из»."""
+    model = LogsTableModel(pd.DataFrame({"object": ["/a,b", "/a", "b", "/c"], "user_agent": [""] * 4}), HEADERS)
+    assert LogQuery.parse('object="/a,b"').terms[0].values == ["/a,b"]
+    assert _shown(model, 'object="/a,b"') == ["/a,b"]
+    assert _shown(model, "object='/a,b',/c") == ["/a,b", "/c"]
+    assert _shown(model, "object=/a,b") == ["/a", "b"]
+    assert _shown(model, 'object!="/a,b"') == ["/a", "b", "/c"]
+    assert _shown(model, "object=" + LogQuery.quote("/a,b")) == ["/a,b"]
+
+
+def test_quoted_value_from_shlex_quote(model):
+    """Значения, которые вид подставляет через shlex.quote, разбираются обратно как есть."""
+    import shlex
+    assert _shown(model, shlex.quote("object=/it's")) == ["/it's"]
+    assert LogQuery.split(shlex.quote(r"user_agent~/bot\d+/")) == [r"user_agent~/bot\d+/"]
+
+
+TIME_LINES = [
+    '10.0.0.1 - - [01/Jan/2025:00:00:00 +0545] "GET /np HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.2 - - [31/Dec/2024:23:59:59 -0930] "GET /mq HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.3 - - [01/Mar/2025:12:00:00 +1400] "GET /ki HTTP/1.1" 200 10 "-" "ua"',
+    '10.0.0.4 - - [01/Mar/2025:12:00:00 +0000] "GET /utc HTTP/1.1" 200 10 "-" "ua"',
+]
+
+
+@pytest.fixture
+def time_model(qapp):
+    from progr.models.log_parser_model import LogParser
+    return LogsTableModel(LogParser().parse_apache_nginx(TIME_LINES), ["object", "date", "time"])
+
+
+def test_time_term_local_bound_uses_log_clock(time_model):
+    """Момент без пояса сравнивается с датой и временем, как они показаны в таблице."""
+    assert _shown(time_model, "time<'2025-01-01 00:00'") == ["/mq"]
+    assert _shown(time_model, "time>=2025-03-01T12:00") == ["/ki", "/utc"]
+
+
+def test_time_term_zoned_bound_uses_timestamp(time_model):
+    """Момент с поясом сравнивается с timestamp (UTC): +1400 12:00 — это 22:00 UTC накануне."""
+    assert _shown(time_model, "time>=2025-03-01T12:00Z") == ["/utc"]
+    assert _shown(time_model, "time<2025-01-01T00:00+00:00") == ["/np"]
+
+
+def test_time_term_rejects_bad_moment():
+    with pytest.raises(ValueError):
+        LogQuery.parse("time>=2025-13-45T99:00")
+
+
+@pytest.mark.parametrize("column, value", [
+    ("user_agent", "Mozilla/5.0 (Macintosh) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"),
+    ("object", "/a,b"),
+    ("object", "/it's, \\d"),
+    ("object", ""),
+])
+def test_facet_value_filter_is_exact(qapp, column, value):
+    """Фильтр по значению из фасетов (LogQuery.equals) — ровно это значение, с запятыми и кавычками."""
+    frame = pd.DataFrame({"object": ["/a,b", "/a", "/it's, \\d", ""],
+                          "user_agent": ["a", "Mozilla/5.0 (Macintosh) AppleWebKit/537.36 (KHTML, like Gecko) "
+                                                      "Chrome/126.0 Safari/537.36", "b", "x"]})
+    model = LogsTableModel(frame, HEADERS)
+    col = HEADERS.index(column)
+    expected = [r for r in range(4) if model.value(r, col) == value]
+    assert len(expected) == 1
+    model.set_query(LogQuery.parse(LogQuery.equals(column, value)))
+    assert [model.value(r, col) for r in range(model.rowCount())] == [value]
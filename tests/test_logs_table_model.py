@@ -0,0 +1,78 @@
+"""LogsTableModel: сортировка по date/time по моменту времени записи."""
+import pandas as pd
+from PyQt6.QtCore import Qt
+
+from progr.models.log_parser_model import LogParser
+from progr.models.logs_table_model import LogsTableModel
+
+LINES = [
+    '10.0.0.1 - - [01/Mar/2025:12:00:00 -1200] "GET /bi HTTP/1.1" 200 1 "-" "ua"',
+    '10.0.0.2 - - [01/Mar/2025:12:00:00 +1400] "GET /ki HTTP/1.1" 200 1 "-" "ua"',
+    '10.0.0.3 - - [29/Feb/2024:06:07:08 +0330] "GET /v6 HTTP/1.1" 200 1 "-" "ua"',
+    '10.0.0.4 - - [not a time] "GET /bad HTTP/1.1" 200 1 "-" "ua"',
+    '10.0.0.5 - - [01/Mar/2025:12:00:00 +0000] "GET /utc HTTP/1.1" 200 1 "-" "ua"',
+]
+HEADERS = ["date", "time", "object"]
+
+
+def _objects(model):
+    return [model.value(r, 2) for r in range(model.rowCount())]
+
+
+def test_sort_by_time_is_chronological_across_offsets(qapp):
+    model = LogsTableModel(LogParser().parse_apache_nginx(LINES), HEADERS)
+    model.sort(1)
+    assert _objects(model) == ["/bad", "/v6", "/ki", "/utc", "/bi"]
+    model.sort(0, Qt.SortOrder.DescendingOrder)
+    assert _objects(model) == ["/bi", "/utc", "/ki", "/v6", "/bad"]
+    model.sort_by([(1, Qt.SortOrder.DescendingOrder)])
+    assert _objects(model) == ["/bi", "/utc", "/ki", "/v6", "/bad"]
+
+
+def test_sort_by_time_without_timestamp_uses_log_clock(qapp):
+    frame = pd.DataFrame({"date": ["2025-03-01", "2024-12-31", "", "2025-03-01"],
+                          "time": ["09:00:00", "23:59:59", "", "08:59:59"],
+                          "object": ["/c", "/a", "/empty", "/b"]})
+    model = LogsTableModel(frame, HEADERS)
+    assert model.timestamps() is None
+    model.sort(0)
+    assert _objects(model) == ["/empty", "/a", "/b", "/c"]
+
+
+def test_timestamps_follow_appended_frames(qapp):
+    model = LogsTableModel(pd.DataFrame({"date": ["2025-03-01"], "time": ["09:00:00"], "object": ["/x"]}), HEADERS)
+    model.append_frame(LogParser().parse_apache_nginx(LINES[:1]))
+    stamps = model.timestamps()
+    assert len(stamps) == 2 and stamps[0] == pd.NaT.value
+    assert stamps[1] == pd.Timestamp("2025-03-02 00:00:00", tz="UTC").value
+
+
+def _paged_model(rows):
+    model = LogsTableModel(pd.DataFrame({"date": [""] * rows, "time": [""] * rows,
+                                         "object": [f"/{i}" for i in range(rows)]}), HEADERS)
+    model._fetch_rows = 2
+    model._loaded = min(rows, 2)
+    return model
+
+
+def test_rows_appended_is_emitted_for_paged_append(qapp):
+    model = _paged_model(5)
+    inserted, appended = [], []
+    model.rowsInserted.connect(lambda *args: inserted.append(args))
+    model.rowsAppended.connect(appended.append)
+    model.append_frame(pd.DataFrame({"object": ["/new1", "/new2"]}))
+    assert appended == [2] and not inserted  # представлению отданы не все строки — rowsInserted нет
+    assert model.total_rows() == 7 and model.rowCount() == 2
+
+
+def test_facets_dialog_refreshes_on_paged_append(qapp):
+    from progr.dialogs.facets_dialog import FacetsDialog
+    model = _paged_model(5)
+    dialog = FacetsDialog(None, model, on_filter=lambda *a: None, on_check=lambda *a: None, column=2)
+    dialog.show()
+    assert not dialog._refresh_timer.isActive()
+    model.append_frame(pd.DataFrame({"object": ["/new"]}))
+    assert dialog._refresh_timer.isActive()
+    dialog.refresh()
+    assert dialog.summary_label.text().startswith("Строк: 6,")
+    dialog.close()
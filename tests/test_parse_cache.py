@@ -0,0 +1,72 @@
+"""ParseCache: запись по пачкам (потоковый разбор) и чтение склеенного разбора."""
+import os
+
+import pandas as pd
+
+from progr.models.log_parser_model import LogParser
+from progr.models.log_schema import concat_frames
+from progr.utils_app.parse_cache import ParseCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _batches(path, size):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    parser = LogParser()
+    return [parser.parse_apache_nginx(lines[i:i + size]) for i in range(0, len(lines), size)]
+
+
+def test_writer_stores_batches_and_load_concatenates(tmp_path):
+    log = os.path.join(ROOT, "nginx.txt")
+    cache = ParseCache(str(tmp_path / "cache"), 1 << 30)
+    frames = _batches(log, 7)
+    writer = cache.writer(log, "Nginx:test", fingerprint=cache.fingerprint(log))
+    for df in frames:
+        writer.add(df)
+    assert not cache.contains(log, "Nginx:test")  # до commit записи нет
+    writer.commit()
+    pd.testing.assert_frame_equal(cache.load(log, "Nginx:test"), concat_frames(frames))
+    assert not [p for p in os.listdir(tmp_path / "cache") if p.endswith(".tmp")]
+
+
+def test_store_single_frame_round_trip(tmp_path):
+    log = os.path.join(ROOT, "apache.log")
+    cache = ParseCache(str(tmp_path), 1 << 30)
+    df = _batches(log, 10 ** 6)[0]
+    cache.store(log, "Apache:test", df)
+    pd.testing.assert_frame_equal(cache.load(log, "Apache:test"), df)
+
+
+def test_writer_discards_when_file_changed(tmp_path):
+    log = tmp_path / "access.log"
+    log.write_text(open(os.path.join(ROOT, "nginx.txt"), encoding="utf-8").read(), encoding="utf-8")
+    cache = ParseCache(str(tmp_path / "cache"), 1 << 30)
+    writer = cache.writer(str(log), "Nginx:test", fingerprint=cache.fingerprint(str(log)))
+    writer.add(_batches(str(log), 10 ** 6)[0])
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("appended line\n")
+    writer.commit()
+    assert not cache.contains(str(log), "Nginx:test")
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_parser_thread_loads_cache_off_the_gui_thread(qapp, tmp_path, monkeypatch):
+    """LogParserThread(from_cache=True) читает разбор из кэша и отдаёт его через finished; нет записи — None."""
+    import progr.threads.log_parser_thread as thread_module
+    log = os.path.join(ROOT, "nginx.txt")
+    cache = ParseCache(str(tmp_path), 1 << 30)
+    monkeypatch.setattr(thread_module, "get_parse_cache", lambda: cache)
+
+    def run():
+        got = []
+        thread = thread_module.LogParserThread([], "Nginx", cache_path=log, from_cache=True)
+        thread.finished.connect(got.append)
+        thread.run()
+        return got
+
+    assert run() == [None]
+    df = _batches(log, 10 ** 6)[0]
+    cache.store(log, LogParser.cache_tag("Nginx"), df)
+    [loaded] = run()
+    pd.testing.assert_frame_equal(loaded, df)
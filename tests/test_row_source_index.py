@@ -0,0 +1,91 @@
+"""SourceLines (строки со смещениями и объёмом в байтах) и RowSourceIndex: повтор — та же строка того же файла."""
+import numpy as np
+
+from progr.models.log_filter import LogFilter
+from progr.models.log_parser_model import LogParser
+from progr.models.log_schema import RowSourceIndex
+from progr.threads.log_parser_thread import LogParserThread
+from progr.utils_app.line_index import LineIndex
+from progr.utils_app.log_reader import SourceLines, iter_line_batches
+
+LINE = '10.0.0.1 - - [27/Jul/2025:07:55:25 +0700] "GET /a HTTP/1.1" 200 5 "-" "ua"\n'
+OTHER = '10.0.0.2 - - [27/Jul/2025:07:55:25 +0700] "GET /b HTTP/1.1" 404 5 "-" "ua"\n'
+
+
+def _log(tmp_path, lines):
+    path = tmp_path / "access.log"
+    path.write_bytes("".join(lines).encode("utf-8"))
+    return str(path)
+
+
+def test_same_content_in_different_lines_is_kept(tmp_path):
+    # одинаковые события в одну секунду, пришедшие разными пачками
+    path = _log(tmp_path, [LINE, LINE, OTHER, LINE])
+    index, parser = RowSourceIndex(), LogParser()
+    added = sum(len(index.drop_seen(parser.parse(lines, "Apache", workers=1), path))
+                for lines, _, _ in iter_line_batches(path, 1))
+    assert added == 4
+
+
+def test_reparse_with_other_batches_drops_only_repeats(tmp_path):
+    path = _log(tmp_path, [LINE, OTHER] * 5)
+    index, parser = RowSourceIndex(), LogParser()
+    for lines, _, _ in iter_line_batches(path, 3):
+        index.drop_seen(parser.parse(lines[:2], "Apache", workers=1), path)
+    first = len(index)
+    again = [index.drop_seen(parser.parse(lines, "Apache", workers=1), path)
+             for lines, _, _ in iter_line_batches(path, 4)]
+    assert sum(map(len, again)) == 10 - first
+    assert len(index) == 10
+
+
+def test_offsets_agree_between_readers(tmp_path):
+    path = _log(tmp_path, [LINE, "мусор\r\n", OTHER, LINE.rstrip("\n")])
+    with open(path, "rb") as f:
+        data = f.read()
+    cut = len(LINE.encode()) + len("мусор\r\n".encode())
+    tail = SourceLines.from_bytes(data[cut:], cut)  # как дочитывает LogTailThread
+    batch = next(lines for lines, _, _ in iter_line_batches(path, 100))
+    with LineIndex(path) as line_index:
+        assert np.array_equal(batch.offsets, line_index.line_offsets())
+    assert np.array_equal(tail.offsets, batch.offsets[2:])
+    assert batch[1] == "мусор\n"
+
+    parser = LogParser()
+    df = parser.parse(batch, "Apache", workers=1)
+    assert df["source_pos"].tolist() == [0, cut, batch.offsets[3]]
+    assert parser.parse(tail, "Apache", workers=1)["source_pos"].tolist() == [cut, batch.offsets[3]]
+
+
+def test_positions_follow_filter(tmp_path):
+    path = _log(tmp_path, [LINE, OTHER, LINE])
+    lines = next(lines for lines, _, _ in iter_line_batches(path, 100))
+    df = LogParser().parse(lines, "Apache", workers=1, where=LogFilter(ips=["10.0.0.2"]))
+    assert df["source_pos"].tolist() == [lines.offsets[1]]
+
+
+def test_sources_are_separate():
+    parser = LogParser()
+    df = parser.parse(SourceLines([LINE], [0]), "Apache", workers=1)
+    index = RowSourceIndex()
+    assert len(index.drop_seen(df, "a.log")) == 1
+    assert len(index.drop_seen(df, "b.log")) == 1
+    assert len(index.drop_seen(df, "a.log")) == 0
+
+
+def test_many_batches_keep_few_runs():
+    index = RowSourceIndex()
+    for start in range(0, 10000, 10):
+        index._insert("f", np.arange(start, start + 10))
+    assert len(index) == 10000
+    assert len(index._runs["f"]) <= 2 * int(np.log2(10000))
+    assert index._seen("f", np.array([0, 9999, 10000])).tolist() == [True, True, False]
+
+
+def test_parser_thread_counts_bytes_not_characters(tmp_path):
+    path = _log(tmp_path, [LINE.replace("/a", "/путь"), "строка\r\n", OTHER])
+    size = (tmp_path / "access.log").stat().st_size
+    lines = SourceLines.concat(lines for lines, _, _ in iter_line_batches(path, 1))
+    assert lines.nbytes == size
+    assert LogParserThread(lines, "Apache")._input_bytes() == size
+    assert LogParserThread(list(lines), "Apache")._input_bytes() == size - 1  # без '\r'